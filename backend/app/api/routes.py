@@ -1,70 +1,266 @@
 from __future__ import annotations
 
+import hashlib
+from datetime import date
+from functools import partial
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .. import schemas
-from ..db import Base, engine, get_db
-from ..ingestion.embedder import EmbeddingService
+from .. import crud, metrics, schemas, serialization
+from ..config import get_settings
+from ..db import get_async_db, get_db, init_database
+from ..ingestion.batcher import get_embedder
 from ..ingestion.parser import ingest_yearly_plan
 from ..vectorstore import VectorStore
+from .responses import ModelJSONResponse
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+
 
 @router.on_event("startup")
 def on_startup() -> None:
-    Base.metadata.create_all(bind=engine)
+    init_database()
 
 
-@router.post("/plans/ingest", response_model=schemas.YearlyPlan)
-def ingest_plan(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-) -> schemas.YearlyPlan:
-    with NamedTemporaryFile(delete=False, suffix=Path(file.filename or "plan.docx").suffix) as tmp:
-        content = file.file.read()
+def _ingest_upload(content: bytes, extension: str) -> schemas.YearlyPlanIngestionResult:
+    with NamedTemporaryFile(delete=False, suffix=extension) as tmp:
         tmp.write(content)
         tmp_path = Path(tmp.name)
     try:
-        result = ingest_yearly_plan(tmp_path)
-        _ = db  # Placeholder for persistence integration
+        return ingest_yearly_plan(tmp_path)
     except ValueError as exc:  # pragma: no cover - validation path
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     finally:
         tmp_path.unlink(missing_ok=True)
 
-    embeddings_service = EmbeddingService()
-    embeddings = embeddings_service.embed_texts(chunk["text"] for chunk in result.chunks)
-    vector_store = VectorStore()
-    vector_store.add_texts(
-        ids=[chunk["id"] for chunk in result.chunks],
-        texts=[chunk["text"] for chunk in result.chunks],
-        embeddings=embeddings,
-        metadatas=[chunk["metadata"] for chunk in result.chunks],
+
+def _ingestion_settings_key(embedding_model: str) -> str:
+    """Hash the settings a cached ingestion depends on: the embedding model, chunk sizes and
+    near-duplicate linking. Changing any of them makes earlier entries miss."""
+
+    settings = get_settings()
+    fields = {
+        "embedding_model": embedding_model,
+        "embedding_normalize": settings.embedding_normalize,
+        "chunk_max_tokens": settings.chunk_max_tokens,
+        "chunk_min_tokens": settings.chunk_min_tokens,
+        "chunk_overlap_items": settings.chunk_overlap_items,
+        "chunk_dedup_enabled": settings.chunk_dedup_enabled,
+        "chunk_dedup_threshold": settings.chunk_dedup_threshold,
+        "chunk_dedup_num_perm": settings.chunk_dedup_num_perm,
+        "chunk_dedup_bands": settings.chunk_dedup_bands,
+    }
+    return hashlib.sha256(serialization.dumps(fields)).hexdigest()
+
+
+@router.post("/plans/ingest", response_model=schemas.YearlyPlan)
+def ingest_plan(
+    file: UploadFile = File(...),
+    owner_id: int | None = None,
+    db: Session = Depends(get_db),
+) -> ModelJSONResponse:
+    settings = get_settings()
+    content = file.file.read()
+    extension = Path(file.filename or "plan.docx").suffix.lower()
+    embeddings_service = get_embedder()
+    cache_key = {
+        "file_hash": hashlib.sha256(content).hexdigest(),
+        "extension": extension,
+        "settings_key": _ingestion_settings_key(embeddings_service.model_name),
+    }
+
+    # An identical upload was already parsed, chunked and embedded: reuse all of it.
+    cached = (
+        crud.get_ingestion_cache_entry(db, **cache_key)
+        if settings.ingestion_cache_enabled
+        else None
     )
-    return result.structured
+    if settings.ingestion_cache_enabled:
+        metrics.counter(
+            "planner_ingestion_cache_requests_total",
+            "Ingestion cache lookups by result.",
+            result="hit" if cached is not None else "miss",
+        ).inc()
+    if cached is not None:
+        result = schemas.YearlyPlanIngestionResult.parse_obj(serialization.loads(cached.result))
+    else:
+        from ..services.chunk_store import store_chunks
+
+        result = _ingest_upload(content, extension)
+        # Near-duplicates of stored chunks are linked to those vectors, not embedded again.
+        report = store_chunks(
+            db, chunks=result.chunks, vector_store=VectorStore(), embedder=embeddings_service
+        )
+        if settings.ingestion_cache_enabled:
+            crud.store_ingestion_cache_entry(
+                db,
+                **cache_key,
+                embedding_model=embeddings_service.model_name,
+                result=serialization.dumps(result).decode("utf-8"),
+                vector_ids=list(dict.fromkeys(report.vector_ids)),
+                max_entries=settings.ingestion_cache_max_entries,
+                max_bytes=settings.ingestion_cache_max_bytes,
+            )
+    if owner_id is not None:
+        with metrics.stage("ingest.persist"):
+            crud.persist_yearly_plan(db, owner_id=owner_id, plan=result.structured)
+    return ModelJSONResponse(result.structured)
 
 
 @router.post("/plans/{plan_id}/topics/{topic_id}/generate")
-def generate_lessons(
+async def generate_lessons(
     plan_id: int,
     topic_id: int,
     request: schemas.LessonGenerationRequest,
-) -> dict[str, list[dict[str, str]]]:
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, Any]:
     vector_store = VectorStore()
-    from ..services.planner import LessonPlanner
+    from ..services.planner import LessonPlanner, build_class_sessions
 
     planner = LessonPlanner(vector_store=vector_store)
     schedule = [
         (slot.date, slot.start_time, slot.end_time) for slot in request.schedule
     ]
-    sessions = planner.plan_topic(
+    sessions = await planner.plan_topic(
         query=request.metadata.get("topic", ""),
         schedule=schedule,
         metadata=request.metadata,
     )
-    return {"sessions": sessions}
+    if request.group_id is None:
+        return {"sessions": sessions}
+
+    class_sessions = build_class_sessions(
+        sessions, schedule=schedule, topic_id=topic_id, group_id=request.group_id
+    )
+    class_ids = await db.run_sync(
+        partial(crud.bulk_create_class_sessions, sessions=class_sessions)
+    )
+    return {"sessions": sessions, "class_ids": class_ids}
+
+
+@router.post(
+    "/trimesters/{trimester_id}/sessions", response_model=schemas.SessionExpansionResult
+)
+def expand_trimester_sessions(
+    trimester_id: int,
+    request: schemas.SessionExpansionRequest | None = None,
+    db: Session = Depends(get_db),
+) -> schemas.SessionExpansionResult:
+    from ..services.scheduler import materialise_sessions
+
+    request = request or schemas.SessionExpansionRequest()
+    try:
+        created = materialise_sessions(
+            db,
+            trimester_ids=[trimester_id],
+            group_ids=request.group_ids,
+            holidays=request.holidays,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return schemas.SessionExpansionResult(created=created)
+
+
+def _decode_class_cursor(cursor: str | None) -> tuple[date, int] | None:
+    if cursor is None:
+        return None
+    try:
+        cursor_date, cursor_id = cursor.split(".", 1)
+        return date.fromisoformat(cursor_date), int(cursor_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}") from exc
+
+
+@router.get("/groups/{group_id}/calendar", response_model=schemas.ClassSessionPage)
+async def read_group_calendar(
+    group_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, Any]:
+    classes = await db.run_sync(
+        partial(
+            crud.list_group_classes,
+            group_id=group_id,
+            start_date=start_date,
+            end_date=end_date,
+            after=_decode_class_cursor(cursor),
+            limit=limit + 1,
+        )
+    )
+    next_cursor = None
+    if len(classes) > limit:
+        last = classes[limit - 1]
+        next_cursor = f"{last.date.isoformat()}.{last.id}"
+    return {"items": classes[:limit], "next_cursor": next_cursor}
+
+
+@router.get(
+    "/levels/{level_id}/trimesters/{trimester_id}/topics", response_model=schemas.TopicPage
+)
+async def read_trimester_topics(
+    level_id: int,
+    trimester_id: int,
+    cursor: int | None = None,
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, Any]:
+    topics = await db.run_sync(
+        partial(
+            crud.list_trimester_topics,
+            level_id=level_id,
+            trimester_id=trimester_id,
+            after_id=cursor,
+            limit=limit + 1,
+        )
+    )
+    next_cursor = str(topics[limit - 1].id) if len(topics) > limit else None
+    return {"items": topics[:limit], "next_cursor": next_cursor}
+
+
+@router.get("/admin/ingestion-cache", response_model=schemas.IngestionCacheStats)
+def read_ingestion_cache(
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+) -> schemas.IngestionCacheStats:
+    settings = get_settings()
+    entries, total_bytes, items = crud.list_ingestion_cache(db, limit=limit)
+    return schemas.IngestionCacheStats(
+        entries=entries,
+        total_bytes=total_bytes,
+        max_entries=settings.ingestion_cache_max_entries,
+        max_bytes=settings.ingestion_cache_max_bytes,
+        items=[
+            schemas.IngestionCacheEntryRead(
+                file_hash=item.file_hash,
+                extension=item.extension,
+                settings_key=item.settings_key,
+                embedding_model=item.embedding_model,
+                vector_count=len(item.vector_ids),
+                size_bytes=item.size_bytes,
+                hit_count=item.hit_count,
+                created_at=item.created_at,
+                last_accessed_at=item.last_accessed_at,
+            )
+            for item in items
+        ],
+    )
+
+
+@router.delete("/admin/ingestion-cache", response_model=schemas.IngestionCachePurgeResult)
+def purge_ingestion_cache(
+    file_hash: str | None = None,
+    db: Session = Depends(get_db),
+) -> schemas.IngestionCachePurgeResult:
+    return schemas.IngestionCachePurgeResult(
+        purged=crud.purge_ingestion_cache(db, file_hash=file_hash)
+    )
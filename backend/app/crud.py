@@ -1,15 +1,76 @@
 from __future__ import annotations
 
-from datetime import date
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session, selectinload
 
 from . import models, schemas
 
+# Rows per multi-row INSERT, keeping statements well below driver parameter limits.
+UPSERT_BATCH_SIZE = 1000
+
+_DEFERRED_KEY = "crud_deferred"
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """Defer commits from the helpers in this module until the block exits.
+
+    Inside the block helpers only stage and flush their rows, which assigns primary keys
+    via ``RETURNING`` without ending the transaction, and they refresh objects only when
+    called with ``refresh=True``. The block commits on success and rolls back on error.
+    Nested blocks join the outermost one.
+    """
+
+    outermost = not db.info.get(_DEFERRED_KEY, False)
+    db.info[_DEFERRED_KEY] = True
+    try:
+        yield db
+        if outermost:
+            db.commit()
+    except BaseException:
+        if outermost:
+            db.rollback()
+        raise
+    finally:
+        if outermost:
+            db.info[_DEFERRED_KEY] = False
+
+
+def _is_deferred(db: Session) -> bool:
+    return db.info.get(_DEFERRED_KEY, False)
+
+
+def _commit(db: Session) -> None:
+    if _is_deferred(db):
+        db.flush()
+    else:
+        db.commit()
+
+
+def _save(db: Session, obj: models.Base, *, refresh: bool) -> None:
+    db.add(obj)
+    if _is_deferred(db):
+        db.flush()
+        if refresh:
+            db.refresh(obj)
+    else:
+        db.commit()
+        db.refresh(obj)
+
 
 def get_or_create_academic_year(
-    db: Session, *, owner_id: int, year: int, start_date: date, end_date: date
+    db: Session,
+    *,
+    owner_id: int,
+    year: int,
+    start_date: date,
+    end_date: date,
+    refresh: bool = False,
 ) -> models.AcademicYear:
     statement = select(models.AcademicYear).where(
         models.AcademicYear.owner_id == owner_id,
@@ -20,14 +81,12 @@ def get_or_create_academic_year(
         academic_year = models.AcademicYear(
             owner_id=owner_id, year=year, start_date=start_date, end_date=end_date
         )
-        db.add(academic_year)
-        db.commit()
-        db.refresh(academic_year)
+        _save(db, academic_year, refresh=refresh)
     return academic_year
 
 
 def create_trimester(
-    db: Session, *, year_id: int, trimester: schemas.TrimesterBase
+    db: Session, *, year_id: int, trimester: schemas.TrimesterBase, refresh: bool = False
 ) -> models.Trimester:
     db_trimester = models.Trimester(
         year_id=year_id,
@@ -36,17 +95,15 @@ def create_trimester(
         end_date=trimester.end_date,
         total_weeks=trimester.total_weeks,
     )
-    db.add(db_trimester)
-    db.commit()
-    db.refresh(db_trimester)
+    _save(db, db_trimester, refresh=refresh)
     return db_trimester
 
 
-def create_level(db: Session, *, year_id: int, data: schemas.LevelBase) -> models.Level:
+def create_level(
+    db: Session, *, year_id: int, data: schemas.LevelBase, refresh: bool = False
+) -> models.Level:
     db_level = models.Level(year_id=year_id, grade=data.grade, subject=data.subject)
-    db.add(db_level)
-    db.commit()
-    db.refresh(db_level)
+    _save(db, db_level, refresh=refresh)
     return db_level
 
 
@@ -56,6 +113,7 @@ def create_topic(
     level_id: int,
     trimester_id: int,
     data: schemas.TopicBase,
+    refresh: bool = False,
 ) -> models.Topic:
     db_topic = models.Topic(
         level_id=level_id,
@@ -66,9 +124,7 @@ def create_topic(
         total_hours=data.total_hours,
         metadata=data.metadata.dict() if data.metadata else None,
     )
-    db.add(db_topic)
-    db.commit()
-    db.refresh(db_topic)
+    _save(db, db_topic, refresh=refresh)
     return db_topic
 
 
@@ -78,6 +134,7 @@ def create_class_session(
     topic_id: int,
     group_id: int,
     data: schemas.ClassSessionCreate,
+    refresh: bool = False,
 ) -> models.ClassSession:
     db_class = models.ClassSession(
         topic_id=topic_id,
@@ -97,6 +154,449 @@ def create_class_session(
             materials=activity.materials,
         )
         db.add(db_activity)
-    db.commit()
-    db.refresh(db_class)
+    _save(db, db_class, refresh=refresh)
     return db_class
+
+
+def create_scheduled_sessions(db: Session, *, rows: Sequence[Mapping[str, Any]]) -> int:
+    """Insert activity-less class sessions (e.g. from the schedule expander) in one batch."""
+
+    if rows:
+        db.execute(insert(models.ClassSession), list(rows))
+    _commit(db)
+    return len(rows)
+
+
+def list_group_classes(
+    db: Session,
+    *,
+    group_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    after: tuple[date, int] | None = None,
+    limit: int = 100,
+) -> list[models.ClassSession]:
+    """Return a group's classes ordered by ``(date, id)`` with activities eager-loaded.
+
+    ``after`` is the ``(date, id)`` keyset cursor of the last row of the previous page.
+    Activities for the whole page are fetched with a single ``SELECT ... IN`` query.
+    """
+
+    statement = (
+        select(models.ClassSession)
+        .where(models.ClassSession.group_id == group_id)
+        .options(selectinload(models.ClassSession.activities))
+        .order_by(models.ClassSession.date, models.ClassSession.id)
+        .limit(limit)
+    )
+    if start_date is not None:
+        statement = statement.where(models.ClassSession.date >= start_date)
+    if end_date is not None:
+        statement = statement.where(models.ClassSession.date <= end_date)
+    if after is not None:
+        statement = statement.where(
+            tuple_(models.ClassSession.date, models.ClassSession.id) > tuple_(*after)
+        )
+    return list(db.scalars(statement))
+
+
+def list_trimester_topics(
+    db: Session,
+    *,
+    level_id: int,
+    trimester_id: int,
+    after_id: int | None = None,
+    limit: int = 100,
+) -> list[models.Topic]:
+    """Return the topics of a level in a trimester ordered by ID, keyset-paginated."""
+
+    statement = (
+        select(models.Topic)
+        .where(models.Topic.level_id == level_id, models.Topic.trimester_id == trimester_id)
+        .order_by(models.Topic.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        statement = statement.where(models.Topic.id > after_id)
+    return list(db.scalars(statement))
+
+
+def bulk_create_class_sessions(
+    db: Session, *, sessions: Sequence[schemas.ClassSessionCreate]
+) -> list[int]:
+    """Insert many class sessions and their activities in a single transaction.
+
+    Sessions are written with one multi-row ``INSERT ... RETURNING`` and activities with
+    one executemany, instead of a flush, commit and refresh per session.
+    """
+
+    if not sessions:
+        return []
+    class_ids = db.scalars(
+        insert(models.ClassSession).returning(
+            models.ClassSession.id, sort_by_parameter_order=True
+        ),
+        [
+            {
+                "topic_id": session.topic_id,
+                "group_id": session.group_id,
+                "date": session.date,
+                "start_time": session.start_time,
+                "end_time": session.end_time,
+            }
+            for session in sessions
+        ],
+    ).all()
+    activity_rows = [
+        {
+            "class_id": class_id,
+            "pre": activity.pre,
+            "while_": activity.while_,
+            "post": activity.post,
+            "materials": activity.materials,
+        }
+        for class_id, session in zip(class_ids, sessions, strict=True)
+        for activity in session.activities
+    ]
+    if activity_rows:
+        db.execute(insert(models.Activity), activity_rows)
+    _commit(db)
+    return list(class_ids)
+
+
+def _upsert(
+    db: Session,
+    model: type[models.Base],
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    keys: Sequence[str],
+    update: Sequence[str] = (),
+) -> dict[tuple[Any, ...], int]:
+    """Insert or update ``rows`` keyed on the unique columns ``keys``.
+
+    Returns a mapping from each natural key to the row's primary key. Conflicting rows
+    have their ``update`` columns overwritten; the remaining columns keep their values.
+    """
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ValueError(
+            f"Upserts need PostgreSQL or SQLite; the database uses the {dialect} dialect"
+        )
+
+    table = model.__table__
+    unique_rows = list({tuple(row[key] for key in keys): row for row in rows}.values())
+    ids: dict[tuple[Any, ...], int] = {}
+    for offset in range(0, len(unique_rows), UPSERT_BATCH_SIZE):
+        statement = dialect_insert(table).values(unique_rows[offset : offset + UPSERT_BATCH_SIZE])
+        # Updating a key column with its own value keeps the conflicting row in RETURNING.
+        set_columns = list(update) or [keys[0]]
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: statement.excluded[column] for column in set_columns},
+        ).returning(table.c.id, *(table.c[key] for key in keys))
+        for row in db.execute(statement):
+            ids[tuple(row[1:])] = row[0]
+    return ids
+
+
+def persist_yearly_plan(db: Session, *, owner_id: int, plan: schemas.YearlyPlan) -> int:
+    """Store a parsed yearly plan as academic year, trimester, level and topic rows.
+
+    Everything is written in one transaction with multi-row upserts keyed on natural
+    keys, so ingesting the same plan again updates the existing rows in place. Returns
+    the academic year ID.
+    """
+
+    trimester_dates = [
+        value
+        for trimester in plan.trimesters
+        for value in (trimester.start_date, trimester.end_date)
+        if value is not None
+    ]
+    year_start = min(trimester_dates, default=date(plan.year, 1, 1))
+    year_end = max(trimester_dates, default=date(plan.year, 12, 31))
+
+    year_ids = _upsert(
+        db,
+        models.AcademicYear,
+        [
+            {
+                "owner_id": owner_id,
+                "year": plan.year,
+                "start_date": year_start,
+                "end_date": year_end,
+            }
+        ],
+        keys=("owner_id", "year"),
+        update=("start_date", "end_date"),
+    )
+    year_id = year_ids[(owner_id, plan.year)]
+
+    trimester_rows = []
+    for trimester in plan.trimesters:
+        start_date = trimester.start_date or year_start
+        end_date = trimester.end_date or year_end
+        total_weeks = trimester.weeks or max(1, ((end_date - start_date) // timedelta(weeks=1)) + 1)
+        trimester_rows.append(
+            {
+                "year_id": year_id,
+                "name": trimester.name,
+                "start_date": start_date,
+                "end_date": end_date,
+                "total_weeks": total_weeks,
+            }
+        )
+    trimester_ids = _upsert(
+        db,
+        models.Trimester,
+        trimester_rows,
+        keys=("year_id", "name"),
+        update=("start_date", "end_date", "total_weeks"),
+    )
+
+    level_ids = _upsert(
+        db,
+        models.Level,
+        [{"year_id": year_id, "grade": plan.grade, "subject": plan.subject}],
+        keys=("year_id", "grade", "subject"),
+    )
+    level_id = level_ids[(year_id, plan.grade, plan.subject)]
+
+    topic_rows = []
+    weeks_by_trimester = {row["name"]: row["total_weeks"] for row in trimester_rows}
+    for trimester in plan.trimesters:
+        trimester_id = trimester_ids[(year_id, trimester.name)]
+        for area in trimester.areas:
+            metadata = schemas.TopicMetadata(
+                **{field: getattr(area, field) for field in schemas.TopicMetadata.__fields__}
+            )
+            topic_rows.append(
+                {
+                    "level_id": level_id,
+                    "trimester_id": trimester_id,
+                    "title": area.title,
+                    "week_start": 1,
+                    "week_end": weeks_by_trimester[trimester.name],
+                    "total_hours": 0,
+                    "metadata": metadata.dict(),
+                }
+            )
+    if topic_rows:
+        _upsert(
+            db,
+            models.Topic,
+            topic_rows,
+            keys=("level_id", "trimester_id", "title"),
+            update=("metadata",),
+        )
+
+    _commit(db)
+    return year_id
+
+
+def get_ingestion_cache_entry(
+    db: Session, *, file_hash: str, extension: str, settings_key: str
+) -> models.IngestionCacheEntry | None:
+    """Return the cached ingestion for an upload and record the hit, if there is one."""
+
+    entry = db.execute(
+        select(models.IngestionCacheEntry).where(
+            models.IngestionCacheEntry.file_hash == file_hash,
+            models.IngestionCacheEntry.extension == extension,
+            models.IngestionCacheEntry.settings_key == settings_key,
+        )
+    ).scalar_one_or_none()
+    if entry is None:
+        return None
+    entry.hit_count += 1
+    entry.last_accessed_at = datetime.now(timezone.utc)
+    _commit(db)
+    return entry
+
+
+def store_ingestion_cache_entry(
+    db: Session,
+    *,
+    file_hash: str,
+    extension: str,
+    settings_key: str,
+    embedding_model: str,
+    result: str,
+    vector_ids: list[str],
+    max_entries: int,
+    max_bytes: int,
+) -> None:
+    """Cache a serialized ingestion result, then evict least recently used entries."""
+
+    now = datetime.now(timezone.utc)
+    _upsert(
+        db,
+        models.IngestionCacheEntry,
+        [
+            {
+                "file_hash": file_hash,
+                "extension": extension,
+                "settings_key": settings_key,
+                "embedding_model": embedding_model,
+                "result": result,
+                "vector_ids": vector_ids,
+                "size_bytes": len(result.encode("utf-8")),
+                "hit_count": 0,
+                "created_at": now,
+                "last_accessed_at": now,
+            }
+        ],
+        keys=("file_hash", "extension", "settings_key"),
+        update=("result", "vector_ids", "size_bytes", "last_accessed_at"),
+    )
+    evict_ingestion_cache(db, max_entries=max_entries, max_bytes=max_bytes)
+
+
+def evict_ingestion_cache(db: Session, *, max_entries: int, max_bytes: int) -> int:
+    """Delete least recently used cache entries beyond the entry and size limits."""
+
+    entry = models.IngestionCacheEntry
+    rows = db.execute(
+        select(entry.id, entry.size_bytes).order_by(
+            entry.last_accessed_at.desc(), entry.id.desc()
+        )
+    ).all()
+    kept_bytes = 0
+    evicted: list[int] = []
+    for index, (entry_id, size_bytes) in enumerate(rows):
+        kept_bytes += size_bytes
+        if index >= max_entries or kept_bytes > max_bytes:
+            evicted.append(entry_id)
+    if evicted:
+        db.execute(delete(entry).where(entry.id.in_(evicted)))
+    _commit(db)
+    return len(evicted)
+
+
+def list_ingestion_cache(db: Session, *, limit: int = 100) -> tuple[int, int, list[Any]]:
+    """Return the entry count, total cached bytes and the most recently used entries."""
+
+    entries, total_bytes = db.execute(
+        select(
+            func.count(models.IngestionCacheEntry.id),
+            func.coalesce(func.sum(models.IngestionCacheEntry.size_bytes), 0),
+        )
+    ).one()
+    items = db.execute(
+        select(
+            models.IngestionCacheEntry.file_hash,
+            models.IngestionCacheEntry.extension,
+            models.IngestionCacheEntry.settings_key,
+            models.IngestionCacheEntry.embedding_model,
+            models.IngestionCacheEntry.vector_ids,
+            models.IngestionCacheEntry.size_bytes,
+            models.IngestionCacheEntry.hit_count,
+            models.IngestionCacheEntry.created_at,
+            models.IngestionCacheEntry.last_accessed_at,
+        )
+        .order_by(models.IngestionCacheEntry.last_accessed_at.desc())
+        .limit(limit)
+    ).all()
+    return entries, total_bytes, items
+
+
+def purge_ingestion_cache(db: Session, *, file_hash: str | None = None) -> int:
+    """Delete every cache entry, or only those for ``file_hash``."""
+
+    statement = delete(models.IngestionCacheEntry)
+    if file_hash is not None:
+        statement = statement.where(models.IngestionCacheEntry.file_hash == file_hash)
+    purged = db.execute(statement).rowcount
+    _commit(db)
+    return purged
+
+
+def find_chunk_fingerprints(
+    db: Session, *, collection: str, embedding_model: str, buckets: Iterable[int]
+) -> list[tuple[int, models.ChunkFingerprint]]:
+    """Return ``(bucket, fingerprint)`` for every stored fingerprint in any of ``buckets``."""
+
+    band, fingerprint = models.ChunkFingerprintBand, models.ChunkFingerprint
+    wanted = list(set(buckets))
+    pairs: list[tuple[int, models.ChunkFingerprint]] = []
+    for offset in range(0, len(wanted), UPSERT_BATCH_SIZE):
+        pairs.extend(
+            db.execute(
+                select(band.bucket, fingerprint)
+                .join(fingerprint, fingerprint.id == band.fingerprint_id)
+                .where(
+                    fingerprint.collection == collection,
+                    fingerprint.embedding_model == embedding_model,
+                    band.bucket.in_(wanted[offset : offset + UPSERT_BATCH_SIZE]),
+                )
+            ).tuples()
+        )
+    return pairs
+
+
+def store_chunk_fingerprints(
+    db: Session,
+    *,
+    collection: str,
+    embedding_model: str,
+    fingerprints: Sequence[Mapping[str, Any]],
+    occurrences: Mapping[int, list[dict[str, str]]] | None = None,
+) -> None:
+    """Store new fingerprints and update the occurrences of existing ones in one commit.
+
+    Each fingerprint maps ``vector_id``, ``signature``, ``occurrences`` and ``buckets``;
+    a stored fingerprint with the same vector id is replaced, buckets included.
+    ``occurrences`` maps existing fingerprint ids to their complete new occurrence lists.
+    """
+
+    band = models.ChunkFingerprintBand
+    now = datetime.now(timezone.utc)
+    ids = _upsert(
+        db,
+        models.ChunkFingerprint,
+        [
+            {
+                "collection": collection,
+                "embedding_model": embedding_model,
+                "vector_id": row["vector_id"],
+                "signature": row["signature"],
+                "occurrences": row["occurrences"],
+                "created_at": now,
+            }
+            for row in fingerprints
+        ],
+        keys=("collection", "embedding_model", "vector_id"),
+        update=("signature", "occurrences"),
+    )
+    buckets = {
+        ids[(collection, embedding_model, row["vector_id"])]: row["buckets"]
+        for row in fingerprints
+    }
+    fingerprint_ids = list(buckets)
+    for offset in range(0, len(fingerprint_ids), UPSERT_BATCH_SIZE):
+        db.execute(
+            delete(band).where(
+                band.fingerprint_id.in_(fingerprint_ids[offset : offset + UPSERT_BATCH_SIZE])
+            )
+        )
+    band_rows = [
+        {"fingerprint_id": fingerprint_id, "bucket": bucket}
+        for fingerprint_id, fingerprint_buckets in buckets.items()
+        for bucket in fingerprint_buckets
+    ]
+    for offset in range(0, len(band_rows), UPSERT_BATCH_SIZE):
+        db.execute(insert(band), band_rows[offset : offset + UPSERT_BATCH_SIZE])
+    if occurrences:
+        db.execute(
+            update(models.ChunkFingerprint),
+            [
+                {"id": fingerprint_id, "occurrences": locations}
+                for fingerprint_id, locations in occurrences.items()
+            ],
+        )
+    _commit(db)
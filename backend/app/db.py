@@ -1,30 +1,178 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from functools import lru_cache
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import (
+    Table,
+    UniqueConstraint,
+    and_,
+    create_engine,
+    delete,
+    exists,
+    func,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .config import get_settings
 
-settings = get_settings()
-
-engine = create_engine(settings.database_url, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
 
 
+def _engine_options(url: URL) -> dict[str, Any]:
+    """Pool and statement-cache options shared by the sync and async engines."""
+
+    settings = get_settings()
+    options: dict[str, Any] = {
+        "echo": False,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "query_cache_size": settings.database_query_cache_size,
+    }
+    if url.get_backend_name() != "sqlite":
+        options["pool_size"] = settings.database_pool_size
+        options["max_overflow"] = settings.database_max_overflow
+    if url.get_driver_name() == "psycopg" and settings.database_prepare_threshold is not None:
+        # Let psycopg prepare frequently executed statements server-side.
+        options["connect_args"] = {"prepare_threshold": settings.database_prepare_threshold}
+    return options
+
+
+def _async_url(url: URL) -> URL:
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+psycopg")
+    return url
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """Create the engine on first use so importing this module stays cheap."""
+
+    url = make_url(get_settings().database_url)
+    return create_engine(url, future=True, **_engine_options(url))
+
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(bind=get_engine(), autoflush=False, autocommit=False, future=True)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Create the async engine (psycopg's async driver for PostgreSQL) on first use."""
+
+    url = _async_url(make_url(get_settings().database_url))
+    return create_async_engine(url, **_engine_options(url))
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # Objects stay readable after commit, as routes serialize them once the session is done.
+    return async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards-compatible access to the former module-level ``engine``/``SessionLocal``.
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def _merge_duplicates(connection: Connection, table: Table, columns: list[str]) -> None:
+    """Keep the lowest id of each group of ``table`` rows sharing ``columns``.
+
+    Foreign keys pointing at a dropped duplicate are moved to the kept row first.
+    """
+
+    keep, duplicate = table.alias("keep"), table.alias("duplicate")
+    same_key = and_(*(keep.c[column] == duplicate.c[column] for column in columns))
+    duplicate_ids = select(duplicate.c.id).where(
+        exists().where(same_key, keep.c.id < duplicate.c.id)
+    )
+    for child in Base.metadata.sorted_tables:
+        for foreign_key in child.foreign_keys:
+            if foreign_key.column.table is not table:
+                continue
+            column = foreign_key.parent
+            kept_id = (
+                select(func.min(keep.c.id))
+                .where(same_key, duplicate.c.id == column)
+                .scalar_subquery()
+            )
+            connection.execute(
+                update(child).where(column.in_(duplicate_ids)).values({column.name: kept_id})
+            )
+    connection.execute(delete(table).where(table.c.id.in_(duplicate_ids)))
+
+
+def _add_unique_indexes(connection: Connection) -> None:
+    """Add the unique constraints (as unique indexes) and indexes ``create_all`` skips.
+
+    ``create_all`` leaves tables that already exist untouched, so databases created before
+    a constraint was declared lack it, and the upserts in ``crud`` have no conflict target.
+    Existing duplicates are merged before the unique index is created.
+    """
+
+    inspector = inspect(connection)
+    quote = connection.dialect.identifier_preparer.quote
+    # Parents first, so merging their duplicates can only create duplicates further down.
+    for table in Base.metadata.sorted_tables:
+        indexes = inspector.get_indexes(table.name)
+        unique_keys = {
+            frozenset(constraint["column_names"])
+            for constraint in inspector.get_unique_constraints(table.name)
+        } | {frozenset(index["column_names"]) for index in indexes if index["unique"]}
+        index_names = {index["name"] for index in indexes}
+        for constraint in table.constraints:
+            if not isinstance(constraint, UniqueConstraint):
+                continue
+            columns = [column.name for column in constraint.columns]
+            if frozenset(columns) in unique_keys:
+                continue
+            _merge_duplicates(connection, table, columns)
+            connection.exec_driver_sql(
+                f"CREATE UNIQUE INDEX {quote(constraint.name)} ON {quote(table.name)} "
+                f"({', '.join(quote(column) for column in columns)})"
+            )
+        for index in table.indexes:
+            if index.name not in index_names:
+                index.create(connection, checkfirst=True)
+
+
 def init_database() -> None:
-    """Create database tables if they do not already exist."""
+    """Create missing database tables, unique constraints and indexes."""
 
     # Importing the models inside the function avoids circular imports while
     # ensuring all SQLAlchemy metadata is registered before ``create_all`` runs.
     from . import models  # noqa: F401 (imported for side effects)
 
-    Base.metadata.create_all(bind=engine)
+    with get_engine().begin() as connection:
+        Base.metadata.create_all(bind=connection)
+        _add_unique_indexes(connection)
@@ -0,0 +1,130 @@
+"""Serve embeddings to local worker processes over a Unix socket.
+
+One process loads the embedding model and every API worker sends it texts, so a node
+holds a single copy of the weights however many workers it runs. Requests from all
+workers share the micro-batching queue of ``EmbeddingBatcher``.
+
+Run with ``python -m backend.app.embedding_server --socket /run/planner/embed.sock`` and
+point the workers at it with ``EMBEDDING_SERVER_SOCKET``.
+
+Each message is a 4-byte big-endian length followed by the body. A request body is JSON
+``{"texts": [...], "normalize": bool}``; the reply is JSON ``{"rows": n, "dim": d}`` or
+``{"error": "..."}``, followed for successes by a second message with the float32
+matrix in row-major order.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import struct
+from pathlib import Path
+
+from . import serialization
+
+_LENGTH = struct.Struct(">I")
+
+
+def send_message(connection: socket.socket, body: bytes) -> None:
+    connection.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def receive_message(connection: socket.socket) -> bytes:
+    (length,) = _LENGTH.unpack(_receive_exactly(connection, _LENGTH.size))
+    return _receive_exactly(connection, length)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = connection.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("Embedding server closed the connection")
+        received += count
+    return bytes(buffer)
+
+
+async def _read_message(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+def _write_message(writer: asyncio.StreamWriter, body: bytes) -> None:
+    writer.write(_LENGTH.pack(len(body)) + body)
+
+
+async def serve(socket_path: Path) -> None:
+    import numpy as np
+
+    from .ingestion.batcher import EmbeddingBatcher
+    from .ingestion.embedder import EmbeddingService
+
+    batchers: dict[bool, EmbeddingBatcher] = {}
+
+    def batcher_for(normalize: bool) -> EmbeddingBatcher:
+        if normalize not in batchers:
+            batchers[normalize] = EmbeddingBatcher(
+                EmbeddingService(normalize_embeddings=normalize, server_socket="")
+            )
+        return batchers[normalize]
+
+    batcher_for(True).embed_texts(["warmup"])  # load the weights before accepting clients
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = serialization.loads(await _read_message(reader))
+                try:
+                    rows = await batcher_for(bool(request.get("normalize", True))).aembed_texts(
+                        request["texts"]
+                    )
+                    matrix = np.asarray(rows, dtype=np.float32)
+                except Exception as exc:  # report to the worker instead of dropping it
+                    _write_message(writer, serialization.dumps({"error": str(exc)}))
+                else:
+                    rows_count, dimension = matrix.shape if matrix.size else (0, 0)
+                    _write_message(
+                        writer, serialization.dumps({"rows": rows_count, "dim": dimension})
+                    )
+                    _write_message(writer, matrix.tobytes())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+    server = await asyncio.start_unix_server(handle, path=str(socket_path))
+    os.chmod(socket_path, 0o660)
+    print(f"Serving embeddings on {socket_path}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Unix socket path (default: EMBEDDING_SERVER_SOCKET).",
+    )
+    args = parser.parse_args()
+
+    from .config import get_settings
+
+    socket_path = args.socket or get_settings().embedding_server_socket
+    if not socket_path:
+        parser.error("--socket or EMBEDDING_SERVER_SOCKET is required")
+    try:
+        asyncio.run(serve(Path(socket_path)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Cross-request micro-batching in front of ``EmbeddingService``."""
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from functools import lru_cache
+from time import monotonic, perf_counter
+from typing import Iterable
+
+from .. import metrics
+from ..config import get_settings
+from .embedder import EmbeddingService
+
+FILL_BUCKETS: tuple[float, ...] = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+@dataclass
+class _Request:
+    texts: list[str]
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=perf_counter)
+
+
+_STOP = _Request([])  # queued by ``close`` to stop the worker
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent ``embed_texts`` calls into shared model batches.
+
+    A single worker thread takes the first queued request, then keeps adding requests
+    until ``batch_size`` texts are collected or ``max_wait`` seconds have passed, runs one
+    encode for all of them and resolves each caller's future with its own rows. A request
+    larger than ``batch_size`` is encoded on its own. ``embed_texts`` blocks the calling
+    thread, ``aembed_texts`` awaits without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        service: EmbeddingService | None = None,
+        *,
+        batch_size: int | None = None,
+        max_wait: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.service = service or EmbeddingService()
+        self.batch_size = batch_size or self.service.batch_size
+        self.max_wait = settings.embedding_batch_max_wait if max_wait is None else max_wait
+        self._queue: queue.SimpleQueue[_Request] = queue.SimpleQueue()
+        self._carry: _Request | None = None
+        self._worker = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def model_name(self) -> str:
+        return self.service.model_name
+
+    def submit(self, texts: Iterable[str]) -> Future:
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+        else:
+            self._queue.put(request)
+        return request.future
+
+    def embed_texts(self, texts: Iterable[str]) -> list[list[float]]:
+        return self.submit(texts).result()
+
+    async def aembed_texts(self, texts: Iterable[str]) -> list[list[float]]:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def _next_batch(self) -> list[_Request] | None:
+        first = self._carry if self._carry is not None else self._queue.get()
+        self._carry = None
+        if first is _STOP:
+            return None
+        batch, size = [first], len(first.texts)
+        deadline = monotonic() + self.max_wait
+        while size < self.batch_size:
+            try:
+                request = self._queue.get(timeout=max(deadline - monotonic(), 0))
+            except queue.Empty:
+                break
+            if request is _STOP or size + len(request.texts) > self.batch_size:
+                self._carry = request  # starts the next batch (or stops the worker)
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # Callers that gave up (e.g. a cancelled ``aembed_texts``) are dropped here.
+            batch = [
+                request for request in batch if request.future.set_running_or_notify_cancel()
+            ]
+            if not batch:
+                continue
+            started = perf_counter()
+            texts = [text for request in batch for text in request.texts]
+            for request in batch:
+                metrics.histogram(
+                    "planner_embedding_queue_wait_seconds",
+                    "Time embedding requests waited for their micro-batch to start.",
+                ).observe(started - request.enqueued_at)
+            metrics.histogram(
+                "planner_embedding_batch_fill",
+                "Texts per micro-batch as a fraction of the batch size.",
+                buckets=FILL_BUCKETS,
+            ).observe(min(len(texts) / self.batch_size, 1.0))
+            metrics.histogram(
+                "planner_embedding_batch_requests",
+                "Caller requests coalesced into each micro-batch.",
+                buckets=metrics.SIZE_BUCKETS,
+            ).observe(len(batch))
+            try:
+                embeddings = self.service.embed_texts(texts)
+            except Exception as exc:  # hand the failure to every waiting caller
+                for request in batch:
+                    request.future.set_exception(exc)
+                continue
+            offset = 0
+            for request in batch:
+                request.future.set_result(embeddings[offset : offset + len(request.texts)])
+                offset += len(request.texts)
+
+
+@lru_cache
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Return the process-wide batcher, starting its worker thread on first use."""
+
+    return EmbeddingBatcher()
+
+
+def get_embedder() -> EmbeddingService | EmbeddingBatcher:
+    """Return the embedder request handlers should use: shared batcher or direct service."""
+
+    if get_settings().embedding_micro_batching:
+        return get_embedding_batcher()
+    return EmbeddingService()
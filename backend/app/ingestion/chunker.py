@@ -1,12 +1,51 @@
 from __future__ import annotations
 
+import math
+import re
+from collections.abc import Callable
 from itertools import count
-from typing import Iterable
+from typing import Any, Iterable
 
+from ..config import get_settings
 from ..schemas import YearlyPlan
 
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough WordPiece/BPE token count: words and punctuation plus a third for subwords."""
+
+    return math.ceil(len(_TOKEN_PATTERN.findall(text)) * 4 / 3)
+
+
+def chunk_yearly_plan(
+    plan: YearlyPlan,
+    *,
+    max_tokens: int | None = None,
+    min_tokens: int | None = None,
+    overlap_items: int | None = None,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> Iterable[dict[str, Any]]:
+    """Yield one chunk per (area, section), bounded by ``max_tokens``.
+
+    A section longer than ``max_tokens`` is split at item boundaries into parts that repeat
+    the last ``overlap_items`` items of the previous part; its metadata records ``part``,
+    ``parts``, ``item_start``/``item_end`` (1-based, inclusive) and ``overlap_items``. A
+    section under ``min_tokens`` is merged into the following sections of the same area
+    while the result stays within ``max_tokens``; ``topic`` then lists the merged sections.
+    Zero disables splitting or merging; ``None`` uses the ``chunk_*`` settings.
+
+    Tokens are counted once per header and item and summed, which slightly overestimates
+    tokenizer counts (special tokens are counted per item) and so keeps chunks under the cap.
+    """
+
+    settings = get_settings()
+    max_tokens = settings.chunk_max_tokens if max_tokens is None else max_tokens
+    min_tokens = settings.chunk_min_tokens if min_tokens is None else min_tokens
+    overlap_items = settings.chunk_overlap_items if overlap_items is None else overlap_items
+    if not max_tokens and not min_tokens:
+        count_tokens = len  # sizes are unused, skip tokenizing
 
-def chunk_yearly_plan(plan: YearlyPlan) -> Iterable[dict[str, str]]:
     counter = count(1)
     for trimester_index, trimester in enumerate(plan.trimesters, start=1):
         for area in trimester.areas:
@@ -17,19 +56,96 @@ def chunk_yearly_plan(plan: YearlyPlan) -> Iterable[dict[str, str]]:
                 "trimester_name": trimester.name,
                 "area_title": area.title,
             }
-            for key, values in _iter_area_lists(area):
-                if not values:
-                    continue
+            pieces = [
+                piece
+                for key, values in _iter_area_lists(area)
+                if values
+                for piece in _split_section(
+                    area.title, key, values, max_tokens, overlap_items, count_tokens
+                )
+            ]
+            for text, metadata in _merge_small(pieces, min_tokens, max_tokens):
                 chunk_id = f"{plan.grade}_{plan.subject}_t{trimester_index}_{next(counter)}"
-                text = f"{area.title} — {key.title()}\n" + "\n".join(values)
-                metadata = base_metadata | {"topic": key}
                 yield {
                     "id": chunk_id,
                     "text": text,
-                    "metadata": metadata,
+                    "metadata": base_metadata | metadata,
                 }
 
 
+def _section_text(title: str, key: str, values: list[str]) -> str:
+    return f"{title} — {key.title()}\n" + "\n".join(values)
+
+
+def _split_section(
+    title: str,
+    key: str,
+    values: list[str],
+    max_tokens: int,
+    overlap_items: int,
+    count_tokens: Callable[[str], int],
+) -> list[tuple[str, dict[str, Any], int]]:
+    header_tokens = count_tokens(_section_text(title, key, []))
+    item_tokens = [count_tokens(value) for value in values]
+    total = header_tokens + sum(item_tokens)
+    if not max_tokens or total <= max_tokens:
+        return [(_section_text(title, key, values), {"topic": key}, total)]
+
+    ranges: list[tuple[int, int, int]] = []
+    start = 0
+    while start < len(values):
+        # Always take at least one item, even if it alone exceeds the cap.
+        end, used = start + 1, header_tokens + item_tokens[start]
+        while end < len(values) and used + item_tokens[end] <= max_tokens:
+            used += item_tokens[end]
+            end += 1
+        ranges.append((start, end, used))
+        if end == len(values):
+            break
+        # Repeat up to ``overlap_items`` trailing items, but always make progress.
+        start = max(end - overlap_items, start + 1)
+
+    previous_ends = [0] + [end for _, end, _ in ranges[:-1]]
+    return [
+        (
+            _section_text(title, key, values[start:end]),
+            {
+                "topic": key,
+                "part": part,
+                "parts": len(ranges),
+                "item_start": start + 1,
+                "item_end": end,
+                "overlap_items": max(previous_end - start, 0),
+            },
+            used,
+        )
+        for part, ((start, end, used), previous_end) in enumerate(
+            zip(ranges, previous_ends), start=1
+        )
+    ]
+
+
+def _merge_small(
+    pieces: list[tuple[str, dict[str, Any], int]], min_tokens: int, max_tokens: int
+) -> Iterable[tuple[str, dict[str, Any]]]:
+    pending: tuple[str, dict[str, Any], int] | None = None
+    for text, metadata, tokens in pieces:
+        if pending is not None:
+            if "part" not in metadata and (not max_tokens or pending[2] + tokens <= max_tokens):
+                text = f"{pending[0]}\n\n{text}"
+                metadata = {"topic": f"{pending[1]['topic']},{metadata['topic']}"}
+                tokens += pending[2]
+            else:
+                yield pending[:2]
+            pending = None
+        if min_tokens and "part" not in metadata and tokens < min_tokens:
+            pending = (text, metadata, tokens)
+        else:
+            yield text, metadata
+    if pending is not None:
+        yield pending[:2]
+
+
 def _iter_area_lists(area) -> Iterable[tuple[str, list[str]]]:
     for key in (
         "objectives",
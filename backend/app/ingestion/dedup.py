@@ -0,0 +1,88 @@
+"""MinHash signatures and LSH band buckets for near-duplicate chunk detection.
+
+A signature keeps, for each of ``num_perm`` random hash functions, the minimum hash over
+the text's word shingles; the fraction of positions where two signatures agree estimates
+the Jaccard similarity of their shingle sets. Splitting a signature into ``bands`` bands
+and hashing each band gives LSH buckets: texts sharing any bucket are candidate
+duplicates. With 128 permutations in 16 bands a pair at Jaccard 0.9 shares a bucket with
+probability above 0.9999, a pair at 0.8 about 0.95 and a pair at 0.5 about 0.06.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+SHINGLE_SIZE = 3
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_SEED = 1  # changing it invalidates every stored signature
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """Return the lower-cased word ``size``-grams of ``text`` (the whole text if shorter)."""
+
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[index : index + size]) for index in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128) -> None:
+        generator = np.random.default_rng(_SEED)
+        self.num_perm = num_perm
+        self._a = generator.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the ``uint32`` MinHash signature of ``text``."""
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(text)),
+            dtype=np.uint64,
+        )
+        # Universal hashing (a * x + b) mod p; the product wraps at 64 bits like datasketch.
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+@lru_cache
+def get_minhasher(num_perm: int) -> MinHasher:
+    return MinHasher(num_perm)
+
+
+def band_buckets(signature: np.ndarray, bands: int) -> list[int]:
+    """Hash each of ``bands`` slices of ``signature`` into a signed 64-bit bucket id.
+
+    The band index and width are part of the hash, so buckets from different bands or
+    band layouts never collide by construction.
+    """
+
+    rows = len(signature) // bands
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                band.to_bytes(2, "big")
+                + rows.to_bytes(2, "big")
+                + signature[band * rows : (band + 1) * rows].tobytes(),
+                digest_size=8,
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for band in range(bands)
+    ]
+
+
+def estimate_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures."""
+
+    if len(left) != len(right):
+        return 0.0
+    return float(np.count_nonzero(left == right)) / len(left)
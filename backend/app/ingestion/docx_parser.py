@@ -1,14 +1,73 @@
 from __future__ import annotations
 
+import zipfile
+from collections.abc import Iterator
 from pathlib import Path
 
-from docx import Document
-
 from ..schemas import YearlyPlan
 from .text_parser import parse_yearly_plan_from_lines
 
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY = f"{_W}body"
+_PARAGRAPH = f"{_W}p"
+_RUN = f"{_W}r"
+_TEXT = f"{_W}t"
+_BREAK = f"{_W}br"
+_TYPE = f"{_W}type"
+# Word saves a text box twice: as DrawingML under ``mc:Choice`` and as VML under ``mc:Fallback``.
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+# Run content that stands for a character; ``w:br`` only does for line breaks.
+_RUN_CHARACTERS = {
+    f"{_W}tab": "\t",
+    f"{_W}ptab": "\t",
+    f"{_W}cr": "\n",
+    f"{_W}noBreakHyphen": "-",
+}
+
+
+def _paragraph_text(paragraph) -> str:
+    parts: list[str] = []
+    for element in paragraph.iter(_TEXT, _BREAK, *_RUN_CHARACTERS):
+        if element.getparent().tag != _RUN:
+            continue  # e.g. tab stops in the paragraph properties
+        if element.tag == _TEXT:
+            parts.append(element.text or "")
+        elif element.tag == _BREAK:
+            if element.get(_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_CHARACTERS[element.tag])
+    return "".join(parts)
+
+
+def iter_docx_lines(path: Path) -> Iterator[str]:
+    """Yield the text of every paragraph in ``word/document.xml``, in document order.
+
+    The XML is streamed with ``iterparse`` and every paragraph is discarded once read,
+    together with the finished top-level blocks before it, so memory stays flat regardless
+    of document size. Paragraphs inside table cells are yielded in reading order (row by
+    row, cell by cell), as are paragraphs of content controls and text boxes, which
+    ``python-docx``'s ``document.paragraphs`` skips. The ``mc:Fallback`` copy of a text box
+    is skipped so its text is read once. Run text follows ``python-docx``:
+    tabs become ``\\t`` and line breaks ``\\n``.
+    """
+
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as stream:
+        for _, paragraph in etree.iterparse(stream, events=("end",), tag=_PARAGRAPH):
+            if next(paragraph.iterancestors(_FALLBACK), None) is None:
+                yield _paragraph_text(paragraph)
+            # Text boxes nest paragraphs in runs, so only the emptied element survives here.
+            paragraph.clear(keep_tail=True)
+            block = paragraph
+            parent = block.getparent()
+            while parent is not None and parent.tag != _BODY:
+                block, parent = parent, parent.getparent()
+            if parent is not None:
+                while block.getprevious() is not None:
+                    del parent[0]
+
 
 def parse_yearly_plan_docx(path: Path) -> YearlyPlan:
-    document = Document(path)
-    lines = (paragraph.text for paragraph in document.paragraphs)
-    return parse_yearly_plan_from_lines(lines)
+    return parse_yearly_plan_from_lines(iter_docx_lines(path))
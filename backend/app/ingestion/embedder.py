@@ -1,12 +1,150 @@
 from __future__ import annotations
 
-from typing import Iterable
-
-from sentence_transformers import SentenceTransformer
+import gc
+import hashlib
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
 
+from .. import metrics
 from ..config import get_settings
 
-settings = get_settings()
+if TYPE_CHECKING:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+HASHING_MODEL_PREFIX = "hashing:"
+
+
+class HashingEmbeddingModel:
+    """Deterministic offline stand-in for a SentenceTransformer.
+
+    Selected with ``EMBEDDING_MODEL=hashing:<dimension>``. Each token is hashed into a
+    signed bucket, so similar texts get similar vectors without downloading weights.
+    Meant for benchmarks, load tests and development, not for retrieval quality.
+    """
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+
+    def encode(
+        self,
+        sentences: Sequence[str],
+        *,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        import numpy as np
+
+        vectors = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            for token in text.lower().split():
+                value = int.from_bytes(
+                    hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little"
+                )
+                vectors[row, value % self.dimension] += 1.0 if value >> 63 else -1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors
+
+
+class RemoteEmbeddingModel:
+    """Client for ``backend.app.embedding_server`` with the ``encode`` signature we use.
+
+    Selected with ``EMBEDDING_SERVER_SOCKET``. Each thread keeps its own connection; the
+    server loads the weights once and batches requests from every worker process.
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self._local = threading.local()
+
+    def _connection(self):
+        import socket
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(self.socket_path)
+            self._local.connection = connection
+        return connection
+
+    def encode(
+        self,
+        sentences: Sequence[str],
+        *,
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ) -> np.ndarray:
+        import numpy as np
+
+        from .. import serialization
+        from ..embedding_server import receive_message, send_message
+
+        request = serialization.dumps(
+            {"texts": list(sentences), "normalize": normalize_embeddings}
+        )
+        for attempt in (1, 2):  # reconnect once if the server restarted
+            try:
+                connection = self._connection()
+                send_message(connection, request)
+                header = serialization.loads(receive_message(connection))
+                if "error" in header:
+                    raise RuntimeError(f"Embedding server error: {header['error']}")
+                body = receive_message(connection)
+                break
+            except OSError:
+                connection = getattr(self._local, "connection", None)
+                self._local.connection = None
+                if connection is not None:
+                    connection.close()
+                if attempt == 2:
+                    raise
+        return np.frombuffer(body, dtype=np.float32).reshape(header["rows"], header["dim"])
+
+
+@lru_cache
+def get_remote_model(socket_path: str) -> RemoteEmbeddingModel:
+    return RemoteEmbeddingModel(socket_path)
+
+
+@lru_cache
+def load_model(model_name: str, device: str | None) -> SentenceTransformer | Any:
+    """Load (once per process) a SentenceTransformer, importing torch only when needed."""
+
+    if model_name.startswith(HASHING_MODEL_PREFIX):
+        return HashingEmbeddingModel(int(model_name[len(HASHING_MODEL_PREFIX) :]))
+
+    with metrics.stage("embed.load_model"):
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name, device=device)
+
+
+def preload_model() -> None:
+    """Load the configured model in a parent process so forked workers share its pages.
+
+    Used by ``gunicorn.conf.py`` with ``preload_app``. Gradients are disabled so workers
+    only ever read the weights, and the loaded objects are moved out of the garbage
+    collector's reach so collections in the workers do not copy their pages. No encode is
+    run here: thread pools started before ``fork`` do not survive into the workers.
+    """
+
+    settings = get_settings()
+    if settings.embedding_server_socket:
+        return  # the embedding server holds the weights
+    model = load_model(settings.embedding_model, settings.embedding_device)
+    if hasattr(model, "parameters"):
+        model.eval()
+        for parameter in model.parameters():
+            parameter.requires_grad_(False)
+    gc.collect()
+    gc.freeze()
 
 
 class EmbeddingService:
@@ -17,7 +155,9 @@ class EmbeddingService:
         device: str | None = None,
         batch_size: int | None = None,
         normalize_embeddings: bool | None = None,
+        server_socket: str | None = None,
     ) -> None:
+        settings = get_settings()
         self.model_name = model or settings.embedding_model
         self.device = device or settings.embedding_device
         self.batch_size = batch_size or settings.embedding_batch_size
@@ -26,17 +166,36 @@ class EmbeddingService:
             if normalize_embeddings is not None
             else settings.embedding_normalize
         )
-        self._model = SentenceTransformer(self.model_name, device=self.device)
+        # An empty string forces local encoding, as the embedding server itself does.
+        self.server_socket = (
+            settings.embedding_server_socket if server_socket is None else server_socket
+        )
+
+    @property
+    def _model(self) -> SentenceTransformer | RemoteEmbeddingModel:
+        if self.server_socket:
+            return get_remote_model(self.server_socket)
+        return load_model(self.model_name, self.device)
 
     def embed_texts(self, texts: Iterable[str]) -> list[list[float]]:
         text_list = list(texts)
         if not text_list:
             return []
-        embeddings = self._model.encode(
-            text_list,
-            batch_size=self.batch_size,
-            show_progress_bar=False,
-            convert_to_numpy=True,
-            normalize_embeddings=self.normalize_embeddings,
-        )
+        model = self._model
+        with metrics.stage("embed"):
+            embeddings = model.encode(
+                text_list,
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=self.normalize_embeddings,
+            )
+        metrics.counter(
+            "planner_embedded_texts_total", "Texts embedded.", model=self.model_name
+        ).inc(len(text_list))
+        metrics.histogram(
+            "planner_embedding_request_size",
+            "Texts per embed_texts call.",
+            buckets=metrics.SIZE_BUCKETS,
+        ).observe(len(text_list))
         return embeddings.tolist()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from .. import metrics
 from ..schemas import YearlyPlan, YearlyPlanIngestionResult
 from .chunker import chunk_yearly_plan
 from .docx_parser import parse_yearly_plan_docx
@@ -18,18 +19,29 @@ def ingest_yearly_plan(path: Path) -> YearlyPlanIngestionResult:
     if extension not in SUPPORTED_EXTENSIONS:
         raise ValueError(f"Unsupported file extension: {extension}")
 
+    metrics.counter(
+        "planner_ingested_bytes_total", "Bytes of ingested plan files.", extension=extension
+    ).inc(path.stat().st_size)
     structured: YearlyPlan
-    if extension == ".docx":
-        structured = parse_yearly_plan_docx(path)
-    elif extension == ".pdf":
-        structured = parse_yearly_plan_pdf(path)
-    elif extension == ".pptx":
-        structured = parse_yearly_plan_pptx(path)
-    elif extension in {".txt", ".md"}:
-        lines = path.read_text(encoding="utf-8").splitlines()
-        structured = parse_yearly_plan_from_lines(lines)
-    else:
-        raise ValueError(f"Unsupported file extension: {extension}")
-
-    chunks = list(chunk_yearly_plan(structured))
+    with metrics.stage(f"ingest.parse{extension}"):
+        if extension == ".docx":
+            structured = parse_yearly_plan_docx(path)
+        elif extension == ".pdf":
+            structured = parse_yearly_plan_pdf(path)
+        elif extension == ".pptx":
+            structured = parse_yearly_plan_pptx(path)
+        elif extension in {".txt", ".md"}:
+            lines = path.read_text(encoding="utf-8").splitlines()
+            structured = parse_yearly_plan_from_lines(lines)
+        else:
+            raise ValueError(f"Unsupported file extension: {extension}")
+
+    with metrics.stage("ingest.chunk"):
+        chunks = list(chunk_yearly_plan(structured))
+    metrics.counter(
+        "planner_ingested_documents_total", "Parsed plan files.", extension=extension
+    ).inc()
+    metrics.counter("planner_ingested_chunks_total", "Chunks produced by ingestion.").inc(
+        len(chunks)
+    )
     return YearlyPlanIngestionResult(structured=structured, chunks=chunks)
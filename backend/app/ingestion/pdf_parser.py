@@ -2,13 +2,13 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from pypdf import PdfReader
-
 from ..schemas import YearlyPlan
 from .text_parser import parse_yearly_plan_from_lines
 
 
 def parse_yearly_plan_pdf(path: Path) -> YearlyPlan:
+    from pypdf import PdfReader
+
     reader = PdfReader(str(path))
     lines: list[str] = []
     for page in reader.pages:
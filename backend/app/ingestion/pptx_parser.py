@@ -1,26 +1,169 @@
 from __future__ import annotations
 
+import posixpath
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from pptx import Presentation
-
+from ..config import get_settings
 from ..schemas import YearlyPlan
 from .text_parser import parse_yearly_plan_from_lines
 
+_P = "{http://schemas.openxmlformats.org/presentationml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_RELATIONSHIP = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_RELATIONSHIP_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_OFFICE_DOCUMENT = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+_TABLE_URI = "http://schemas.openxmlformats.org/drawingml/2006/table"
+_SHAPE_TREE = f"{_P}spTree"
+_SHAPE = f"{_P}sp"
+_GRAPHIC_FRAME = f"{_P}graphicFrame"
+# Every element python-pptx counts as a shape; only ``p:sp`` and ``p:graphicFrame`` hold text.
+_SHAPE_TAGS = (
+    _SHAPE,
+    _GRAPHIC_FRAME,
+    f"{_P}grpSp",
+    f"{_P}cxnSp",
+    f"{_P}pic",
+    f"{_P}contentPart",
+)
+_PARAGRAPH = f"{_A}p"
+_TEXT = f"{_A}t"
+_TEXT_RUNS = {f"{_A}r", f"{_A}fld"}
+_BREAK = f"{_A}br"
+
+
+def _paragraph_text(paragraph) -> str:
+    # python-pptx's ``_Paragraph.text``: runs and fields, with "\v" for each line break.
+    parts: list[str] = []
+    for child in paragraph:
+        if child.tag in _TEXT_RUNS:
+            parts.append(child.findtext(_TEXT) or "")
+        elif child.tag == _BREAK:
+            parts.append("\v")
+    return "".join(parts)
+
+
+def _shape_lines(shape) -> Iterator[str]:
+    if shape.tag == _SHAPE:
+        body = shape.find(f"{_P}txBody")
+        if body is not None:
+            for paragraph in body.iterfind(_PARAGRAPH):
+                text = _paragraph_text(paragraph)
+                if text:
+                    yield text
+        return
+    data = shape.find(f"{_A}graphic/{_A}graphicData")
+    if data is None or data.get("uri") != _TABLE_URI:
+        return
+    for row in data.iterfind(f"{_A}tbl/{_A}tr"):
+        for cell in row.iterfind(f"{_A}tc"):
+            text = "\n".join(
+                _paragraph_text(paragraph)
+                for paragraph in cell.iterfind(f"{_A}txBody/{_PARAGRAPH}")
+            )
+            if text:
+                yield from text.splitlines()
+
+
+def _part_relationships(archive: zipfile.ZipFile, part: str) -> dict[str, tuple[str, str]]:
+    """Map relationship ids of ``part`` (``""`` for the package) to (type, part name)."""
+
+    from lxml import etree
+
+    directory, name = posixpath.split(part)
+    try:
+        root = etree.fromstring(archive.read(posixpath.join(directory, "_rels", f"{name}.rels")))
+    except KeyError:
+        return {}
+    relationships = {}
+    for relationship in root.iter(_RELATIONSHIP):
+        if relationship.get("TargetMode") == "External":
+            continue
+        target = relationship.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(posixpath.join(directory, target))
+        relationships[relationship.get("Id")] = (relationship.get("Type"), target)
+    return relationships
+
+
+def _slide_part_names(archive: zipfile.ZipFile) -> list[str]:
+    """Return the slide XML parts in presentation order (``p:sldIdLst``)."""
+
+    from lxml import etree
+
+    presentation = next(
+        target
+        for kind, target in _part_relationships(archive, "").values()
+        if kind == _OFFICE_DOCUMENT
+    )
+    slides = _part_relationships(archive, presentation)
+    root = etree.fromstring(archive.read(presentation))
+    return [
+        slides[slide_id.get(_RELATIONSHIP_ID)][1]
+        for slide_id in root.iterfind(f"{_P}sldIdLst/{_P}sldId")
+    ]
+
+
+def _iter_slide_lines(archive: zipfile.ZipFile, part: str) -> Iterator[str]:
+    from lxml import etree
+
+    with archive.open(part) as stream:
+        for _, shape in etree.iterparse(stream, events=("end",), tag=_SHAPE_TAGS):
+            tree = shape.getparent()
+            if tree is None or tree.tag != _SHAPE_TREE:
+                continue  # inside a group, which python-pptx does not descend into
+            yield from _shape_lines(shape)
+            shape.clear(keep_tail=True)
+            while shape.getprevious() is not None:
+                del tree[0]
+
+
+_worker_archive: zipfile.ZipFile | None = None
+
+
+def _open_worker_archive(path: Path) -> None:
+    # Reading the central directory is the costly part of opening a deck: once per worker.
+    global _worker_archive
+    _worker_archive = zipfile.ZipFile(path)
+
+
+def _read_slide(part: str) -> list[str]:
+    assert _worker_archive is not None
+    return list(_iter_slide_lines(_worker_archive, part))
+
+
+def iter_pptx_lines(path: Path, *, workers: int | None = None) -> Iterator[str]:
+    """Yield the text lines of every slide, in slide order, as ``python-pptx`` extracts them.
+
+    Slide parts are streamed from the archive with ``iterparse`` and each top-level shape is
+    discarded once read, so only one shape of one slide is held in memory. Text frames yield
+    their non-empty paragraphs (line breaks as ``\\v``) and tables the lines of their
+    non-empty cells, row by row; shapes inside groups are skipped, as with
+    ``slide.shapes``. With ``workers`` above one (``None`` uses ``pptx_parse_workers``),
+    slides are parsed in a process pool and their lines still yielded in slide order.
+    """
+
+    workers = get_settings().pptx_parse_workers if workers is None else workers
+    with zipfile.ZipFile(path) as archive:
+        parts = _slide_part_names(archive)
+        if workers <= 1 or len(parts) < 2:
+            for part in parts:
+                yield from _iter_slide_lines(archive, part)
+            return
+    workers = min(workers, len(parts))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_open_worker_archive, initargs=(path,)
+    ) as executor:
+        chunksize = max(len(parts) // (workers * 4), 1)
+        for lines in executor.map(_read_slide, parts, chunksize=chunksize):
+            yield from lines
+
 
 def parse_yearly_plan_pptx(path: Path) -> YearlyPlan:
-    presentation = Presentation(path)
-    lines: list[str] = []
-    for slide in presentation.slides:
-        for shape in slide.shapes:
-            if getattr(shape, "has_text_frame", False) and shape.has_text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    if paragraph.text:
-                        lines.append(paragraph.text)
-            if getattr(shape, "has_table", False) and shape.has_table:
-                for row in shape.table.rows:
-                    for cell in row.cells:
-                        text = cell.text
-                        if text:
-                            lines.extend(text.splitlines())
-    return parse_yearly_plan_from_lines(lines)
+    return parse_yearly_plan_from_lines(iter_pptx_lines(path))
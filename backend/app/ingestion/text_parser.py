@@ -84,6 +84,8 @@ def parse_yearly_plan_from_lines(lines: Iterable[str]) -> YearlyPlan:
         trimester_info = parse_trimester_header(text)
         if trimester_info:
             if current_trimester:
+                if current_area:
+                    current_trimester.areas.append(current_area)
                 trimesters.append(current_trimester)
             current_trimester = YearlyPlanTrimester(
                 name=str(trimester_info.get("name", text.strip())),
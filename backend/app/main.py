@@ -1,16 +1,33 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from . import metrics
+from .api.responses import ModelJSONResponse
 from .api.routes import router
 from .config import get_settings
+from .warmup import warmup
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=ModelJSONResponse)
 app.include_router(router)
 
 
+@app.on_event("startup")
+def on_startup() -> None:
+    if settings.warmup_on_startup:
+        warmup()
+
+
 @app.get("/health")
 def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
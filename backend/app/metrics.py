@@ -0,0 +1,212 @@
+"""In-process counters and histograms for the ingestion and planning pipelines.
+
+Metrics are kept per process and rendered in the Prometheus text format by ``render``
+(served at ``/metrics``). ``stage`` times one pipeline stage into
+``planner_stage_duration_seconds`` and also reports it to any active ``record_stages``
+block, which is how ``run_pipeline.py --profile`` builds its per-stage breakdown.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+# Upper bounds (seconds) of the default latency buckets, roughly log-spaced so that
+# both fast local stages and slow upstream generations resolve well.
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0,
+    30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0,
+)
+# The model-latency histogram drops the sub-50 ms buckets: no completion returns that fast,
+# and ``HedgedCompletion`` reads percentiles from it.
+HEDGE_LATENCY_BUCKETS: tuple[float, ...] = tuple(
+    bound for bound in LATENCY_BUCKETS if bound >= 0.05
+)
+SIZE_BUCKETS: tuple[float, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+
+class Histogram:
+    """Thread-safe bucketed histogram."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._total = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return self._total
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+            self._sum += value
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return the bucket upper bound covering ``quantile`` of observations."""
+
+        with self._lock:
+            if not self._total:
+                return None
+            target = quantile * self._total
+            cumulative = 0
+            for index, bucket_count in enumerate(self._counts):
+                cumulative += bucket_count
+                if cumulative >= target:
+                    return self.buckets[min(index, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "count": self._total,
+                "sum": self._sum,
+                "buckets": dict(zip(self.buckets, self._counts, strict=False)),
+            }
+
+
+_lock = threading.Lock()
+_help: dict[str, tuple[str, str]] = {}
+_counters: dict[tuple[str, Labels], Counter] = {}
+_histograms: dict[tuple[str, Labels], Histogram] = {}
+
+
+def _key(name: str, labels: dict[str, str]) -> tuple[str, Labels]:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def counter(name: str, description: str, **labels: str) -> Counter:
+    """Return the process-wide counter ``name`` for ``labels``, creating it on demand."""
+
+    key = _key(name, labels)
+    with _lock:
+        metric = _counters.get(key)
+        if metric is None:
+            _help.setdefault(name, ("counter", description))
+            metric = _counters[key] = Counter()
+        return metric
+
+
+def histogram(
+    name: str,
+    description: str,
+    *,
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+    **labels: str,
+) -> Histogram:
+    """Return the process-wide histogram ``name`` for ``labels``, creating it on demand."""
+
+    key = _key(name, labels)
+    with _lock:
+        metric = _histograms.get(key)
+        if metric is None:
+            _help.setdefault(name, ("histogram", description))
+            metric = _histograms[key] = Histogram(buckets)
+        return metric
+
+
+_stage_recorders: ContextVar[tuple[dict[str, list[float]], ...]] = ContextVar(
+    "stage_recorders", default=()
+)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a pipeline stage (e.g. ``ingest.parse``, ``planner.completion``)."""
+
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - started
+        histogram(
+            "planner_stage_duration_seconds", "Duration of pipeline stages.", stage=name
+        ).observe(elapsed)
+        for recorder in _stage_recorders.get():
+            recorder.setdefault(name, []).append(elapsed)
+
+
+@contextmanager
+def record_stages() -> Iterator[dict[str, list[float]]]:
+    """Collect the durations of every stage run inside the block, keyed by stage name."""
+
+    recorder: dict[str, list[float]] = {}
+    token = _stage_recorders.set(_stage_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _stage_recorders.reset(token)
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render() -> str:
+    """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items())
+        descriptions = dict(_help)
+
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    def header(name: str) -> None:
+        if name not in seen:
+            seen.add(name)
+            kind, description = descriptions[name]
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), metric in counters:
+        header(name)
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+    for (name, labels), metric in histograms:
+        header(name)
+        snapshot = metric.snapshot()
+        cumulative = 0
+        for bound, bucket_count in snapshot["buckets"].items():  # type: ignore[union-attr]
+            cumulative += bucket_count
+            bucket_labels = _format_labels(labels, (("le", _format_value(bound)),))
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        total = snapshot["count"]
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {total}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(snapshot['sum'])}")
+        lines.append(f"{name}_count{_format_labels(labels)} {total}")
+    return "\n".join(lines) + "\n"
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
-from datetime import date, time
+from datetime import date, datetime, time
 from typing import Any
 
-from sqlalchemy import Date, ForeignKey, Integer, JSON, String, Time
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    LargeBinary,
+    String,
+    Text,
+    Time,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .db import Base
@@ -23,6 +36,7 @@ class User(Base):
 
 class AcademicYear(Base):
     __tablename__ = "academic_years"
+    __table_args__ = (UniqueConstraint("owner_id", "year", name="uq_academic_years_owner_year"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     year: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -41,6 +55,7 @@ class AcademicYear(Base):
 
 class Trimester(Base):
     __tablename__ = "trimesters"
+    __table_args__ = (UniqueConstraint("year_id", "name", name="uq_trimesters_year_name"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     year_id: Mapped[int] = mapped_column(ForeignKey("academic_years.id"), nullable=False)
@@ -60,6 +75,9 @@ class Trimester(Base):
 
 class Level(Base):
     __tablename__ = "levels"
+    __table_args__ = (
+        UniqueConstraint("year_id", "grade", "subject", name="uq_levels_year_grade_subject"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     year_id: Mapped[int] = mapped_column(ForeignKey("academic_years.id"), nullable=False)
@@ -97,6 +115,12 @@ class Group(Base):
 
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        UniqueConstraint(
+            "level_id", "trimester_id", "title", name="uq_topics_level_trimester_title"
+        ),
+        Index("ix_topics_level_trimester", "level_id", "trimester_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     level_id: Mapped[int] = mapped_column(ForeignKey("levels.id"), nullable=False)
@@ -116,6 +140,7 @@ class Topic(Base):
 
 class ClassSession(Base):
     __tablename__ = "classes"
+    __table_args__ = (Index("ix_classes_group_date", "group_id", "date", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     group_id: Mapped[int] = mapped_column(ForeignKey("groups.id"), nullable=False)
@@ -135,7 +160,7 @@ class Activity(Base):
     __tablename__ = "activities"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    class_id: Mapped[int] = mapped_column(ForeignKey("classes.id"), nullable=False)
+    class_id: Mapped[int] = mapped_column(ForeignKey("classes.id"), nullable=False, index=True)
     pre: Mapped[str] = mapped_column(String, nullable=True)
     while_: Mapped[str] = mapped_column("while", String, nullable=True)
     post: Mapped[str] = mapped_column(String, nullable=True)
@@ -167,3 +192,64 @@ class Resource(Base):
     file_url: Mapped[str] = mapped_column(String(255), nullable=False)
 
     level: Mapped[Level] = relationship("Level", back_populates="resources")
+
+
+class IngestionCacheEntry(Base):
+    __tablename__ = "ingestion_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "file_hash",
+            "extension",
+            "settings_key",
+            name="uq_ingestion_cache_hash_extension_settings",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    file_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    extension: Mapped[str] = mapped_column(String(16), nullable=False)
+    # Hash of the settings that shape the cached result (see ``routes._ingestion_settings_key``).
+    settings_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    embedding_model: Mapped[str] = mapped_column(String(255), nullable=False)
+    result: Mapped[str] = mapped_column(Text, nullable=False)
+    vector_ids: Mapped[Any] = mapped_column(JSON, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+
+class ChunkFingerprint(Base):
+    """MinHash signature of a stored chunk and every plan location whose text it stands for."""
+
+    __tablename__ = "chunk_fingerprints"
+    __table_args__ = (
+        UniqueConstraint(
+            "collection",
+            "embedding_model",
+            "vector_id",
+            name="uq_chunk_fingerprints_collection_model_vector",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    collection: Mapped[str] = mapped_column(String(255), nullable=False)
+    embedding_model: Mapped[str] = mapped_column(String(255), nullable=False)
+    vector_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    signature: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    occurrences: Mapped[Any] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ChunkFingerprintBand(Base):
+    """One LSH bucket of a fingerprint; fingerprints sharing a bucket are duplicate candidates."""
+
+    __tablename__ = "chunk_fingerprint_bands"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    fingerprint_id: Mapped[int] = mapped_column(
+        ForeignKey("chunk_fingerprints.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    bucket: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
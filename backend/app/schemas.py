@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, time
+from datetime import date, datetime, time
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -47,6 +47,11 @@ class ClassSessionRead(ClassSessionBase):
         orm_mode = True
 
 
+class ClassSessionPage(BaseModel):
+    items: list[ClassSessionRead]
+    next_cursor: str | None = None
+
+
 class TopicMetadata(BaseModel):
     objectives: list[str] = []
     contents: list[str] = []
@@ -79,6 +84,11 @@ class TopicRead(TopicBase):
         orm_mode = True
 
 
+class TopicPage(BaseModel):
+    items: list[TopicRead]
+    next_cursor: str | None = None
+
+
 class TrimesterBase(BaseModel):
     name: str
     start_date: date
@@ -173,4 +183,37 @@ class LessonSessionSlot(BaseModel):
 class LessonGenerationRequest(BaseModel):
     schedule: list[LessonSessionSlot]
     metadata: dict[str, str] = {}
+    group_id: int | None = None
+
+
+class SessionExpansionRequest(BaseModel):
+    group_ids: list[int] | None = None
+    holidays: list[date] = []
+
+
+class SessionExpansionResult(BaseModel):
+    created: int
+
+
+class IngestionCacheEntryRead(BaseModel):
+    file_hash: str
+    extension: str
+    settings_key: str
+    embedding_model: str
+    vector_count: int
+    size_bytes: int
+    hit_count: int
+    created_at: datetime
+    last_accessed_at: datetime
+
+
+class IngestionCacheStats(BaseModel):
+    entries: int
+    total_bytes: int
+    max_entries: int
+    max_bytes: int
+    items: list[IngestionCacheEntryRead] = []
+
 
+class IngestionCachePurgeResult(BaseModel):
+    purged: int
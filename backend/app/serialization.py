@@ -0,0 +1,26 @@
+"""Fast JSON encoding for the pydantic schemas, backed by orjson."""
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        # Pydantic only flattens the model; orjson encodes the resulting primitives,
+        # dates and times natively instead of going through ``json`` and its encoders.
+        return value.dict(by_alias=True)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any, *, indent: bool = False) -> bytes:
+    """Encode ``value`` (pydantic models included) to UTF-8 JSON bytes."""
+
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(value, default=_default, option=option)
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data)
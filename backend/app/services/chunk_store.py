@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .. import crud, metrics
+from ..config import get_settings
+from ..ingestion.dedup import band_buckets, estimate_similarity, get_minhasher
+
+if TYPE_CHECKING:
+    from ..ingestion.batcher import EmbeddingBatcher
+    from ..ingestion.embedder import EmbeddingService
+    from ..vectorstore import VectorStore
+
+_OCCURRENCE_KEYS = ("grade", "subject", "trimester", "trimester_name", "area_title")
+
+
+@dataclass
+class ChunkStoreReport:
+    chunks: int
+    stored: int
+    duplicates: int
+    embed_seconds: float
+    vector_ids: list[str] = field(default_factory=list)  # the vector holding each chunk
+
+    @property
+    def reduction(self) -> float:
+        """Fraction of chunks that did not add a vector to the collection."""
+
+        return self.duplicates / self.chunks if self.chunks else 0.0
+
+    @property
+    def seconds_saved(self) -> float:
+        """Embedding time the duplicates would have cost, at this run's rate per chunk."""
+
+        return self.embed_seconds / self.stored * self.duplicates if self.stored else 0.0
+
+
+@dataclass
+class _Canonical:
+    vector_id: str
+    signature: np.ndarray
+    occurrences: list[dict[str, str]]
+    fingerprint_id: int | None = None  # None until stored
+    buckets: list[int] = field(default_factory=list)
+
+
+def vector_id(chunk: dict[str, Any]) -> str:
+    """Return the id a chunk's vector is stored under: its chunk id plus a text digest.
+
+    Chunk ids (``<grade>_<subject>_t<trimester>_<n>``) repeat across plans for the same
+    grade and subject, and Chroma keeps the first vector added under an id. The digest
+    keeps a different text from landing on another plan's vector.
+    """
+
+    digest = hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()[:16]
+    return f"{chunk['id']}_{digest}"
+
+
+def _occurrence(metadata: dict[str, Any]) -> dict[str, str]:
+    return {key: str(metadata.get(key, "")) for key in _OCCURRENCE_KEYS}
+
+
+def _occurrence_metadata(occurrences: list[dict[str, str]]) -> dict[str, str]:
+    """Flatten occurrences into Chroma metadata, which only holds scalar values."""
+
+    return {
+        "grades": ",".join(dict.fromkeys(item["grade"] for item in occurrences)),
+        "occurrences": ",".join(f"{item['grade']}:{item['trimester']}" for item in occurrences),
+    }
+
+
+def store_chunks(
+    db: Session,
+    *,
+    chunks: Sequence[dict[str, Any]],
+    vector_store: VectorStore,
+    embedder: EmbeddingService | EmbeddingBatcher,
+    deduplicate: bool | None = None,
+) -> ChunkStoreReport:
+    """Embed ``chunks`` into ``vector_store``, linking near-duplicates to stored vectors.
+
+    Each chunk's MinHash signature is looked up in the LSH index of the collection (the
+    ``chunk_fingerprints`` tables), and in the chunks stored earlier in this call. A chunk
+    whose estimated similarity to a candidate reaches ``chunk_dedup_threshold`` is not
+    embedded; its grade/trimester is added to the candidate's occurrences instead, which
+    are mirrored into the vector's ``grades`` and ``occurrences`` metadata. ``None`` for
+    ``deduplicate`` uses the ``chunk_dedup_enabled`` setting.
+    """
+
+    settings = get_settings()
+    deduplicate = settings.chunk_dedup_enabled if deduplicate is None else deduplicate
+    chunks = list(chunks)
+    new: list[tuple[dict[str, Any], _Canonical]] = []
+    linked: dict[str, _Canonical] = {}
+    vector_ids: list[str] = []
+
+    if not deduplicate:
+        new = [
+            (chunk, _Canonical(vector_id(chunk), np.empty(0), [_occurrence(chunk["metadata"])]))
+            for chunk in chunks
+        ]
+        vector_ids = [canonical.vector_id for _, canonical in new]
+    else:
+        with metrics.stage("ingest.dedupe"):
+            hasher = get_minhasher(settings.chunk_dedup_num_perm)
+            signatures = [hasher.signature(chunk["text"]) for chunk in chunks]
+            buckets = [
+                band_buckets(signature, settings.chunk_dedup_bands) for signature in signatures
+            ]
+            index: dict[int, list[_Canonical]] = {}
+            stored: dict[int, _Canonical] = {}
+            for bucket, fingerprint in crud.find_chunk_fingerprints(
+                db,
+                collection=vector_store.collection_name,
+                embedding_model=embedder.model_name,
+                buckets=(bucket for chunk_buckets in buckets for bucket in chunk_buckets),
+            ):
+                canonical = stored.setdefault(
+                    fingerprint.id,
+                    _Canonical(
+                        fingerprint.vector_id,
+                        np.frombuffer(fingerprint.signature, dtype=np.uint32),
+                        list(fingerprint.occurrences),
+                        fingerprint.id,
+                    ),
+                )
+                index.setdefault(bucket, []).append(canonical)
+
+            for chunk, signature, chunk_buckets in zip(chunks, signatures, buckets):
+                candidates = {
+                    id(candidate): candidate
+                    for bucket in chunk_buckets
+                    for candidate in index.get(bucket, ())
+                }
+                best, best_similarity = None, settings.chunk_dedup_threshold
+                for candidate in candidates.values():
+                    similarity = estimate_similarity(signature, candidate.signature)
+                    if similarity >= best_similarity:
+                        best, best_similarity = candidate, similarity
+                occurrence = _occurrence(chunk["metadata"])
+                if best is None:
+                    best = _Canonical(
+                        vector_id(chunk), signature, [occurrence], buckets=chunk_buckets
+                    )
+                    new.append((chunk, best))
+                    for bucket in chunk_buckets:
+                        index.setdefault(bucket, []).append(best)
+                elif occurrence not in best.occurrences:
+                    best.occurrences.append(occurrence)
+                    if best.fingerprint_id is not None:
+                        linked[best.vector_id] = best
+                vector_ids.append(best.vector_id)
+
+    started = perf_counter()
+    embeddings = embedder.embed_texts(chunk["text"] for chunk, _ in new)
+    embed_seconds = perf_counter() - started
+    if new:
+        vector_store.add_texts(
+            ids=[canonical.vector_id for _, canonical in new],
+            texts=[chunk["text"] for chunk, _ in new],
+            embeddings=embeddings,
+            metadatas=[
+                chunk["metadata"] | _occurrence_metadata(canonical.occurrences)
+                for chunk, canonical in new
+            ],
+        )
+    if deduplicate:
+        vector_store.update_metadatas(
+            ids=list(linked),
+            metadatas=[
+                _occurrence_metadata(canonical.occurrences) for canonical in linked.values()
+            ],
+        )
+        crud.store_chunk_fingerprints(
+            db,
+            collection=vector_store.collection_name,
+            embedding_model=embedder.model_name,
+            fingerprints=[
+                {
+                    "vector_id": canonical.vector_id,
+                    "signature": canonical.signature.tobytes(),
+                    "occurrences": canonical.occurrences,
+                    "buckets": canonical.buckets,
+                }
+                for _, canonical in new
+            ],
+            occurrences={
+                canonical.fingerprint_id: canonical.occurrences
+                for canonical in linked.values()
+                if canonical.fingerprint_id is not None
+            },
+        )
+
+    report = ChunkStoreReport(
+        chunks=len(chunks),
+        stored=len(new),
+        duplicates=len(chunks) - len(new),
+        embed_seconds=embed_seconds,
+        vector_ids=vector_ids,
+    )
+    metrics.counter(
+        "planner_chunk_dedup_total", "Ingested chunks by deduplication result.", result="stored"
+    ).inc(report.stored)
+    metrics.counter(
+        "planner_chunk_dedup_total", "Ingested chunks by deduplication result.", result="linked"
+    ).inc(report.duplicates)
+    metrics.counter(
+        "planner_chunk_dedup_seconds_saved_total",
+        "Estimated embedding time avoided by linking duplicate chunks.",
+    ).inc(report.seconds_saved)
+    return report
@@ -1,24 +1,215 @@
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
-from typing import Iterable
-
-from openai import OpenAI
+from functools import lru_cache
+from time import perf_counter
+from typing import TYPE_CHECKING, Iterable, Protocol, Sequence
 
+from .. import metrics, schemas
 from ..config import get_settings
+from ..metrics import Histogram
 from ..vectorstore import VectorStore
 
-settings = get_settings()
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+ACTIVITY_SEGMENTS = ("pre", "while", "post", "materials")
+
+
+def get_latency_histogram(name: str) -> Histogram:
+    """Return the process-wide latency histogram for a model route."""
+
+    return metrics.histogram(
+        "planner_model_latency_seconds",
+        "Latency of completions per model route; cancelled attempts record time waited.",
+        buckets=metrics.HEDGE_LATENCY_BUCKETS,
+        route=name,
+    )
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """A model served by a given endpoint, e.g. ``gpt-4.1-mini@http://localhost:8081/v1``."""
+
+    model: str
+    base_url: str | None = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}@{self.base_url}" if self.base_url else self.model
+
+    @classmethod
+    def parse(cls, value: str, *, default_base_url: str | None = None) -> ModelRoute:
+        model, _, base_url = value.partition("@")
+        return cls(model=model.strip(), base_url=base_url.strip() or default_base_url)
+
+
+@lru_cache
+def get_route_client(route: ModelRoute, *, api_key: str, timeout: float) -> AsyncOpenAI:
+    """Return the process-wide async client of a model route, reusing its connection pool.
+
+    Requests run on the server's event loop, which the client's connections are bound to.
+    Retries are disabled because failover is handled by ``HedgedCompletion``.
+    """
+
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        api_key=api_key, base_url=route.base_url, timeout=timeout, max_retries=0
+    )
+
+
+class CompletionProvider(Protocol):
+    name: str
+
+    async def complete(self, prompt: str) -> str:
+        ...
+
+
+class OpenAIResponsesProvider:
+    def __init__(self, route: ModelRoute, *, api_key: str, timeout: float) -> None:
+        self.route = route
+        self.name = route.name
+        self.api_key = api_key
+        self.timeout = timeout
+
+    async def complete(self, prompt: str) -> str:
+        client = get_route_client(self.route, api_key=self.api_key, timeout=self.timeout)
+        response = await client.responses.create(
+            model=self.route.model,
+            input=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+        )
+        return response.output[0].content[0].text if response.output else ""
+
+
+class HedgedCompletion:
+    """Run a prompt against an ordered list of providers with hedging and fallback.
+
+    The first provider is started immediately. If it has not answered by its hedge
+    deadline (the configured percentile of its observed latency), the next provider is
+    started as well and whichever finishes first wins; the others are cancelled. A
+    provider that fails is replaced by the next one straight away.
+
+    Deadlines come from every attempt that was not a failure: an attempt cancelled after
+    losing the race records how long it had been running, a lower bound on its latency,
+    so slow providers keep their deadline instead of being judged by their fast answers.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[CompletionProvider],
+        *,
+        hedge_percentile: float | None = None,
+        hedge_delay: float | None = None,
+        min_samples: int | None = None,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one completion provider is required")
+        settings = get_settings()
+        self.providers = list(providers)
+        self.hedge_percentile = hedge_percentile or settings.planner_hedge_percentile
+        self.hedge_delay = settings.planner_hedge_delay if hedge_delay is None else hedge_delay
+        self.min_samples = (
+            settings.planner_hedge_min_samples if min_samples is None else min_samples
+        )
+
+    def hedge_deadline(self, provider: CompletionProvider) -> float:
+        histogram = get_latency_histogram(provider.name)
+        if histogram.count < self.min_samples:
+            return self.hedge_delay
+        return histogram.percentile(self.hedge_percentile) or self.hedge_delay
+
+    async def complete(self, prompt: str) -> str:
+        remaining = iter(self.providers)
+        pending: dict[asyncio.Task[str], CompletionProvider] = {}
+        errors: list[BaseException] = []
+
+        def launch() -> CompletionProvider | None:
+            provider = next(remaining, None)
+            if provider is not None:
+                if pending:
+                    metrics.counter(
+                        "planner_hedged_requests_total",
+                        "Completions started while an earlier provider was still pending.",
+                        route=provider.name,
+                    ).inc()
+                pending[asyncio.create_task(self._timed(provider, prompt))] = provider
+            return provider
+
+        latest = launch()
+        try:
+            while pending:
+                timeout = self.hedge_deadline(latest) if latest is not None else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    latest = launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                    latest = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise RuntimeError(
+            "All lesson planning models failed: "
+            + "; ".join(f"{type(error).__name__}: {error}" for error in errors)
+        ) from (errors[-1] if errors else None)
+
+    async def _timed(self, provider: CompletionProvider, prompt: str) -> str:
+        started = perf_counter()
+        outcome = "error"
+        try:
+            text = await provider.complete(prompt)
+            outcome = "success"
+            return text
+        except asyncio.CancelledError:
+            outcome = "cancelled"  # lost the hedge race
+            raise
+        finally:
+            metrics.counter(
+                "planner_completions_total",
+                "Completion attempts per model route and outcome.",
+                route=provider.name,
+                outcome=outcome,
+            ).inc()
+            if outcome != "error":
+                get_latency_histogram(provider.name).observe(perf_counter() - started)
 
 
 class LessonPlanner:
-    def __init__(self, *, vector_store: VectorStore | None = None) -> None:
-        if not settings.openai_api_key:
-            raise RuntimeError("OPENAI_API_KEY must be configured for lesson planning")
-        self.client = OpenAI(api_key=settings.openai_api_key)
+    def __init__(
+        self,
+        *,
+        vector_store: VectorStore | None = None,
+        providers: Sequence[CompletionProvider] | None = None,
+    ) -> None:
+        if providers is None:
+            settings = get_settings()
+            if not settings.openai_api_key:
+                raise RuntimeError("OPENAI_API_KEY must be configured for lesson planning")
+            providers = [
+                OpenAIResponsesProvider(
+                    ModelRoute.parse(value, default_base_url=settings.openai_base_url),
+                    api_key=settings.openai_api_key,
+                    timeout=settings.planner_request_timeout,
+                )
+                for value in settings.planner_models
+            ]
+        self.completion = HedgedCompletion(providers)
         self.vector_store = vector_store or VectorStore()
 
-    def plan_topic(
+    async def plan_topic(
         self,
         *,
         query: str,
@@ -26,15 +217,19 @@ class LessonPlanner:
         metadata: dict[str, str],
         k: int = 5,
     ) -> list[dict[str, str]]:
-        context_blocks = self.vector_store.similarity_search(query, n_results=k)
-        prompt = self._build_prompt(schedule=schedule, metadata=metadata, context_blocks=context_blocks)
-        response = self.client.responses.create(
-            model="gpt-4.1",
-            input=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-        )
-        message = response.output[0].content[0].text if response.output else ""
-        return self._parse_response(message)
+        with metrics.stage("planner.retrieve"):
+            # Embedding the query and searching Chroma block, so they leave the event loop.
+            context_blocks = await asyncio.to_thread(
+                self.vector_store.similarity_search, query, n_results=k
+            )
+        with metrics.stage("planner.prompt"):
+            prompt = self._build_prompt(
+                schedule=schedule, metadata=metadata, context_blocks=context_blocks
+            )
+        with metrics.stage("planner.completion"):
+            message = await self.completion.complete(prompt)
+        with metrics.stage("planner.parse"):
+            return self._parse_response(message)
 
     def _build_prompt(
         self,
@@ -79,3 +274,44 @@ class LessonPlanner:
         if current_session:
             sessions.append(current_session)
         return sessions
+
+
+def build_class_sessions(
+    sessions: Sequence[dict[str, str]],
+    *,
+    schedule: Sequence[tuple[date, time, time]],
+    topic_id: int,
+    group_id: int,
+) -> list[schemas.ClassSessionCreate]:
+    """Pair parsed planner sessions with schedule slots as ``ClassSessionCreate`` rows.
+
+    Content lines prefixed with ``Pre:``, ``While:``, ``Post:`` or ``Materials:`` start a
+    segment; other lines are appended to the current segment.
+    """
+
+    created: list[schemas.ClassSessionCreate] = []
+    for session, (slot_date, start, end) in zip(sessions, schedule):
+        segments: dict[str, list[str]] = {}
+        current = "pre"
+        for line in session.get("content", "").splitlines():
+            label, separator, rest = line.partition(":")
+            label = label.strip().lower()
+            if separator and label in ACTIVITY_SEGMENTS:
+                current = label
+                line = rest.strip()
+            if line:
+                segments.setdefault(current, []).append(line)
+        activity = schemas.ActivityCreate(
+            **{segment: "\n".join(lines) for segment, lines in segments.items()}
+        )
+        created.append(
+            schemas.ClassSessionCreate(
+                date=slot_date,
+                start_time=start,
+                end_time=end,
+                topic_id=topic_id,
+                group_id=group_id,
+                activities=[activity] if segments else [],
+            )
+        )
+    return created
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import crud, models
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+@dataclass(frozen=True)
+class WeeklySlot:
+    weekday: int
+    start_time: time
+    end_time: time
+
+
+@dataclass(frozen=True)
+class GroupSchedule:
+    group_id: int
+    level_id: int
+    slots: Sequence[WeeklySlot]
+
+
+@dataclass(frozen=True)
+class TopicWindow:
+    """A topic's week range inside its trimester and the hours it should be taught for."""
+
+    topic_id: int
+    level_id: int
+    trimester_start: date
+    trimester_end: date
+    week_start: int
+    week_end: int
+    total_hours: int
+
+
+def parse_weekly_schedule(value: Any) -> list[WeeklySlot]:
+    """Parse ``Group.weekly_schedule``.
+
+    The stored JSON is a list of ``{"weekday": "monday" | 0, "start_time": "08:00",
+    "end_time": "09:30"}`` entries, with weekdays counted from Monday.
+    """
+
+    slots: list[WeeklySlot] = []
+    for entry in value or []:
+        try:
+            weekday = entry["weekday"]
+            if isinstance(weekday, str):
+                weekday = WEEKDAYS.index(weekday.strip().lower())
+            slot = WeeklySlot(
+                weekday=int(weekday),
+                start_time=time.fromisoformat(entry["start_time"]),
+                end_time=time.fromisoformat(entry["end_time"]),
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid weekly schedule entry: {entry!r}") from exc
+        if not 0 <= slot.weekday < 7 or slot.end_time <= slot.start_time:
+            raise ValueError(f"Invalid weekly schedule entry: {entry!r}")
+        slots.append(slot)
+    return slots
+
+
+def _minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def expand_schedules(
+    groups: Sequence[GroupSchedule],
+    topics: Sequence[TopicWindow],
+    *,
+    holidays: Iterable[date] = (),
+) -> list[dict[str, Any]]:
+    """Materialise class sessions for every group from its weekly schedule.
+
+    Each group's slots are expanded over the covered date range (minus ``holidays``) into
+    one sorted session stream. The level's topics then consume that stream in date order:
+    a topic starts at its first week (or after the previous topic's last session, whichever
+    is later) and stops at its last week or once ``total_hours`` are used up. Topics
+    without positive ``total_hours`` fill their week range; when several of them share
+    the same range (as ingested plans store every area of a trimester), its sessions are
+    split evenly between them in topic order.
+
+    The date arithmetic runs in NumPy across all groups at once; the only Python loop is
+    over topic ranks within a level. Returns ``ClassSession`` column dicts.
+    """
+
+    if not groups or not topics:
+        return []
+
+    # Topic windows as day ordinals, ordered by (level, first day, last day, topic_id).
+    def first_day_of(topic: TopicWindow) -> int:
+        return topic.trimester_start.toordinal() + (topic.week_start - 1) * 7
+
+    def last_day_of(topic: TopicWindow) -> int:
+        return min(
+            topic.trimester_start.toordinal() + topic.week_end * 7 - 1,
+            topic.trimester_end.toordinal(),
+        )
+
+    topics = sorted(
+        topics,
+        key=lambda topic: (
+            topic.level_id, first_day_of(topic), last_day_of(topic), topic.topic_id
+        ),
+    )
+    window_start = np.array([first_day_of(topic) for topic in topics])
+    window_end = np.array([last_day_of(topic) for topic in topics])
+    topic_minutes = np.array([topic.total_hours * 60 for topic in topics])
+    # For each topic without hours: how many such topics (itself included) still have to
+    # share its window. Each takes 1/shares of the sessions the earlier ones left.
+    shares_left = np.ones(len(topics), dtype=np.int64)
+    sharing: dict[tuple[int, int, int], int] = {}
+    for topic_index in range(len(topics) - 1, -1, -1):
+        topic = topics[topic_index]
+        if topic.total_hours <= 0:
+            key = (topic.level_id, int(window_start[topic_index]), int(window_end[topic_index]))
+            sharing[key] = shares_left[topic_index] = sharing.get(key, 0) + 1
+    first_day, last_day = int(window_start.min()), int(window_end.max())
+    span = last_day - first_day + 1
+
+    # School days in the covered range and their weekday (date.fromordinal(1) is a Monday).
+    days = np.arange(first_day, last_day + 1)
+    holiday_ordinals = np.fromiter((day.toordinal() for day in holidays), dtype=np.int64)
+    days = days[~np.isin(days, holiday_ordinals)]
+    weekdays = (days - 1) % 7
+    days_by_weekday = [days[weekdays == weekday] for weekday in range(7)]
+    weekday_counts = np.array([len(values) for values in days_by_weekday])
+    weekday_offsets = np.cumsum(weekday_counts) - weekday_counts
+    days_sorted_by_weekday = np.concatenate(days_by_weekday)
+
+    # Flatten all slots of all groups, then repeat each slot for every matching day.
+    slot_group = np.array(
+        [index for index, group in enumerate(groups) for _ in group.slots], dtype=np.int64
+    )
+    if not len(slot_group):
+        return []
+    slot_times = [(slot.start_time, slot.end_time) for group in groups for slot in group.slots]
+    slot_weekday = np.array([slot.weekday for group in groups for slot in group.slots])
+    slot_start = np.array([_minutes(start) for start, _ in slot_times])
+    slot_duration = np.array([_minutes(end) - _minutes(start) for start, end in slot_times])
+
+    per_slot = weekday_counts[slot_weekday]
+    session_slot = np.repeat(np.arange(len(slot_group)), per_slot)
+    position = np.arange(len(session_slot)) - np.repeat(np.cumsum(per_slot) - per_slot, per_slot)
+    session_day = days_sorted_by_weekday[weekday_offsets[slot_weekday[session_slot]] + position]
+
+    order = np.lexsort((slot_start[session_slot], session_day, slot_group[session_slot]))
+    session_slot, session_day = session_slot[order], session_day[order]
+    session_group = slot_group[session_slot]
+    session_key = session_group * span + (session_day - first_day)
+    prefix_minutes = np.concatenate(([0], np.cumsum(slot_duration[session_slot])))
+
+    # (group, topic) pairs sharing a level, ranked by the topic order within the level.
+    topics_by_level: dict[int, list[int]] = {}
+    for topic_index, topic in enumerate(topics):
+        topics_by_level.setdefault(topic.level_id, []).append(topic_index)
+    pair_group: list[int] = []
+    pair_topic: list[int] = []
+    pair_rank: list[int] = []
+    for group_index, group in enumerate(groups):
+        for rank, topic_index in enumerate(topics_by_level.get(group.level_id, ())):
+            pair_group.append(group_index)
+            pair_topic.append(topic_index)
+            pair_rank.append(rank)
+    if not pair_group:
+        return []
+    pair_group_array = np.array(pair_group)
+    pair_topic_array = np.array(pair_topic)
+    pair_rank_array = np.array(pair_rank)
+    pair_lo = np.zeros(len(pair_group), dtype=np.int64)
+    pair_hi = np.zeros(len(pair_group), dtype=np.int64)
+    cursor = np.zeros(len(groups), dtype=np.int64)
+
+    for rank in range(int(pair_rank_array.max()) + 1):
+        selected = np.flatnonzero(pair_rank_array == rank)
+        group_index = pair_group_array[selected]
+        topic_index = pair_topic_array[selected]
+        base = group_index * span - first_day
+        lo = np.maximum(
+            np.searchsorted(session_key, base + window_start[topic_index], side="left"),
+            cursor[group_index],
+        )
+        hi = np.maximum(
+            np.searchsorted(session_key, base + window_end[topic_index], side="right"), lo
+        )
+        hi = lo + (hi - lo) // shares_left[topic_index]
+        budget = topic_minutes[topic_index]
+        # Sessions are kept while the minutes scheduled before them are under budget.
+        within_budget = np.searchsorted(prefix_minutes, prefix_minutes[lo] + budget, side="left")
+        hi = np.where(budget > 0, np.minimum(hi, np.maximum(within_budget, lo)), hi)
+        pair_lo[selected], pair_hi[selected] = lo, hi
+        cursor[group_index] = hi
+
+    lengths = pair_hi - pair_lo
+    row_pair = np.repeat(np.arange(len(pair_lo)), lengths)
+    row_session = pair_lo[row_pair] + (
+        np.arange(len(row_pair)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    )
+
+    group_ids = [group.group_id for group in groups]
+    topic_ids = [topic.topic_id for topic in topics]
+    return [
+        {
+            "group_id": group_ids[group_index],
+            "topic_id": topic_ids[topic_index],
+            "date": date.fromordinal(day),
+            "start_time": slot_times[slot][0],
+            "end_time": slot_times[slot][1],
+        }
+        for group_index, topic_index, day, slot in zip(
+            pair_group_array[row_pair].tolist(),
+            pair_topic_array[row_pair].tolist(),
+            session_day[row_session].tolist(),
+            session_slot[row_session].tolist(),
+        )
+    ]
+
+
+def materialise_sessions(
+    db: Session,
+    *,
+    trimester_ids: Sequence[int],
+    group_ids: Sequence[int] | None = None,
+    holidays: Iterable[date] = (),
+) -> int:
+    """Expand and bulk-insert class sessions for the topics of the given trimesters.
+
+    Only groups at the topics' levels are considered (optionally narrowed to
+    ``group_ids``), and (group, topic) pairs that already have sessions are skipped so the
+    operation can be repeated safely. Returns the number of sessions created.
+    """
+
+    topic_rows = db.execute(
+        select(models.Topic, models.Trimester.start_date, models.Trimester.end_date)
+        .join(models.Trimester, models.Topic.trimester_id == models.Trimester.id)
+        .where(models.Topic.trimester_id.in_(trimester_ids))
+    ).all()
+    topics = [
+        TopicWindow(
+            topic_id=topic.id,
+            level_id=topic.level_id,
+            trimester_start=start_date,
+            trimester_end=end_date,
+            week_start=topic.week_start,
+            week_end=topic.week_end,
+            total_hours=topic.total_hours,
+        )
+        for topic, start_date, end_date in topic_rows
+    ]
+    if not topics:
+        return 0
+
+    group_statement = select(models.Group).where(
+        models.Group.level_id.in_({topic.level_id for topic in topics})
+    )
+    if group_ids is not None:
+        group_statement = group_statement.where(models.Group.id.in_(group_ids))
+    groups = [
+        GroupSchedule(
+            group_id=group.id,
+            level_id=group.level_id,
+            slots=parse_weekly_schedule(group.weekly_schedule),
+        )
+        for group in db.scalars(group_statement)
+    ]
+
+    existing = set(
+        db.execute(
+            select(models.ClassSession.group_id, models.ClassSession.topic_id)
+            .where(models.ClassSession.topic_id.in_([topic.topic_id for topic in topics]))
+            .distinct()
+        ).tuples()
+    )
+    rows = [
+        row
+        for row in expand_schedules(groups, topics, holidays=holidays)
+        if (row["group_id"], row["topic_id"]) not in existing
+    ]
+    return crud.create_scheduled_sessions(db, rows=rows)
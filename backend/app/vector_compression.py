@@ -0,0 +1,239 @@
+"""Compact float16 / int8 copies of chunk vectors for a first search pass.
+
+``float16`` halves every vector. ``int8`` stores each vector as signed bytes plus one
+``float32`` scale (its largest absolute component / 127), about a quarter of the float32
+size. The exact squared norm of each vector is kept beside the codes, so ranking by
+``q . x - |x|^2 / 2`` orders candidates by the same L2 distance Chroma uses; only the dot
+product is approximate. Callers re-score a shortlist against the full-precision vectors.
+
+An index is a directory of append-only files (``ids.txt``, ``codes.bin``, ``scales.bin``,
+``norms.bin`` and ``meta.json``) guarded by an ``flock``, so several worker processes can
+append to and read the same collection.
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+COMPRESSIONS = ("float16", "int8")
+_CODE_TYPES = {"float16": np.float16, "int8": np.int8}
+_SCORE_BLOCK_ROWS = 512  # a float32 copy of one block stays in L2 cache
+
+
+def compress(vectors: np.ndarray, compression: str) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(codes, scales)`` for the rows of ``vectors``.
+
+    ``codes * scales[:, None]`` approximates ``vectors``; scales are all one for float16.
+    """
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if compression == "float16":
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    if compression != "int8":
+        raise ValueError(f"Unknown vector compression {compression!r}; use one of {COMPRESSIONS}")
+    scales = np.abs(vectors).max(axis=1, initial=0.0) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def decompress(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return codes.astype(np.float32) * scales[:, None]
+
+
+class CompactIndex:
+    def __init__(self, directory: Path, compression: str) -> None:
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown vector compression {compression!r}; use one of {COMPRESSIONS}"
+            )
+        self.directory = directory
+        self.compression = compression
+        self.dimension: int | None = None
+        self.ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._code_type = _CODE_TYPES[compression]
+        self._codes = np.zeros((0, 0), dtype=self._code_type)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._loaded_rows = 0
+        self._ids_offset = 0
+        self.backfilled = False
+        self._thread_lock = threading.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self.ids)
+
+    def __contains__(self, vector_id: object) -> bool:
+        self.refresh()
+        return vector_id in self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory for searching: codes, scales and norms."""
+
+        return self._codes.nbytes + self._scales.nbytes + self._norms.nbytes
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        with open(self._path("lock"), "a") as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _stored_rows(self) -> int:
+        try:
+            return self._path("norms.bin").stat().st_size // 4
+        except FileNotFoundError:
+            return 0
+
+    def refresh(self) -> None:
+        """Load rows appended to the files (by any process) since the last refresh."""
+
+        if self._stored_rows() == self._loaded_rows:
+            return
+        with self._thread_lock, self._locked(fcntl.LOCK_SH):
+            self._load()
+
+    def _load(self) -> None:
+        # Callers hold the thread lock and a shared or exclusive file lock.
+        rows = self._stored_rows()
+        start = self._loaded_rows
+        if rows == start:
+            return
+        if self.dimension is None:
+            self.dimension = json.loads(self._path("meta.json").read_text())["dimension"]
+            self._codes = self._codes.reshape(0, self.dimension)
+        codes = np.fromfile(
+            self._path("codes.bin"),
+            dtype=self._code_type,
+            count=(rows - start) * self.dimension,
+            offset=start * self.dimension * self._codes.itemsize,
+        ).reshape(rows - start, self.dimension)
+        scales = np.fromfile(
+            self._path("scales.bin"), dtype=np.float32, count=rows - start, offset=start * 4
+        )
+        norms = np.fromfile(
+            self._path("norms.bin"), dtype=np.float32, count=rows - start, offset=start * 4
+        )
+        with open(self._path("ids.txt"), "rb") as handle:
+            handle.seek(self._ids_offset)
+            lines = handle.read().split(b"\n")[: rows - start]
+        self._ids_offset += sum(len(line) + 1 for line in lines)
+        ids = [line.decode("utf-8") for line in lines]
+        self._codes = np.concatenate([self._codes, codes])
+        self._scales = np.concatenate([self._scales, scales])
+        self._norms = np.concatenate([self._norms, norms])
+        for row, vector_id in enumerate(ids, start=start):
+            self._rows[vector_id] = row
+        self.ids.extend(ids)
+        self._loaded_rows = rows
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray | Sequence[Sequence[float]]) -> None:
+        """Append the vectors of ``ids`` not indexed yet."""
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(ids):
+            return
+        with self._thread_lock, self._locked(fcntl.LOCK_EX):
+            self._load()
+            seen = set(self._rows)
+            keep = []
+            for row, vector_id in enumerate(ids):
+                if vector_id not in seen:
+                    seen.add(vector_id)
+                    keep.append(row)
+            if not keep:
+                return
+            vectors = vectors[keep]
+            if self.dimension is None:
+                self.dimension = vectors.shape[1]
+                self._codes = self._codes.reshape(0, self.dimension)
+                self._path("meta.json").write_text(
+                    json.dumps({"compression": self.compression, "dimension": self.dimension})
+                )
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Vectors have {vectors.shape[1]} dimensions; the index holds "
+                    f"{self.dimension}"
+                )
+            # Drop the tail of an append that was interrupted before norms.bin was written.
+            for name, size in (
+                ("ids.txt", self._ids_offset),
+                ("codes.bin", self._codes.nbytes),
+                ("scales.bin", self._scales.nbytes),
+                ("norms.bin", self._norms.nbytes),
+            ):
+                if self._path(name).exists():
+                    os.truncate(self._path(name), size)
+            codes, scales = compress(vectors, self.compression)
+            norms = np.einsum("ij,ij->i", vectors, vectors).astype(np.float32)
+            with open(self._path("ids.txt"), "a", encoding="utf-8") as handle:
+                handle.writelines(f"{ids[row]}\n" for row in keep)
+            with open(self._path("codes.bin"), "ab") as handle:
+                codes.tofile(handle)
+            with open(self._path("scales.bin"), "ab") as handle:
+                scales.tofile(handle)
+            # norms.bin is written last: its length is the committed row count.
+            with open(self._path("norms.bin"), "ab") as handle:
+                norms.tofile(handle)
+            self._load()
+
+    def search(self, query: np.ndarray | Sequence[float], n_results: int) -> list[str]:
+        """Return up to ``n_results`` ids by ascending approximate L2 distance to ``query``."""
+
+        self.refresh()
+        with self._thread_lock:
+            codes, scales, norms = self._codes, self._scales, self._norms
+        if not len(norms) or n_results <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32)
+        scores = np.empty(len(norms), dtype=np.float32)
+        buffer = np.empty((_SCORE_BLOCK_ROWS, codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(norms), _SCORE_BLOCK_ROWS):
+            block = codes[start : start + _SCORE_BLOCK_ROWS]
+            widened = buffer[: len(block)]
+            widened[...] = block
+            np.dot(widened, query, out=scores[start : start + len(block)])
+        scores *= scales
+        scores -= norms / 2
+        if n_results < len(scores):
+            top = np.argpartition(-scores, n_results - 1)[:n_results]
+        else:
+            top = np.arange(len(scores))
+        return [self.ids[row] for row in top[np.argsort(-scores[top], kind="stable")]]
+
+
+@lru_cache
+def get_compact_index(
+    persist_directory: str, collection_name: str, compression: str
+) -> CompactIndex:
+    """Return this process's index of ``collection_name`` under the Chroma directory."""
+
+    directory = Path(persist_directory).expanduser() / "compact"
+    return CompactIndex(directory / f"{collection_name}.{compression}", compression)
+
+
+def rescore(
+    query: np.ndarray | Sequence[float], vectors: np.ndarray | Sequence[Sequence[float]]
+) -> np.ndarray:
+    """Return the row order of ``vectors`` by ascending exact L2 distance to ``query``."""
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    distances = np.square(vectors - np.asarray(query, dtype=np.float32)).sum(axis=1)
+    return np.argsort(distances, kind="stable")
@@ -1,25 +1,68 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
-
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+from typing import TYPE_CHECKING, Iterable
 
+from . import metrics
 from .config import get_settings
 
-settings = get_settings()
+if TYPE_CHECKING:
+    from chromadb.api import ClientAPI
+
+    from .ingestion.batcher import EmbeddingBatcher
+    from .ingestion.embedder import EmbeddingService
+    from .vector_compression import CompactIndex
+
+
+@lru_cache
+def get_chroma_client(persist_directory: str) -> ClientAPI:
+    """Return a Chroma client for ``persist_directory``, importing chromadb on first use."""
+
+    import chromadb
+    from chromadb.config import Settings as ChromaSettings
+
+    persist_path = Path(persist_directory).expanduser()
+    persist_path.mkdir(parents=True, exist_ok=True)
+    return chromadb.Client(ChromaSettings(persist_directory=str(persist_path)))
 
 
 class VectorStore:
-    def __init__(self, collection_name: str = "yearly-plan") -> None:
-        persist_path = Path(settings.chroma_persist_directory).expanduser()
-        persist_path.mkdir(parents=True, exist_ok=True)
+    def __init__(
+        self,
+        collection_name: str = "yearly-plan",
+        *,
+        embedder: EmbeddingService | EmbeddingBatcher | None = None,
+        compression: str | None = None,
+        rescore_factor: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.client = get_chroma_client(settings.chroma_persist_directory)
+        self.collection_name = collection_name
+        self.collection = self.client.get_or_create_collection(collection_name)
+        self._embedder = embedder
+        # An empty string disables compression even when VECTOR_COMPRESSION is set.
+        compression = settings.vector_compression if compression is None else compression
+        self.compact_index: CompactIndex | None = None
+        if compression:
+            from .vector_compression import get_compact_index
 
-        self.client = chromadb.Client(
-            ChromaSettings(persist_directory=str(persist_path))
+            self.compact_index = get_compact_index(
+                settings.chroma_persist_directory, collection_name, compression
+            )
+        self.rescore_factor = (
+            settings.vector_rescore_factor if rescore_factor is None else rescore_factor
         )
-        self.collection = self.client.get_or_create_collection(collection_name)
+
+    @property
+    def embedder(self) -> EmbeddingService | EmbeddingBatcher:
+        # Queries must be embedded by the same model as the stored chunks, not by
+        # Chroma's built-in default embedding function.
+        if self._embedder is None:
+            from .ingestion.batcher import get_embedder
+
+            self._embedder = get_embedder()
+        return self._embedder
 
     def add_texts(
         self,
@@ -29,12 +72,33 @@ class VectorStore:
         embeddings: list[list[float]],
         metadatas: list[dict[str, str]],
     ) -> None:
-        self.collection.add(ids=ids, documents=texts, embeddings=embeddings, metadatas=metadatas)
+        with metrics.stage("vectorstore.add"):
+            self.collection.add(
+                ids=ids, documents=texts, embeddings=embeddings, metadatas=metadatas
+            )
+            if self.compact_index is not None:
+                self.compact_index.add(ids, embeddings)
+        metrics.counter("planner_vectorstore_added_total", "Chunks written to Chroma.").inc(
+            len(ids)
+        )
+
+    def update_metadatas(self, *, ids: list[str], metadatas: list[dict[str, str]]) -> None:
+        """Merge ``metadatas`` into the stored metadata of ``ids``; other keys are kept."""
+
+        if ids:
+            with metrics.stage("vectorstore.update"):
+                self.collection.update(ids=ids, metadatas=metadatas)
 
     def similarity_search(
         self, query: str, *, n_results: int = 5
     ) -> list[dict[str, str]]:
-        results = self.collection.query(query_texts=[query], n_results=n_results)
+        query_embeddings = self.embedder.embed_texts([query])
+        if self.compact_index is not None:
+            return self._compact_search(query_embeddings[0], n_results)
+        with metrics.stage("vectorstore.query"):
+            results = self.collection.query(
+                query_embeddings=query_embeddings, n_results=n_results
+            )
         documents = results.get("documents", [[]])[0]
         metadatas = results.get("metadatas", [[]])[0]
         return [
@@ -44,3 +108,56 @@ class VectorStore:
             }
             for doc, metadata in zip(documents, metadatas, strict=False)
         ]
+
+    def _compact_search(
+        self, query_embedding: list[float], n_results: int
+    ) -> list[dict[str, str]]:
+        """Shortlist ``rescore_factor * n_results`` ids from the compact index, then rank
+        them by exact L2 distance to the float32 vectors Chroma holds for them."""
+
+        from .vector_compression import rescore
+
+        assert self.compact_index is not None
+        self.backfill_compact_index()
+        rescoring = self.rescore_factor > 1
+        with metrics.stage("vectorstore.query"):
+            shortlist = self.compact_index.search(
+                query_embedding, n_results * max(self.rescore_factor, 1)
+            )
+        if not shortlist:
+            return []
+        with metrics.stage("vectorstore.get"):
+            results = self.collection.get(
+                ids=shortlist,
+                include=["documents", "metadatas", "embeddings"]
+                if rescoring
+                else ["documents", "metadatas"],
+            )
+            if rescoring:
+                order = rescore(query_embedding, results["embeddings"])[:n_results]
+            else:
+                position = {vector_id: index for index, vector_id in enumerate(results["ids"])}
+                order = [position[vector_id] for vector_id in shortlist if vector_id in position]
+        return [
+            {
+                "text": results["documents"][index],
+                "metadata": results["metadatas"][index],
+            }
+            for index in order
+        ]
+
+    def backfill_compact_index(self, batch_size: int = 1000) -> None:
+        """Index vectors Chroma already held when compression was switched on (once per
+        process)."""
+
+        index = self.compact_index
+        if index is None or index.backfilled:
+            return
+        if len(index) < self.collection.count():
+            with metrics.stage("vectorstore.backfill"):
+                for offset in range(0, self.collection.count(), batch_size):
+                    page = self.collection.get(
+                        include=["embeddings"], limit=batch_size, offset=offset
+                    )
+                    index.add(page["ids"], page["embeddings"])
+        index.backfilled = True
@@ -0,0 +1,27 @@
+"""Opt-in construction of lazily created resources before serving traffic."""
+from __future__ import annotations
+
+from .config import get_settings
+from .db import get_engine
+from .ingestion.embedder import EmbeddingService
+from .vectorstore import VectorStore, get_chroma_client
+
+
+def warmup() -> None:
+    """Open a database connection, load the embedding model and the Chroma client (and,
+    with ``VECTOR_COMPRESSION`` set, the default collection's compact index).
+
+    Everything here is otherwise created on first use, which keeps imports and
+    ``/health`` fast but makes the first ingest or generation request pay the cost.
+    Enable with ``WARMUP_ON_STARTUP=true`` in production.
+    """
+
+    settings = get_settings()
+    with get_engine().connect():
+        pass
+    EmbeddingService().embed_texts(["warmup"])
+    get_chroma_client(settings.chroma_persist_directory)
+    if settings.vector_compression:
+        VectorStore().backfill_compact_index()
+    if settings.openai_api_key:
+        import openai  # noqa: F401 (imported so the first generation skips it)
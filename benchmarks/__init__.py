@@ -0,0 +1 @@
+"""Performance benchmarks for the planner backend (run as ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,83 @@
+"""Database helpers shared by the persistence benchmarks."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.app import models
+from backend.app.db import Base
+
+
+def make_engine(database_url: str) -> Engine:
+    """Create an engine with a freshly created planner schema."""
+
+    options: dict[str, object] = {"future": True}
+    if database_url in {"sqlite://", "sqlite:///:memory:"}:
+        options |= {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    engine = create_engine(database_url, **options)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_session(engine: Engine) -> Session:
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)()
+
+
+class StatementCounter:
+    """Count statements and commits sent to the database as a proxy for round-trips."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_: object) -> None:
+        self.count += 1
+
+
+@contextmanager
+def count_statements(engine: Engine) -> Iterator[StatementCounter]:
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    event.listen(engine, "commit", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        event.remove(engine, "commit", counter)
+
+
+def seed_owner(db: Session) -> models.User:
+    user = models.User(name="Benchmark", email=f"bench-{id(db)}@example.com")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def seed_topic_and_group(db: Session) -> tuple[models.Topic, models.Group]:
+    """Create the minimal parent rows that class sessions reference."""
+
+    user = seed_owner(db)
+    year = models.AcademicYear(
+        owner=user, year=2025, start_date=date(2025, 2, 1), end_date=date(2025, 11, 30)
+    )
+    trimester = models.Trimester(
+        academic_year=year,
+        name="Trimester I",
+        start_date=date(2025, 2, 1),
+        end_date=date(2025, 5, 10),
+        total_weeks=14,
+    )
+    level = models.Level(academic_year=year, grade="7", subject="Science")
+    topic = models.Topic(
+        level=level, trimester=trimester, title="Cells", week_start=1, week_end=4, total_hours=12
+    )
+    group = models.Group(level=level, name="7A", weekly_schedule=[])
+    db.add_all([year, trimester, level, topic, group])
+    db.commit()
+    return topic, group
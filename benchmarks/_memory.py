@@ -0,0 +1,31 @@
+"""Memory helpers shared by the parser and vector store benchmarks."""
+from __future__ import annotations
+
+import sys
+
+
+def rss_mib() -> float:
+    """Return this process's current RSS (``VmRSS``; Linux only)."""
+
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise OSError("VmRSS is not reported by /proc/self/status")
+
+
+def peak_rss_mib() -> float:
+    """Return this process's peak RSS (``VmHWM`` on Linux, ``ru_maxrss`` elsewhere)."""
+
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
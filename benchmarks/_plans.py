@@ -0,0 +1,173 @@
+"""Synthetic yearly plans for benchmarks."""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import date, timedelta
+from pathlib import Path
+
+from backend.app.schemas import YearlyPlan, YearlyPlanArea, YearlyPlanTrimester
+
+AREA_LISTS = (
+    "objectives",
+    "contents",
+    "competences",
+    "indicators",
+    "projects",
+    "methodology",
+    "assessment",
+)
+
+
+def synthetic_plan(
+    *,
+    trimesters: int = 3,
+    areas: int = 6,
+    items: int = 5,
+    year: int = 2025,
+    grade: str = "7",
+    subject: str = "Science",
+) -> YearlyPlan:
+    """Build a deterministic plan with ``trimesters`` x ``areas`` areas of ``items`` entries."""
+
+    start = date(year, 2, 3)
+    plan_trimesters = []
+    for trimester_index in range(1, trimesters + 1):
+        end = start + timedelta(weeks=13, days=4)
+        plan_trimesters.append(
+            YearlyPlanTrimester(
+                name=f"Trimester {trimester_index}",
+                start_date=start,
+                end_date=end,
+                weeks=14,
+                areas=[
+                    YearlyPlanArea(
+                        title=f"Area {trimester_index}.{area_index}",
+                        **{
+                            key: [
+                                f"Item {item} about {key} for area {area_index} "
+                                f"in term {trimester_index}"
+                                for item in range(1, items + 1)
+                            ]
+                            for key in AREA_LISTS
+                        },
+                    )
+                    for area_index in range(1, areas + 1)
+                ],
+            )
+        )
+        start = end + timedelta(days=17)
+    return YearlyPlan(year=year, grade=grade, subject=subject, trimesters=plan_trimesters)
+
+
+def render_plan_lines(plan: YearlyPlan) -> list[str]:
+    """Render a plan in the line format understood by ``parse_yearly_plan_from_lines``."""
+
+    lines = [f"Year {plan.year}", f"Grade: {plan.grade}", f"Subject: {plan.subject}"]
+    for trimester in plan.trimesters:
+        header = trimester.name.upper()
+        if trimester.start_date and trimester.end_date:
+            header += f" from {trimester.start_date:%Y-%m-%d} to {trimester.end_date:%Y-%m-%d}"
+        lines.append(header)
+        if trimester.weeks:
+            lines.append(f"Working weeks: {trimester.weeks}")
+        for area in trimester.areas:
+            lines.append(area.title.upper())
+            for key in AREA_LISTS:
+                values = getattr(area, key)
+                if values:
+                    lines.append(key.title())
+                    lines.extend(values)
+    return lines
+
+
+PLAN_FORMATS = (".txt", ".md", ".docx", ".pptx", ".pdf")
+
+
+def write_plan_file(plan: YearlyPlan, path: Path) -> Path:
+    """Write ``plan`` to ``path`` in the format implied by its suffix."""
+
+    lines = render_plan_lines(plan)
+    suffix = path.suffix.lower()
+    if suffix in {".txt", ".md"}:
+        path.write_text("\n".join(lines), encoding="utf-8")
+    elif suffix == ".docx":
+        from docx import Document
+
+        document = Document()
+        for line in lines:
+            document.add_paragraph(line)
+        document.save(path)
+    elif suffix == ".pptx":
+        _write_pptx(lines, path)
+    elif suffix == ".pdf":
+        _write_pdf(lines, path)
+    else:
+        raise ValueError(f"Unsupported plan format: {suffix}")
+    return path
+
+
+def write_plan_files(
+    plan: YearlyPlan, directory: Path, formats: Sequence[str] = PLAN_FORMATS
+) -> dict[str, Path]:
+    return {suffix: write_plan_file(plan, directory / f"plan{suffix}") for suffix in formats}
+
+
+def _write_pptx(lines: list[str], path: Path, *, lines_per_slide: int = 25) -> None:
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # blank
+    for offset in range(0, len(lines), lines_per_slide):
+        slide = presentation.slides.add_slide(layout)
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(6.5))
+        frame = box.text_frame
+        frame.text = lines[offset]
+        for line in lines[offset + 1 : offset + lines_per_slide]:
+            frame.add_paragraph().text = line
+    presentation.save(path)
+
+
+def _write_pdf(lines: list[str], path: Path, *, lines_per_page: int = 60) -> None:
+    """Write a minimal text-only PDF (Helvetica, one line per row) without extra deps."""
+
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    pages = [
+        lines[offset : offset + lines_per_page] for offset in range(0, len(lines), lines_per_page)
+    ]
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_numbers = []
+    for page_lines in pages or [[]]:
+        body = "BT /F1 9 Tf 12 TL 40 800 Td " + " ".join(
+            f"({escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        stream = body.encode("cp1252", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        page_numbers.append(len(objects))
+    kids = " ".join(f"{number} 0 R" for number in page_numbers)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_numbers)} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(output))
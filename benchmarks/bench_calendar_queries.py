@@ -0,0 +1,82 @@
+"""Page through a group calendar and check the query count stays constant per page.
+
+Each page must cost exactly two statements (classes, then activities via ``selectinload``)
+whatever the page size, so the script exits non-zero on an N+1 regression::
+
+    python -m benchmarks.bench_calendar_queries --classes 2000 --page-size 200
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, time, timedelta
+from time import perf_counter
+
+from backend.app import crud, schemas
+
+from ._db import count_statements, make_engine, make_session, seed_topic_and_group
+
+QUERIES_PER_PAGE = 2
+
+
+def run(database_url: str, classes: int, page_size: int) -> int:
+    engine = make_engine(database_url)
+    with make_session(engine) as db:
+        topic, group = seed_topic_and_group(db)
+        group_id = group.id
+        crud.bulk_create_class_sessions(
+            db,
+            sessions=[
+                schemas.ClassSessionCreate(
+                    date=date(2025, 2, 3) + timedelta(days=index // 3),
+                    start_time=time(8 + index % 3),
+                    end_time=time(9 + index % 3),
+                    topic_id=topic.id,
+                    group_id=group_id,
+                    activities=[schemas.ActivityCreate(pre="a"), schemas.ActivityCreate(pre="b")],
+                )
+                for index in range(classes)
+            ],
+        )
+        db.expunge_all()
+
+        pages = rows = 0
+        after = None
+        failures = 0
+        started = perf_counter()
+        while True:
+            with count_statements(engine) as statements:
+                page = crud.list_group_classes(
+                    db, group_id=group_id, after=after, limit=page_size
+                )
+                rows += sum(1 + len(session.activities) for session in page)
+            if page:
+                pages += 1
+                if statements.count != QUERIES_PER_PAGE:
+                    failures += 1
+                    print(f"page {pages}: {statements.count} queries", file=sys.stderr)
+            if len(page) < page_size:
+                break
+            after = (page[-1].date, page[-1].id)
+            db.expunge_all()
+        elapsed = perf_counter() - started
+    engine.dispose()
+    print(
+        f"classes={classes} page_size={page_size} pages={pages} rows={rows} "
+        f"queries/page={QUERIES_PER_PAGE if not failures else 'FAIL'} "
+        f"total={elapsed * 1000:.1f} ms"
+    )
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--classes", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    sys.exit(run(args.database_url, args.classes, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Measure collection size and embedding time with and without near-duplicate linking.
+
+One plan per grade is ingested into the same collection. In every plan the sections
+listed in ``--shared`` repeat a common text with one grade-specific edit, the way
+methodology and assessment are copied between grades; the other sections are unique.
+
+A second check ingests plans from two schools with the same grade and subject but their
+own texts, so their chunk ids coincide. Every vector a chunk is reported as stored under
+must hold that chunk's text, and every fingerprint must describe its vector's text.
+
+Usage::
+
+    python -m benchmarks.bench_chunk_dedup --grades 7 8 9 10 11 --areas 20
+    python -m benchmarks.bench_chunk_dedup --model sentence-transformers/all-MiniLM-L6-v2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from backend.app import metrics
+from backend.app.ingestion.chunker import chunk_yearly_plan
+from backend.app.schemas import YearlyPlan
+
+from ._db import make_engine, make_session
+from ._plans import AREA_LISTS, synthetic_plan
+
+if TYPE_CHECKING:
+    from backend.app.ingestion.embedder import EmbeddingService
+
+
+def _grade_plan(grade: str, areas: int, items: int, shared: set[str]) -> YearlyPlan:
+    plan = synthetic_plan(areas=areas, items=items, grade=grade)
+    for trimester in plan.trimesters:
+        for area in trimester.areas:
+            for key in AREA_LISTS:
+                values = getattr(area, key)
+                if key in shared:
+                    values[-1] += f" (adapted for grade {grade})"
+                else:
+                    setattr(area, key, [f"Grade {grade}: {value}" for value in values])
+    return plan
+
+
+def _other_school_plan(grade: str, areas: int, items: int) -> YearlyPlan:
+    plan = synthetic_plan(areas=areas, items=items, grade=grade)
+    for trimester_index, trimester in enumerate(plan.trimesters, start=1):
+        for area_index, area in enumerate(trimester.areas, start=1):
+            for key in AREA_LISTS:
+                setattr(
+                    area,
+                    key,
+                    [
+                        f"Second school {key} unit {item} builds on area {area_index} "
+                        f"of term {trimester_index} with local fieldwork"
+                        for item in range(1, items + 1)
+                    ],
+                )
+    return plan
+
+
+def check_shared_chunk_ids(args: argparse.Namespace, embedder: EmbeddingService) -> None:
+    from sqlalchemy import select
+
+    from backend.app import models
+    from backend.app.ingestion.dedup import get_minhasher
+    from backend.app.services.chunk_store import store_chunks, vector_id
+    from backend.app.vectorstore import VectorStore
+
+    grade = args.grades[0]
+    plans = [
+        synthetic_plan(areas=args.areas, items=args.items, grade=grade),
+        _other_school_plan(grade, args.areas, args.items),
+    ]
+    chunks = [list(chunk_yearly_plan(plan)) for plan in plans]
+    assert [chunk["id"] for chunk in chunks[0]] == [chunk["id"] for chunk in chunks[1]]
+    engine = make_engine(args.database_url)
+    with make_session(engine) as db:
+        store = VectorStore("dedup-bench-schools", embedder=embedder)
+        reports = [
+            store_chunks(db, chunks=plan_chunks, vector_store=store, embedder=embedder)
+            for plan_chunks in chunks
+        ]
+        stored = store.collection.get(include=["documents"])
+        documents = dict(zip(stored["ids"], stored["documents"]))
+        wrong_text = sum(
+            documents.get(stored_id) != chunk["text"]
+            for chunk, stored_id in zip(chunks[1], reports[1].vector_ids)
+            if stored_id == vector_id(chunk)
+        )
+        fingerprints = db.scalars(
+            select(models.ChunkFingerprint).where(
+                models.ChunkFingerprint.collection == store.collection_name
+            )
+        ).all()
+        hasher = get_minhasher(len(fingerprints[0].signature) // 4)
+        stale = sum(
+            row.signature != hasher.signature(documents[row.vector_id]).tobytes()
+            for row in fingerprints
+        )
+    engine.dispose()
+    print(
+        f"  schools vectors={sum(report.stored for report in reports):<6} "
+        f"school 2 chunks on another text={wrong_text} stale fingerprints={stale}"
+    )
+    assert not wrong_text and not stale
+
+
+def run(args: argparse.Namespace) -> None:
+    from backend.app.ingestion.embedder import EmbeddingService
+    from backend.app.services.chunk_store import store_chunks
+    from backend.app.vectorstore import VectorStore
+
+    plans = [
+        _grade_plan(grade, args.areas, args.items, set(args.shared)) for grade in args.grades
+    ]
+    chunks = [list(chunk_yearly_plan(plan)) for plan in plans]
+    embedder = EmbeddingService(model=args.model)
+    embedder.embed_texts(["warmup"])
+    print(
+        f"model={args.model} grades={len(plans)} chunks={sum(map(len, chunks))} "
+        f"shared={','.join(args.shared)}"
+    )
+
+    for deduplicate in (False, True):
+        engine = make_engine(args.database_url)
+        with make_session(engine) as db, metrics.record_stages() as stages:
+            store = VectorStore(f"dedup-bench-{deduplicate:d}", embedder=embedder)
+            started = perf_counter()
+            reports = [
+                store_chunks(
+                    db,
+                    chunks=plan_chunks,
+                    vector_store=store,
+                    embedder=embedder,
+                    deduplicate=deduplicate,
+                )
+                for plan_chunks in chunks
+            ]
+            elapsed = perf_counter() - started
+        engine.dispose()
+        stored = sum(report.stored for report in reports)
+        total = sum(report.chunks for report in reports)
+        print(
+            f"  {'dedup' if deduplicate else 'plain':<6} vectors={stored:<6} "
+            f"reduction={1 - stored / total:6.1%}  "
+            f"embed={sum(report.embed_seconds for report in reports) * 1000:9.1f} ms  "
+            f"saved~{sum(report.seconds_saved for report in reports) * 1000:9.1f} ms  "
+            f"fingerprinting={sum(stages.get('ingest.dedupe', [])) * 1000:7.1f} ms  "
+            f"total={elapsed * 1000:9.1f} ms"
+        )
+    check_shared_chunk_ids(args, embedder)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grades", nargs="+", default=["7", "8", "9", "10", "11"])
+    parser.add_argument("--areas", type=int, default=20)
+    parser.add_argument("--items", type=int, default=6)
+    parser.add_argument(
+        "--shared",
+        nargs="+",
+        choices=AREA_LISTS,
+        default=["objectives", "methodology", "assessment"],
+    )
+    parser.add_argument("--model", default="hashing:384")
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory(prefix="dedup-bench-") as directory:
+        os.environ["CHROMA_PERSIST_DIRECTORY"] = directory
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare one-chunk-per-section chunking with token-bounded chunking.
+
+"before" is the previous behaviour, one chunk per (area, section); "after" splits and
+merges chunks by token count. Both are embedded through ``EmbeddingService``. Padding is
+measured as the token slots of each batch (``batch size x longest text``, capped at the
+model's sequence length) that hold no token, with batches formed the way the model forms
+them: a SentenceTransformer encodes texts longest first, other backends in chunk order.
+
+Usage::
+
+    python -m benchmarks.bench_chunking --areas 100 --model hashing:384
+    python -m benchmarks.bench_chunking --model sentence-transformers/all-MiniLM-L6-v2
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from collections.abc import Callable, Sequence
+from time import perf_counter
+
+from backend.app.ingestion.chunker import chunk_yearly_plan, estimate_tokens
+from backend.app.ingestion.embedder import EmbeddingService, load_model
+from backend.app.schemas import YearlyPlan
+
+from ._plans import AREA_LISTS, synthetic_plan
+
+
+def _varied_plan(areas: int, max_items: int, seed: int) -> YearlyPlan:
+    """A plan whose sections range from one item to ``max_items`` long items."""
+
+    rng = random.Random(seed)
+    plan = synthetic_plan(areas=areas, items=max_items)
+    for trimester in plan.trimesters:
+        for area in trimester.areas:
+            for key in AREA_LISTS:
+                values = getattr(area, key)[: rng.randint(1, max_items)]
+                setattr(
+                    area,
+                    key,
+                    [value + " with details" * rng.randint(0, 6) for value in values],
+                )
+    return plan
+
+
+def _padding(
+    texts: Sequence[str], batch_size: int, max_length: int, count_tokens: Callable[[str], int]
+) -> tuple[int, int, int]:
+    lengths = [min(count_tokens(text), max_length) for text in texts]
+    slots = sum(
+        max(lengths[start : start + batch_size]) * len(lengths[start : start + batch_size])
+        for start in range(0, len(lengths), batch_size)
+    )
+    truncated = sum(count_tokens(text) > max_length for text in texts)
+    return sum(lengths), slots, truncated
+
+
+def run(args: argparse.Namespace) -> None:
+    plan = _varied_plan(args.areas, args.max_items, args.seed)
+    service = EmbeddingService(model=args.model, batch_size=args.batch_size)
+    model = load_model(service.model_name, service.device)
+    count_tokens = estimate_tokens
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is not None:  # a SentenceTransformer: count real word pieces
+
+        def count_tokens(text: str) -> int:
+            return len(tokenizer.tokenize(text)) + 2  # [CLS] and [SEP]
+
+    def batch_order(texts: list[str]) -> list[str]:
+        # SentenceTransformer.encode sorts its input by descending length before batching.
+        return sorted(texts, key=len, reverse=True) if tokenizer is not None else texts
+
+    max_length = getattr(model, "max_seq_length", None) or args.max_tokens
+
+    cases = {
+        "before": dict(max_tokens=0, min_tokens=0),
+        "after": dict(max_tokens=args.max_tokens, min_tokens=args.min_tokens),
+    }
+    print(
+        f"model={service.model_name} batch_size={args.batch_size} max_seq_length={max_length}"
+    )
+    for label, bounds in cases.items():
+        started = perf_counter()
+        chunks = list(chunk_yearly_plan(plan, count_tokens=count_tokens, **bounds))
+        chunk_seconds = perf_counter() - started
+        texts = [chunk["text"] for chunk in chunks]
+        tokens, slots, truncated = _padding(
+            batch_order(texts), args.batch_size, max_length, count_tokens
+        )
+
+        service.embed_texts(texts)  # warm-up
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = perf_counter()
+            service.embed_texts(texts)
+            best = min(best, perf_counter() - started)
+        print(
+            f"  {label:<6} chunks={len(chunks):6d} truncated={truncated:5d} "
+            f"padding={1 - tokens / slots:6.1%} chunking {chunk_seconds * 1000:7.1f} ms  "
+            f"embed {len(chunks) / best:9.0f} chunks/s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--areas", type=int, default=100)
+    parser.add_argument("--max-items", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--model", default="hashing:384")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--min-tokens", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
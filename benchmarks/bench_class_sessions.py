@@ -0,0 +1,69 @@
+"""Compare per-session ``create_class_session`` calls with the bulk save path.
+
+Usage::
+
+    python -m benchmarks.bench_class_sessions --sessions 500 --database-url sqlite://
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, time, timedelta
+from time import perf_counter
+
+from backend.app import crud, schemas
+
+from ._db import count_statements, make_engine, make_session, seed_topic_and_group
+
+
+def _sessions(count: int, *, topic_id: int, group_id: int) -> list[schemas.ClassSessionCreate]:
+    return [
+        schemas.ClassSessionCreate(
+            date=date(2025, 2, 3) + timedelta(days=index),
+            start_time=time(8, 0),
+            end_time=time(9, 30),
+            topic_id=topic_id,
+            group_id=group_id,
+            activities=[
+                schemas.ActivityCreate(
+                    **{"pre": f"Warm-up {index}", "while": f"Lab {index}", "post": "Exit ticket"}
+                )
+                for _ in range(3)
+            ],
+        )
+        for index in range(count)
+    ]
+
+
+def run(database_url: str, count: int) -> None:
+    for label in ("create_class_session", "bulk_create_class_sessions"):
+        engine = make_engine(database_url)
+        with make_session(engine) as db:
+            topic, group = seed_topic_and_group(db)
+            sessions = _sessions(count, topic_id=topic.id, group_id=group.id)
+            with count_statements(engine) as statements:
+                started = perf_counter()
+                if label == "create_class_session":
+                    for session in sessions:
+                        crud.create_class_session(
+                            db, topic_id=topic.id, group_id=group.id, data=session
+                        )
+                else:
+                    crud.bulk_create_class_sessions(db, sessions=sessions)
+                elapsed = perf_counter() - started
+        engine.dispose()
+        print(
+            f"{label:<28} sessions={count:<6} round-trips={statements.count:<6} "
+            f"total={elapsed * 1000:9.1f} ms  per-session={elapsed / count * 1e6:8.1f} us"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    run(args.database_url, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
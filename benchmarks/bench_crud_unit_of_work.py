@@ -0,0 +1,60 @@
+"""Measure round-trips and latency per created topic with and without ``unit_of_work``.
+
+Usage::
+
+    python -m benchmarks.bench_crud_unit_of_work --topics 1000
+"""
+from __future__ import annotations
+
+import argparse
+from contextlib import nullcontext
+from time import perf_counter
+
+from backend.app import crud, schemas
+
+from ._db import count_statements, make_engine, make_session, seed_topic_and_group
+
+MODES = {
+    "commit + refresh per row": (False, False),
+    "unit_of_work": (True, False),
+    "unit_of_work + refresh": (True, True),
+}
+
+
+def run(database_url: str, count: int) -> None:
+    for label, (deferred, refresh) in MODES.items():
+        engine = make_engine(database_url)
+        with make_session(engine) as db:
+            topic, _ = seed_topic_and_group(db)
+            level_id, trimester_id = topic.level_id, topic.trimester_id
+            with count_statements(engine) as statements:
+                started = perf_counter()
+                with crud.unit_of_work(db) if deferred else nullcontext():
+                    for index in range(count):
+                        crud.create_topic(
+                            db,
+                            level_id=level_id,
+                            trimester_id=trimester_id,
+                            data=schemas.TopicBase(
+                                title=f"Topic {index}", week_start=1, week_end=2, total_hours=4
+                            ),
+                            refresh=refresh,
+                        )
+                elapsed = perf_counter() - started
+        engine.dispose()
+        print(
+            f"{label:<26} topics={count:<6} round-trips/topic={statements.count / count:5.2f} "
+            f"latency/topic={elapsed / count * 1e6:8.1f} us"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    run(args.database_url, args.topics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Compare the streaming DOCX reader with python-docx's ``Document().paragraphs``.
+
+Each parser runs in a fresh child process, which reports how far parsing raised its peak
+RSS above the level reached after imports (``VmHWM`` on Linux, ``ru_maxrss`` elsewhere).
+``--tables`` puts every area's lists in tables and ``--text-boxes`` in text boxes saved the
+way Word does, with a DrawingML copy under ``mc:Choice`` and a VML copy under
+``mc:Fallback``. The python-docx paragraph walk sees neither; the streaming reader must
+find every list item exactly once, or the run fails.
+
+Usage::
+
+    python -m benchmarks.bench_docx_parser --areas 100 400 --tables
+    python -m benchmarks.bench_docx_parser --areas 100 --text-boxes
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from ._memory import peak_rss_mib
+from ._plans import render_plan_lines, synthetic_plan, write_plan_file
+
+PARSERS = ("python-docx", "streaming")
+
+_TEXT_BOX = """\
+<mc:AlternateContent
+    xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+    xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+    xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"
+    xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+    xmlns:v="urn:schemas-microsoft-com:vml">
+  <mc:Choice Requires="wps"><w:drawing><wp:anchor><a:graphic>
+    <a:graphicData uri="http://schemas.microsoft.com/office/word/2010/wordprocessingShape">
+      <wps:wsp><wps:txbx><w:txbxContent>{paragraphs}</w:txbxContent></wps:txbx></wps:wsp>
+    </a:graphicData>
+  </a:graphic></wp:anchor></w:drawing></mc:Choice>
+  <mc:Fallback><w:pict><v:rect><v:textbox><w:txbxContent>{paragraphs}</w:txbxContent>
+  </v:textbox></v:rect></w:pict></mc:Fallback>
+</mc:AlternateContent>"""
+
+
+def _write_tables_docx(areas: int, items: int, path: Path) -> None:
+    """Write the plan with headers as paragraphs and each list as a one-column table."""
+
+    from docx import Document
+
+    document = Document()
+    table = None
+    for line in render_plan_lines(synthetic_plan(areas=areas, items=items)):
+        if line.startswith("Item "):
+            if table is None:
+                table = document.add_table(rows=0, cols=1)
+            table.add_row().cells[0].text = line
+        else:
+            table = None
+            document.add_paragraph(line)
+    document.save(path)
+
+
+def _write_text_boxes_docx(areas: int, items: int, path: Path) -> None:
+    """Write the plan with headers as paragraphs and each list in one text box."""
+
+    from xml.sax.saxutils import escape
+
+    from docx import Document
+    from docx.oxml import parse_xml
+
+    document = Document()
+    lines = render_plan_lines(synthetic_plan(areas=areas, items=items))
+    boxed: list[str] = []
+
+    def flush() -> None:
+        if boxed:
+            paragraphs = "".join(
+                f"<w:p><w:r><w:t>{escape(line)}</w:t></w:r></w:p>" for line in boxed
+            )
+            run = document.add_paragraph().add_run()
+            run._r.append(parse_xml(_TEXT_BOX.format(paragraphs=paragraphs)))
+            boxed.clear()
+
+    for line in lines:
+        if line.startswith("Item "):
+            boxed.append(line)
+        else:
+            flush()
+            document.add_paragraph(line)
+    flush()
+    document.save(path)
+
+
+def _child(parser: str, path: Path) -> None:
+    from docx import Document  # noqa: F401 (both parsers pay for the same imports)
+
+    from backend.app.ingestion.docx_parser import iter_docx_lines
+    from backend.app.ingestion.text_parser import parse_yearly_plan_from_lines
+
+    imported_rss = peak_rss_mib()
+    started = perf_counter()
+    if parser == "python-docx":
+        lines = [paragraph.text for paragraph in Document(path).paragraphs]
+    else:
+        lines = list(iter_docx_lines(path))
+    plan = parse_yearly_plan_from_lines(lines)
+    elapsed = perf_counter() - started
+    items = sum(
+        len(getattr(area, key))
+        for trimester in plan.trimesters
+        for area in trimester.areas
+        for key in ("objectives", "contents", "indicators")
+    )
+    print(f"{elapsed} {len(lines)} {items} {imported_rss} {peak_rss_mib()}")
+
+
+def _measure(parser: str, path: Path) -> tuple[float, int, int, float, float]:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_docx_parser", "--child", parser, str(path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    elapsed, lines, items, imported_rss, peak_rss = output.split()
+    return float(elapsed), int(lines), int(items), float(imported_rss), float(peak_rss)
+
+
+def run(areas: int, items: int, layout: str, work_dir: Path) -> None:
+    path = work_dir / f"plan-{areas}-{layout}.docx"
+    plan = synthetic_plan(areas=areas, items=items)
+    if layout == "tables":
+        _write_tables_docx(areas, items, path)
+    elif layout == "text-boxes":
+        _write_text_boxes_docx(areas, items, path)
+    else:
+        write_plan_file(plan, path)
+    expected = sum(
+        len(getattr(area, key))
+        for trimester in plan.trimesters
+        for area in trimester.areas
+        for key in ("objectives", "contents", "indicators")
+    )
+    print(
+        f"areas={areas} items={items} layout={layout} "
+        f"size={path.stat().st_size / 1024:.0f} KiB expected list items={expected}"
+    )
+    for parser in PARSERS:
+        elapsed, lines, parsed_items, imported_rss, peak_rss = _measure(parser, path)
+        print(
+            f"  {parser:<12} {elapsed * 1000:9.1f} ms  peak RSS {peak_rss:7.1f} MiB "
+            f"(+{peak_rss - imported_rss:.1f} parsing)  lines={lines} list items={parsed_items}"
+        )
+        if parser == "streaming" and parsed_items != expected:
+            raise SystemExit(f"streaming reader found {parsed_items} list items, not {expected}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--areas", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--items", type=int, default=8)
+    layouts = parser.add_mutually_exclusive_group()
+    layouts.add_argument("--tables", action="store_true")
+    layouts.add_argument("--text-boxes", action="store_true")
+    parser.add_argument("--child", nargs=2, metavar=("PARSER", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child[0], Path(args.child[1]))
+        return
+    layout = "tables" if args.tables else "text-boxes" if args.text_boxes else "paragraphs"
+    with tempfile.TemporaryDirectory(prefix="docx-bench-") as work_dir:
+        for areas in args.areas:
+            run(areas, args.items, layout, Path(work_dir))
+
+
+if __name__ == "__main__":
+    main()
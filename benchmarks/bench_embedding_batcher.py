@@ -0,0 +1,114 @@
+"""Compare per-request embedding with the cross-request micro-batching worker.
+
+Each of ``--concurrency`` threads (or asyncio tasks with ``--async``) sends
+``--requests`` small embedding requests, either straight to ``EmbeddingService`` or
+through ``EmbeddingBatcher``.
+
+Usage::
+
+    python -m benchmarks.bench_embedding_batcher --concurrency 32 --model hashing:384
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from backend.app import metrics
+from backend.app.ingestion.batcher import EmbeddingBatcher
+from backend.app.ingestion.embedder import EmbeddingService
+
+
+def _workload(concurrency: int, requests: int, seed: int) -> list[list[list[str]]]:
+    rng = random.Random(seed)
+    return [
+        [
+            [f"query {worker} {index} about topic {rng.randint(1, 500)}"] * rng.randint(1, 4)
+            for index in range(requests)
+        ]
+        for worker in range(concurrency)
+    ]
+
+
+def _run_threads(embed, workload: list[list[list[str]]]) -> tuple[float, list[float]]:
+    def worker(batches: list[list[str]]) -> list[float]:
+        latencies = []
+        for texts in batches:
+            started = perf_counter()
+            embed(texts)
+            latencies.append(perf_counter() - started)
+        return latencies
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=len(workload)) as pool:
+        latencies = [value for result in pool.map(worker, workload) for value in result]
+    return perf_counter() - started, latencies
+
+
+def _run_async(batcher: EmbeddingBatcher, workload: list[list[list[str]]]):
+    async def worker(batches: list[list[str]]) -> list[float]:
+        latencies = []
+        for texts in batches:
+            started = perf_counter()
+            await batcher.aembed_texts(texts)
+            latencies.append(perf_counter() - started)
+        return latencies
+
+    async def main() -> list[list[float]]:
+        return await asyncio.gather(*(worker(batches) for batches in workload))
+
+    started = perf_counter()
+    results = asyncio.run(main())
+    return perf_counter() - started, [value for result in results for value in result]
+
+
+def _report(label: str, texts: int, elapsed: float, latencies: list[float]) -> None:
+    latencies.sort()
+    print(
+        f"  {label:<16} {texts / elapsed:9.0f} texts/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--model", default="hashing:384")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    service = EmbeddingService(model=args.model, batch_size=args.batch_size)
+    service.embed_texts(["warm-up"])
+    workload = _workload(args.concurrency, args.requests, args.seed)
+    texts = sum(len(batch) for batches in workload for batch in batches)
+    print(
+        f"model={args.model} concurrency={args.concurrency} requests={args.requests} "
+        f"texts={texts} batch_size={args.batch_size} max_wait={args.max_wait_ms} ms"
+    )
+
+    _report("direct", texts, *_run_threads(service.embed_texts, workload))
+    batcher = EmbeddingBatcher(service, max_wait=args.max_wait_ms / 1000)
+    _report("batcher (sync)", texts, *_run_threads(batcher.embed_texts, workload))
+    _report("batcher (async)", texts, *_run_async(batcher, workload))
+    batcher.close()
+
+    fill = metrics.histogram("planner_embedding_batch_fill", "")
+    coalesced = metrics.histogram("planner_embedding_batch_requests", "")
+    waited = metrics.histogram("planner_embedding_queue_wait_seconds", "")
+    fill_snapshot, coalesced_snapshot = fill.snapshot(), coalesced.snapshot()
+    print(
+        f"  batches={fill.count}  mean fill={fill_snapshot['sum'] / fill.count:.0%}  "
+        f"requests/batch={coalesced_snapshot['sum'] / coalesced.count:.1f}  "
+        f"queue wait p95 <= {waited.percentile(0.95) * 1000:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare a cold ingest with an exact re-upload served from the ingestion cache.
+
+The cold path here covers parsing, chunking and caching only; embedding and the Chroma
+write, which a cache hit also skips, come on top of it in production::
+
+    python -m benchmarks.bench_ingestion_cache --areas 12
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from backend.app import crud, schemas, serialization
+from backend.app.ingestion.parser import ingest_yearly_plan
+
+from ._db import make_engine, make_session
+from ._plans import render_plan_lines, synthetic_plan
+
+MODEL = "benchmark-model"
+SETTINGS_KEY = hashlib.sha256(MODEL.encode("utf-8")).hexdigest()
+
+
+def run(database_url: str, areas: int, items: int, repeat: int) -> None:
+    plan = synthetic_plan(areas=areas, items=items)
+    content = "\n".join(render_plan_lines(plan)).encode("utf-8")
+    engine = make_engine(database_url)
+    with make_session(engine) as db, tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "plan.txt"
+        path.write_bytes(content)
+
+        started = perf_counter()
+        file_hash = hashlib.sha256(content).hexdigest()
+        result = ingest_yearly_plan(path)
+        crud.store_ingestion_cache_entry(
+            db,
+            file_hash=file_hash,
+            extension=".txt",
+            settings_key=SETTINGS_KEY,
+            embedding_model=MODEL,
+            result=serialization.dumps(result).decode("utf-8"),
+            vector_ids=[chunk["id"] for chunk in result.chunks],
+            max_entries=100,
+            max_bytes=64 * 1024 * 1024,
+        )
+        cold = perf_counter() - started
+
+        best_hit = float("inf")
+        for _ in range(repeat):
+            started = perf_counter()
+            entry = crud.get_ingestion_cache_entry(
+                db,
+                file_hash=hashlib.sha256(content).hexdigest(),
+                extension=".txt",
+                settings_key=SETTINGS_KEY,
+            )
+            cached = schemas.YearlyPlanIngestionResult.parse_obj(serialization.loads(entry.result))
+            best_hit = min(best_hit, perf_counter() - started)
+        assert cached.structured == result.structured
+
+    engine.dispose()
+    print(
+        f"bytes={len(content):<9} chunks={len(result.chunks):<6} "
+        f"cold={cold * 1000:8.1f} ms  hit={best_hit * 1000:7.2f} ms  "
+        f"speedup={cold / best_hit:6.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--areas", type=int, default=12)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    run(args.database_url, args.areas, args.items, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compare per-row CRUD helpers with ``persist_yearly_plan`` for a large plan.
+
+Usage::
+
+    python -m benchmarks.bench_plan_persistence --trimesters 3 --areas 400
+"""
+from __future__ import annotations
+
+import argparse
+from time import perf_counter
+
+from sqlalchemy import func, select
+
+from backend.app import crud, models, schemas
+
+from ._db import count_statements, make_engine, make_session, seed_owner
+from ._plans import AREA_LISTS, synthetic_plan
+
+
+def _per_row(db, *, owner_id: int, plan: schemas.YearlyPlan) -> None:
+    first, last = plan.trimesters[0], plan.trimesters[-1]
+    year = crud.get_or_create_academic_year(
+        db,
+        owner_id=owner_id,
+        year=plan.year,
+        start_date=first.start_date,
+        end_date=last.end_date,
+    )
+    level = crud.create_level(
+        db, year_id=year.id, data=schemas.LevelBase(grade=plan.grade, subject=plan.subject)
+    )
+    for trimester in plan.trimesters:
+        db_trimester = crud.create_trimester(
+            db,
+            year_id=year.id,
+            trimester=schemas.TrimesterBase(
+                name=trimester.name,
+                start_date=trimester.start_date,
+                end_date=trimester.end_date,
+                total_weeks=trimester.weeks,
+            ),
+        )
+        for area in trimester.areas:
+            crud.create_topic(
+                db,
+                level_id=level.id,
+                trimester_id=db_trimester.id,
+                data=schemas.TopicBase(
+                    title=area.title,
+                    week_start=1,
+                    week_end=trimester.weeks,
+                    total_hours=0,
+                    metadata=schemas.TopicMetadata(
+                        **{key: getattr(area, key) for key in AREA_LISTS}
+                    ),
+                ),
+            )
+
+
+def run(database_url: str, plan: schemas.YearlyPlan) -> None:
+    topics = sum(len(trimester.areas) for trimester in plan.trimesters)
+    for label in ("per-row helpers", "persist_yearly_plan", "persist_yearly_plan (re-ingest)"):
+        if label != "persist_yearly_plan (re-ingest)":
+            engine = make_engine(database_url)
+            db = make_session(engine)
+            owner_id = seed_owner(db).id
+        with count_statements(engine) as statements:
+            started = perf_counter()
+            if label == "per-row helpers":
+                _per_row(db, owner_id=owner_id, plan=plan)
+            else:
+                crud.persist_yearly_plan(db, owner_id=owner_id, plan=plan)
+            elapsed = perf_counter() - started
+        stored = db.scalar(select(func.count()).select_from(models.Topic))
+        print(
+            f"{label:<32} topics={topics:<6} stored={stored:<6} "
+            f"round-trips={statements.count:<6} total={elapsed * 1000:9.1f} ms"
+        )
+    db.close()
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trimesters", type=int, default=3)
+    parser.add_argument("--areas", type=int, default=400)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    plan = synthetic_plan(trimesters=args.trimesters, areas=args.areas, items=args.items)
+    run(args.database_url, plan)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Compare the streaming PPTX reader with walking ``python-pptx`` shapes.
+
+Each parser runs in a fresh child process, which reports slides per second and how far
+parsing raised its peak RSS above the level reached after imports (worker processes of
+``--workers`` runs are not included). The deck puts each area's header lines in a text
+box and its lists in a table, plus a line break, a grouped text box (skipped by both
+readers) and a multi-paragraph cell per slide; the extracted lines are checked to match.
+
+Usage::
+
+    python -m benchmarks.bench_pptx_parser --areas 100 400 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+from ._memory import peak_rss_mib
+from ._plans import render_plan_lines, synthetic_plan
+
+
+def _write_deck(areas: int, items: int, path: Path) -> int:
+    """Write one slide per area; return the slide count."""
+
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # blank
+    headers: list[str] = []
+    rows: list[str] = []
+
+    def add_slide() -> None:
+        slide = presentation.slides.add_slide(layout)
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(9), Inches(1))
+        frame = box.text_frame
+        frame.text = headers[0]
+        for header in headers[1:]:
+            frame.add_paragraph().text = header
+        frame.add_paragraph().text = "Notes\vcontinued on the next line"
+        group = slide.shapes.add_group_shape()
+        group.shapes.add_textbox(0, 0, Inches(1), Inches(1)).text_frame.text = "Grouped"
+        table = slide.shapes.add_table(
+            len(rows) + 1, 1, Inches(0.5), Inches(1.5), Inches(9), Inches(5)
+        ).table
+        for row, text in zip(table.rows, rows):
+            row.cells[0].text = text
+        table.rows[len(rows)].cells[0].text = "Reviewed\nby the department"
+
+    for line in render_plan_lines(synthetic_plan(areas=areas, items=items)):
+        if line.startswith("Item "):
+            rows.append(line)
+            continue
+        if rows:
+            add_slide()
+            headers, rows = [], []
+        headers.append(line)
+    if headers:
+        add_slide()
+    presentation.save(path)
+    return len(presentation.slides)
+
+
+def _python_pptx_lines(path: Path) -> list[str]:
+    from pptx import Presentation
+
+    lines: list[str] = []
+    for slide in Presentation(path).slides:
+        for shape in slide.shapes:
+            if getattr(shape, "has_text_frame", False) and shape.has_text_frame:
+                for paragraph in shape.text_frame.paragraphs:
+                    if paragraph.text:
+                        lines.append(paragraph.text)
+            if getattr(shape, "has_table", False) and shape.has_table:
+                for row in shape.table.rows:
+                    for cell in row.cells:
+                        text = cell.text
+                        if text:
+                            lines.extend(text.splitlines())
+    return lines
+
+
+def _child(parser: str, workers: int, path: Path) -> None:
+    from pptx import Presentation  # noqa: F401 (both parsers pay for the same imports)
+
+    from backend.app.ingestion.pptx_parser import iter_pptx_lines
+
+    imported_rss = peak_rss_mib()
+    started = perf_counter()
+    if parser == "python-pptx":
+        lines = _python_pptx_lines(path)
+    else:
+        lines = list(iter_pptx_lines(path, workers=workers))
+    elapsed = perf_counter() - started
+    digest = hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()[:12]
+    print(f"{elapsed} {len(lines)} {digest} {imported_rss} {peak_rss_mib()}")
+
+
+def _measure(parser: str, workers: int, path: Path) -> tuple[float, int, str, float, float]:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_pptx_parser",
+            "--child",
+            parser,
+            str(workers),
+            str(path),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    elapsed, lines, digest, imported_rss, peak_rss = output.split()
+    return float(elapsed), int(lines), digest, float(imported_rss), float(peak_rss)
+
+
+def run(areas: int, items: int, workers: int, work_dir: Path) -> None:
+    path = work_dir / f"plan-{areas}.pptx"
+    slides = _write_deck(areas, items, path)
+    print(
+        f"areas={areas} items={items} slides={slides} "
+        f"size={path.stat().st_size / 1024:.0f} KiB"
+    )
+    cases = [("python-pptx", 0), ("streaming", 0)]
+    if workers > 1:
+        cases.append(("streaming", workers))
+    expected = None
+    for parser, case_workers in cases:
+        elapsed, lines, digest, imported_rss, peak_rss = _measure(parser, case_workers, path)
+        expected = expected or digest
+        label = parser + (f" x{case_workers}" if case_workers else "")
+        print(
+            f"  {label:<14} {elapsed * 1000:9.1f} ms  {slides / elapsed:8.1f} slides/s  "
+            f"peak RSS {peak_rss:7.1f} MiB (+{peak_rss - imported_rss:.1f} parsing)  "
+            f"lines={lines} {'same' if digest == expected else 'DIFFERENT'}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--areas", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--child", nargs=3, metavar=("PARSER", "WORKERS", "PATH"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+    if args.child:
+        _child(args.child[0], int(args.child[1]), Path(args.child[2]))
+        return
+    with tempfile.TemporaryDirectory(prefix="pptx-bench-") as work_dir:
+        for areas in args.areas:
+            run(areas, args.items, args.workers, Path(work_dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Time the schedule expander over a full school year for many groups.
+
+Also checks the windows ingested plans store (every area of a trimester spanning all of
+its weeks with no hours): each topic must get sessions, and a group's sessions in a
+trimester must be split between its topics evenly (sizes differing by at most one).
+
+Usage::
+
+    python -m benchmarks.bench_schedule_expansion --groups 500 --levels 10
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, time, timedelta
+from time import perf_counter
+
+from sqlalchemy import func, select
+
+from backend.app import models
+from backend.app.services.scheduler import (
+    GroupSchedule,
+    TopicWindow,
+    WeeklySlot,
+    expand_schedules,
+    materialise_sessions,
+)
+
+from ._db import make_engine, make_session, seed_owner
+
+TRIMESTERS = (
+    (date(2025, 2, 3), date(2025, 5, 9)),
+    (date(2025, 5, 26), date(2025, 8, 29)),
+    (date(2025, 9, 15), date(2025, 12, 5)),
+)
+HOLIDAYS = [date(2025, 4, 17), date(2025, 4, 18), date(2025, 5, 1), date(2025, 7, 25)]
+
+
+def _slots(group_index: int) -> list[WeeklySlot]:
+    return [
+        WeeklySlot(
+            weekday=(group_index + offset) % 5,
+            start_time=time(7 + (group_index + offset) % 8),
+            end_time=time(8 + (group_index + offset) % 8, 30),
+        )
+        for offset in range(4)
+    ]
+
+
+def synthetic_inputs(
+    groups: int, levels: int, topics_per_trimester: int, *, ingested: bool = False
+) -> tuple[list[GroupSchedule], list[TopicWindow]]:
+    schedules = [
+        GroupSchedule(group_id=index + 1, level_id=index % levels + 1, slots=_slots(index))
+        for index in range(groups)
+    ]
+    weeks = 14 // topics_per_trimester or 1
+    per_level = len(TRIMESTERS) * topics_per_trimester
+    windows = [
+        TopicWindow(
+            topic_id=per_level * level + topics_per_trimester * t + k + 1,
+            level_id=level + 1,
+            trimester_start=start,
+            trimester_end=end,
+            week_start=1 if ingested else k * weeks + 1,
+            week_end=14 if ingested else (k + 1) * weeks,
+            total_hours=0 if ingested else weeks * 5,
+        )
+        for level in range(levels)
+        for t, (start, end) in enumerate(TRIMESTERS)
+        for k in range(topics_per_trimester)
+    ]
+    return schedules, windows
+
+
+def run_expansion(groups: int, levels: int, topics: int, repeat: int) -> None:
+    schedules, windows = synthetic_inputs(groups, levels, topics)
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        rows = expand_schedules(schedules, windows, holidays=HOLIDAYS)
+        best = min(best, perf_counter() - started)
+    print(
+        f"expand_schedules     groups={groups:<5} topics={len(windows):<5} "
+        f"sessions={len(rows):<8} best={best * 1000:8.1f} ms"
+    )
+
+
+def check_ingested_windows(groups: int, levels: int, topics: int) -> None:
+    schedules, windows = synthetic_inputs(groups, levels, topics, ingested=True)
+    rows = expand_schedules(schedules, windows, holidays=HOLIDAYS)
+    trimester_of = {window.topic_id: window.trimester_start for window in windows}
+    counts: dict[tuple[int, date], dict[int, int]] = {}
+    for row in rows:
+        per_topic = counts.setdefault((row["group_id"], trimester_of[row["topic_id"]]), {})
+        per_topic[row["topic_id"]] = per_topic.get(row["topic_id"], 0) + 1
+    expected = len(windows) // levels
+    covered = sum(len(per_topic) for per_topic in counts.values())
+    assert covered == groups * expected, f"{groups * expected - covered} topics got no sessions"
+    spread = max(max(per_topic.values()) - min(per_topic.values()) for per_topic in counts.values())
+    assert spread <= 1, f"sessions split unevenly between topics (spread {spread})"
+    print(
+        f"ingested windows     groups={groups:<5} topics={len(windows):<5} "
+        f"sessions={len(rows):<8} every topic scheduled, spread={spread}"
+    )
+
+
+def run_materialise(database_url: str, groups: int, levels: int, topics: int) -> None:
+    schedules, windows = synthetic_inputs(groups, levels, topics)
+    engine = make_engine(database_url)
+    with make_session(engine) as db:
+        owner = seed_owner(db)
+        year = models.AcademicYear(
+            owner=owner, year=2025, start_date=TRIMESTERS[0][0], end_date=TRIMESTERS[-1][1]
+        )
+        trimesters = [
+            models.Trimester(
+                academic_year=year,
+                name=f"Trimester {index}",
+                start_date=start,
+                end_date=end,
+                total_weeks=(end - start) // timedelta(weeks=1) + 1,
+            )
+            for index, (start, end) in enumerate(TRIMESTERS, start=1)
+        ]
+        level_rows = [
+            models.Level(academic_year=year, grade=str(index), subject="Science")
+            for index in range(1, levels + 1)
+        ]
+        db.add_all([year, *trimesters, *level_rows])
+        db.flush()
+        db.add_all(
+            models.Group(
+                level_id=level_rows[schedule.level_id - 1].id,
+                name=f"G{schedule.group_id}",
+                weekly_schedule=[
+                    {
+                        "weekday": slot.weekday,
+                        "start_time": slot.start_time.isoformat(),
+                        "end_time": slot.end_time.isoformat(),
+                    }
+                    for slot in schedule.slots
+                ],
+            )
+            for schedule in schedules
+        )
+        trimester_by_start = {trimester.start_date: trimester for trimester in trimesters}
+        db.add_all(
+            models.Topic(
+                level_id=level_rows[window.level_id - 1].id,
+                trimester_id=trimester_by_start[window.trimester_start].id,
+                title=f"Topic {window.topic_id}",
+                week_start=window.week_start,
+                week_end=window.week_end,
+                total_hours=window.total_hours,
+            )
+            for window in windows
+        )
+        db.commit()
+
+        started = perf_counter()
+        created = materialise_sessions(
+            db, trimester_ids=[trimester.id for trimester in trimesters], holidays=HOLIDAYS
+        )
+        elapsed = perf_counter() - started
+        again = materialise_sessions(
+            db, trimester_ids=[trimester.id for trimester in trimesters], holidays=HOLIDAYS
+        )
+        stored = db.scalar(select(func.count()).select_from(models.ClassSession))
+    engine.dispose()
+    print(
+        f"materialise_sessions groups={groups:<5} created={created:<8} stored={stored:<8} "
+        f"repeat_created={again:<3} total={elapsed * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--levels", type=int, default=10)
+    parser.add_argument("--topics-per-trimester", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--skip-db", action="store_true", help="Only time the expansion.")
+    args = parser.parse_args()
+    run_expansion(args.groups, args.levels, args.topics_per_trimester, args.repeat)
+    check_ingested_windows(args.groups, args.levels, args.topics_per_trimester)
+    if not args.skip_db:
+        run_materialise(args.database_url, args.groups, args.levels, args.topics_per_trimester)
+
+
+if __name__ == "__main__":
+    main()
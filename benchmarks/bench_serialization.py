@@ -0,0 +1,69 @@
+"""Compare the stdlib/pydantic JSON paths with ``backend.app.serialization`` (orjson).
+
+Usage::
+
+    python -m benchmarks.bench_serialization --areas 10 100 400
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from collections.abc import Callable
+from time import perf_counter
+from typing import Any
+
+from backend.app import schemas, serialization
+from backend.app.ingestion.chunker import chunk_yearly_plan
+
+from ._plans import synthetic_plan
+
+
+def _best(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        function()
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def run(areas: int, items: int, repeat: int) -> None:
+    plan = synthetic_plan(areas=areas, items=items)
+    result = schemas.YearlyPlanIngestionResult(
+        structured=plan, chunks=list(chunk_yearly_plan(plan))
+    )
+    stdlib_text = result.json()
+    fast_bytes = serialization.dumps(result)
+
+    cases = {
+        "CLI encode (json indent=2)": lambda: json.dumps(
+            plan.dict(), indent=2, default=str
+        ),
+        "CLI encode (orjson indent)": lambda: serialization.dumps(plan, indent=True),
+        "CLI encode (orjson compact)": lambda: serialization.dumps(plan),
+        "result encode (.json())": result.json,
+        "result encode (orjson)": lambda: serialization.dumps(result),
+        "result decode (parse_raw)": lambda: schemas.YearlyPlanIngestionResult.parse_raw(
+            stdlib_text
+        ),
+        "result decode (orjson)": lambda: schemas.YearlyPlanIngestionResult.parse_obj(
+            serialization.loads(fast_bytes)
+        ),
+    }
+    print(f"areas={areas} items={items} payload={len(fast_bytes) / 1024:.0f} KiB")
+    for label, function in cases.items():
+        print(f"  {label:<30} {_best(function, repeat) * 1000:9.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--areas", type=int, nargs="+", default=[10, 100, 400])
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for areas in args.areas:
+        run(areas, args.items, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
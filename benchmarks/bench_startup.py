@@ -0,0 +1,87 @@
+"""Measure import-time startup cost with ``python -X importtime`` and enforce a budget.
+
+Fails (non-zero exit) when a target exceeds its budget or imports one of the heavy
+modules that must only be loaded on first use::
+
+    python -m benchmarks.bench_startup --app-budget-ms 1500 --cli-budget-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("torch", "sentence_transformers", "chromadb", "openai", "docx", "pptx", "pypdf")
+APP_BUDGET_MS = 1500.0
+CLI_BUDGET_MS = 150.0
+# label -> ``python`` arguments whose imports are profiled
+TARGETS = {
+    "app": ["-c", "import backend.app.main"],
+    "cli": ["run_pipeline.py", "--help"],
+}
+
+
+def import_profile(arguments: list[str]) -> tuple[float, set[str]]:
+    """Run ``python -X importtime`` and return total import time (ms) and module names."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        env=os.environ | {"PYTHONDONTWRITEBYTECODE": "1"},
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(arguments)} failed:\n{completed.stderr[-2000:]}")
+
+    total_us = 0
+    modules: set[str] = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, _, fields = line.partition(":")
+        _self_us, cumulative_us, name = (field for field in fields.split("|"))
+        modules.add(name.strip())
+        # Top-level imports are the ones without leading indentation in the name column.
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative_us)
+    return total_us / 1000, modules
+
+
+def heavy_imports(modules: set[str]) -> list[str]:
+    return sorted(module for module in modules if module.split(".")[0] in HEAVY_MODULES)
+
+
+def check(label: str, arguments: list[str], budget_ms: float) -> bool:
+    elapsed_ms, modules = import_profile(arguments)
+    heavy = heavy_imports(modules)
+    ok = elapsed_ms <= budget_ms and not heavy
+    status = "ok" if ok else "FAIL"
+    print(f"{label:<24} imports={elapsed_ms:8.1f} ms budget={budget_ms:8.1f} ms {status}")
+    if heavy:
+        print(f"  eagerly imported heavy modules: {', '.join(heavy[:10])}", file=sys.stderr)
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-budget-ms", type=float, default=APP_BUDGET_MS)
+    parser.add_argument("--cli-budget-ms", type=float, default=CLI_BUDGET_MS)
+    parser.add_argument(
+        "--skip-app", action="store_true", help="Only check the CLI (no FastAPI installed)."
+    )
+    args = parser.parse_args()
+
+    results = [check("run_pipeline.py --help", TARGETS["cli"], args.cli_budget_ms)]
+    if not args.skip_app:
+        results.append(check("import backend.app.main", TARGETS["app"], args.app_budget_ms))
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
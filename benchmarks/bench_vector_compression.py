@@ -0,0 +1,214 @@
+"""Measure memory and recall@k of compact (float16 / int8) vector search against float32.
+
+Chunks of ``--plans`` synthetic plans (one grade and subject each, named in every item so
+plans do not repeat each other) and of any ``--plan`` files are embedded once. Exact search
+is a brute-force float32 L2 ranking, the ordering Chroma approximates. Each compression
+then shortlists ``factor * k`` ids from a ``CompactIndex`` and re-ranks them by exact
+distance (factor 1 keeps the compact ranking). Queries are area and section titles, as the
+planner sends, plus single plan items. Exact ties are common with templated plans, so a
+result counts as a hit when its exact distance is within the k-th exact distance.
+
+``--footprint`` instead stores the chunks through ``VectorStore`` in a temporary Chroma
+directory, once without ``VECTOR_COMPRESSION`` and once per compression, each in a fresh
+process. It reports how far storing and searching raised the process RSS and the disk used
+by Chroma and by the compact index. The compact copy is added to Chroma's float32 vectors,
+not substituted for them.
+
+Usage::
+
+    python -m benchmarks.bench_vector_compression --plans 40 --k 5 10 --factors 1 2 4
+    python -m benchmarks.bench_vector_compression --plans 200 --footprint
+    python -m benchmarks.bench_vector_compression --plans 0 --plan plans/*.docx \\
+        --model sentence-transformers/all-MiniLM-L6-v2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from ._memory import rss_mib
+from ._plans import AREA_LISTS, synthetic_plan
+
+_SUBJECTS = ("Science", "Mathematics", "History", "Language", "Art", "Geography")
+
+
+def _load_chunks(args: argparse.Namespace) -> tuple[list[str], list[str]]:
+    """Return the chunk texts and the query texts of every plan."""
+
+    from backend.app.ingestion.chunker import chunk_yearly_plan
+    from backend.app.ingestion.parser import ingest_yearly_plan
+
+    plans = []
+    for index in range(args.plans):
+        grade = str(7 + index % 6)
+        subject = f"{_SUBJECTS[index // 6 % len(_SUBJECTS)]} {index // 36 + 1}"
+        plan = synthetic_plan(areas=args.areas, items=args.items, grade=grade, subject=subject)
+        for trimester in plan.trimesters:
+            for area in trimester.areas:
+                for key in AREA_LISTS:
+                    values = getattr(area, key)
+                    setattr(area, key, [f"{subject} grade {grade}: {value}" for value in values])
+        plans.append(plan)
+    plans.extend(ingest_yearly_plan(Path(path)).structured for path in args.plan)
+    texts = [chunk["text"] for plan in plans for chunk in chunk_yearly_plan(plan)]
+    queries: list[str] = []
+    for plan in plans:
+        for trimester in plan.trimesters:
+            for area in trimester.areas:
+                queries.extend(f"{area.title} {key}" for key in AREA_LISTS if getattr(area, key))
+                queries.extend(value for key in AREA_LISTS for value in getattr(area, key))
+    return texts, queries
+
+
+def _hits(found: list[int], distances: np.ndarray, kth: float) -> int:
+    return sum(1 for row in found if distances[row] <= kth * (1 + 1e-6) + 1e-9)
+
+
+def run(args: argparse.Namespace) -> None:
+    from backend.app.ingestion.embedder import EmbeddingService
+    from backend.app.vector_compression import CompactIndex, rescore
+
+    texts, queries = _load_chunks(args)
+    queries = random.Random(args.seed).sample(queries, min(args.queries, len(queries)))
+    embedder = EmbeddingService(model=args.model)
+    vectors = np.asarray(embedder.embed_texts(texts), dtype=np.float32)
+    query_vectors = np.asarray(embedder.embed_texts(queries), dtype=np.float32)
+    float32_bytes = vectors.nbytes
+    print(
+        f"model={args.model} chunks={len(texts)} dimension={vectors.shape[1]} "
+        f"queries={len(queries)} float32={float32_bytes / 1024:.0f} KiB"
+    )
+
+    norms = np.einsum("ij,ij->i", vectors, vectors)
+    started = perf_counter()
+    for query in query_vectors:
+        np.argpartition(norms - 2 * (vectors @ query), max(args.k) - 1)
+    exact_ms = (perf_counter() - started) * 1000 / len(queries)
+    # Ground truth from differences: expanding |x - q|^2 loses the precision to break ties.
+    exact = [np.square(vectors - query).sum(axis=1) for query in query_vectors]
+    print(f"  {'float32':<8} exact brute force {exact_ms:8.3f} ms/query")
+
+    ids = [str(row) for row in range(len(texts))]
+    for compression in args.compressions:
+        with tempfile.TemporaryDirectory(prefix="compact-bench-") as directory:
+            index = CompactIndex(Path(directory), compression)
+            index.add(ids, vectors)
+            disk = sum(path.stat().st_size for path in Path(directory).iterdir())
+            print(
+                f"  {compression:<8} memory={index.nbytes / 1024:7.0f} KiB "
+                f"(adds {index.nbytes / float32_bytes:6.1%} to float32)  "
+                f"disk={disk / 1024:7.0f} KiB"
+            )
+            for factor in args.factors:
+                for k in args.k:
+                    results = []
+                    started = perf_counter()
+                    for query in query_vectors:
+                        shortlist = [int(row) for row in index.search(query, k * factor)]
+                        if factor > 1:
+                            order = rescore(query, vectors[shortlist])[:k]
+                            shortlist = [shortlist[row] for row in order]
+                        results.append(shortlist[:k])
+                    elapsed = (perf_counter() - started) * 1000 / len(queries)
+                    hits = sum(
+                        _hits(found, distances, np.partition(distances, k - 1)[k - 1])
+                        for found, distances in zip(results, exact)
+                    )
+                    print(
+                        f"    factor={factor:<2} recall@{k:<3}={hits / (k * len(queries)):7.2%}"
+                        f"  {elapsed:8.3f} ms/query"
+                    )
+
+
+def _disk_mib(path: Path) -> float:
+    return sum(item.stat().st_size for item in path.rglob("*") if item.is_file()) / 2**20
+
+
+def _footprint_child(args: argparse.Namespace, directory: Path) -> None:
+    """Store and search every chunk with the settings in the environment; print the cost."""
+
+    from backend.app.ingestion.embedder import EmbeddingService
+    from backend.app.vectorstore import VectorStore
+
+    texts, queries = _load_chunks(args)
+    queries = random.Random(args.seed).sample(queries, min(args.queries, len(queries)))
+    embedder = EmbeddingService(model=args.model)
+    embeddings = embedder.embed_texts(texts)
+    embedder.embed_texts(queries[:1])  # load the model before the baseline is taken
+    store = VectorStore("footprint-bench", embedder=embedder)
+    before = rss_mib()
+    for start in range(0, len(texts), 1000):
+        stop = min(start + 1000, len(texts))
+        store.add_texts(
+            ids=[str(row) for row in range(start, stop)],
+            texts=texts[start:stop],
+            embeddings=embeddings[start:stop],
+            metadatas=[{"row": str(row)} for row in range(start, stop)],
+        )
+    for query in queries:
+        store.similarity_search(query, n_results=max(args.k))
+    compact = directory / "compact"
+    compact_mib = _disk_mib(compact) if compact.exists() else 0.0
+    print(f"{rss_mib() - before} {_disk_mib(directory) - compact_mib} {compact_mib}")
+
+
+def footprint(args: argparse.Namespace) -> None:
+    print(f"model={args.model} footprint of VectorStore (MiB)")
+    for compression in ["", *args.compressions]:
+        with tempfile.TemporaryDirectory(prefix="footprint-bench-") as directory:
+            env = os.environ | {
+                "CHROMA_PERSIST_DIRECTORY": directory,
+                "VECTOR_COMPRESSION": compression,
+                "EMBEDDING_MODEL": args.model,
+                "EMBEDDING_MICRO_BATCHING": "false",
+            }
+            command = [sys.executable, "-m", "benchmarks.bench_vector_compression"]
+            arguments = [argument for argument in sys.argv[1:] if argument != "--footprint"]
+            output = subprocess.run(
+                [*command, *arguments, "--footprint-child", directory],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        memory, chroma_disk, compact_disk = (float(value) for value in output.split()[-3:])
+        print(
+            f"  {compression or 'off':<8} process RSS +{memory:7.1f}  "
+            f"disk: chroma {chroma_disk:7.1f}  compact {compact_disk:7.1f}  "
+            f"total {chroma_disk + compact_disk:7.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=40, help="Synthetic plans to generate.")
+    parser.add_argument("--plan", nargs="*", default=[], help="Plan files to add.")
+    parser.add_argument("--areas", type=int, default=6)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--compressions", nargs="+", default=["float16", "int8"])
+    parser.add_argument("--model", default="hashing:384")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--footprint", action="store_true")
+    parser.add_argument("--footprint-child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.footprint_child:
+        _footprint_child(args, args.footprint_child)
+    elif args.footprint:
+        footprint(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
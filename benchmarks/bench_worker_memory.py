@@ -0,0 +1,197 @@
+"""Measure per-worker memory for the three ways of running N embedding workers.
+
+* ``private``: each worker loads its own model (plain ``uvicorn --workers``).
+* ``preload``: the model is loaded once and workers are forked from that process
+  (``gunicorn -c gunicorn.conf.py``).
+* ``server``: one ``backend.app.embedding_server`` process holds the model and workers
+  embed over its Unix socket (``EMBEDDING_SERVER_SOCKET``).
+
+Every worker embeds a few texts and then stays alive while RSS, PSS (shared pages split
+between the processes using them) and USS (private pages) are read from
+``/proc/<pid>/smaps_rollup``, so Linux only. Total PSS is what the node actually pays.
+
+Usage::
+
+    python -m benchmarks.bench_worker_memory --workers 4 \\
+        --model sentence-transformers/all-MiniLM-L6-v2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+MODES = ("private", "preload", "server")
+TEXTS = [f"Objective {index}: explain the water cycle to grade 7" for index in range(64)]
+
+
+def _memory_mib(pid: int) -> dict[str, float]:
+    fields: dict[str, float] = {}
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                fields[name] = int(rest.split()[0]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def _worker() -> None:
+    """Embed a few texts, report readiness, then wait to be measured."""
+
+    from backend.app.ingestion.embedder import EmbeddingService
+
+    EmbeddingService().embed_texts(TEXTS)
+    print("ready", flush=True)
+    sys.stdin.read()
+
+
+def _spawn_workers(count: int, env: dict[str, str]) -> list[subprocess.Popen]:
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_worker_memory", "--worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            text=True,
+        )
+        for _ in range(count)
+    ]
+    for worker in workers:
+        if worker.stdout.readline().strip() != "ready":  # type: ignore[union-attr]
+            raise SystemExit("worker failed to start")
+    return workers
+
+
+def _fork_workers(count: int) -> list[tuple[int, int]]:
+    """Fork ``count`` workers from this (model-holding) process; return (pid, write fd)."""
+
+    from backend.app.ingestion.embedder import EmbeddingService
+
+    children = []
+    for _ in range(count):
+        ready_read, ready_write = os.pipe()
+        release_read, release_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            os.close(release_write)
+            EmbeddingService().embed_texts(TEXTS)
+            os.write(ready_write, b"r")
+            os.read(release_read, 1)
+            os._exit(0)
+        os.close(ready_write)
+        os.close(release_read)
+        os.read(ready_read, 1)
+        os.close(ready_read)
+        children.append((pid, release_write))
+    return children
+
+
+def _report(
+    mode: str, workers: dict[int, dict[str, float]], extra: dict[str, Any] | None
+) -> None:
+    count = len(workers)
+    mean = {
+        key: sum(usage[key] for usage in workers.values()) / count
+        for key in ("rss", "pss", "uss")
+    }
+    total_pss = sum(usage["pss"] for usage in workers.values()) + (extra or {}).get("pss", 0)
+    print(
+        f"  {mode:<8} per worker: RSS {mean['rss']:7.1f}  PSS {mean['pss']:7.1f}  "
+        f"USS {mean['uss']:7.1f} MiB   total PSS {total_pss:8.1f} MiB"
+        + (f"  (incl. {extra['label']} PSS {extra['pss']:.1f})" if extra else "")
+    )
+
+
+def run(mode: str, count: int, env: dict[str, str]) -> None:
+    if mode == "private":
+        workers = _spawn_workers(count, env)
+        _report(mode, {worker.pid: _memory_mib(worker.pid) for worker in workers}, None)
+        for worker in workers:
+            worker.kill()
+            worker.wait()
+    elif mode == "server":
+        with tempfile.TemporaryDirectory(prefix="embed-sock-") as directory:
+            socket_path = str(Path(directory) / "embed.sock")
+            server = subprocess.Popen(
+                [sys.executable, "-m", "backend.app.embedding_server", "--socket", socket_path],
+                stdout=subprocess.PIPE,
+                env=env,
+                text=True,
+            )
+            server.stdout.readline()  # type: ignore[union-attr]  # "Serving embeddings on ..."
+            workers = _spawn_workers(count, env | {"EMBEDDING_SERVER_SOCKET": socket_path})
+            server_usage = _memory_mib(server.pid)
+            _report(
+                mode,
+                {worker.pid: _memory_mib(worker.pid) for worker in workers},
+                {"label": "server", **server_usage},
+            )
+            for process in [*workers, server]:
+                process.kill()
+                process.wait()
+    else:
+        # Fork from a clean child so the master only holds what preload_model loads.
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_worker_memory",
+                "--preload-master",
+                str(count),
+            ],
+            env=env,
+            check=True,
+        )
+
+
+def _preload_master(count: int) -> None:
+    from backend.app.ingestion.embedder import preload_model
+
+    preload_model()
+    children = _fork_workers(count)
+    master_usage = _memory_mib(os.getpid())
+    _report(
+        "preload",
+        {pid: _memory_mib(pid) for pid, _ in children},
+        {"label": "master", **master_usage},
+    )
+    for pid, release in children:
+        os.write(release, b"x")
+        os.close(release)
+        os.waitpid(pid, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default="hashing:384")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--preload-master", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _worker()
+        return
+    if args.preload_master:
+        _preload_master(args.preload_master)
+        return
+
+    env = os.environ | {"EMBEDDING_MODEL": args.model, "EMBEDDING_MICRO_BATCHING": "false"}
+    print(f"model={args.model} workers={args.workers}")
+    for mode in args.modes:
+        run(mode, args.workers, env)
+        time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""A local stand-in for the OpenAI Responses API with configurable latency.
+
+``POST .../responses`` answers after ``--latency`` seconds (normally distributed with
+``--jitter`` standard deviation, never below zero) with a lesson plan in the bullet format
+``LessonPlanner`` parses, one session per schedule line of the prompt. Requests with
+``"stream": true`` get server-sent events: ``response.created``, then the text as
+``response.output_text.delta`` events spread over the latency after ``--first-token``
+seconds, then ``response.completed``. ``--error-rate`` answers that fraction with HTTP 500.
+
+Point the planner at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``::
+
+    python -m benchmarks.fake_responses --port 8081 --latency 2.0 --jitter 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from itertools import count
+
+_SCHEDULE_LINE = re.compile(r"^- \d{4}-\d{2}-\d{2} ", re.MULTILINE)
+_ids = count(1)
+
+
+def lesson_text(prompt: str) -> str:
+    sessions = max(len(_SCHEDULE_LINE.findall(prompt)), 1)
+    return "\n".join(
+        f"Session {index}\n"
+        f"- Pre: Warm-up questions for session {index}\n"
+        f"- While: Guided practice in pairs for session {index}\n"
+        f"- Post: Exit ticket for session {index}\n"
+        f"- Materials: Worksheet {index}"
+        for index in range(1, sessions + 1)
+    )
+
+
+def _response_object(model: str, text: str, status: str = "completed") -> dict[str, object]:
+    number = next(_ids)
+    return {
+        "id": f"resp_fake_{number}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": status,
+        "model": model,
+        "output": [
+            {
+                "id": f"msg_fake_{number}",
+                "type": "message",
+                "status": status,
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ]
+        if text
+        else [],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+
+
+def _prompt_text(request: dict[str, object]) -> str:
+    prompt = request.get("input", "")
+    if isinstance(prompt, str):
+        return prompt
+    parts: list[str] = []
+    for message in prompt or []:
+        content = message.get("content", "") if isinstance(message, dict) else ""
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(item.get("text", "") for item in content if isinstance(item, dict))
+    return "\n".join(parts)
+
+
+class FakeResponsesServer:
+    def __init__(
+        self,
+        *,
+        latency: float,
+        jitter: float = 0.0,
+        first_token: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.first_token = first_token
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        return max(self._random.gauss(self.latency, self.jitter), 0.0)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: dict[str, str] = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                if method != "POST" or not path.rstrip("/").endswith("/responses"):
+                    self._write(writer, 404, {"error": {"message": f"No route {path}"}})
+                elif self._random.random() < self.error_rate:
+                    await asyncio.sleep(self._delay())
+                    self._write(writer, 500, {"error": {"message": "Injected failure"}})
+                else:
+                    request = json.loads(body or b"{}")
+                    await self._respond(writer, request)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, request: dict[str, object]) -> None:
+        model = str(request.get("model", "fake"))
+        text = lesson_text(_prompt_text(request))
+        delay = self._delay()
+        if not request.get("stream"):
+            await asyncio.sleep(delay)
+            self._write(writer, 200, _response_object(model, text))
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n"
+        )
+        sequence = count()
+
+        def event(kind: str, **payload: object) -> None:
+            data = json.dumps({"type": kind, "sequence_number": next(sequence), **payload})
+            chunk = f"event: {kind}\ndata: {data}\n\n".encode("utf-8")
+            writer.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+
+        event("response.created", response=_response_object(model, "", "in_progress"))
+        await writer.drain()
+        first_token = min(self.first_token, delay)
+        await asyncio.sleep(first_token)
+        pieces = re.findall(r"\S+\s*", text)
+        interval = (delay - first_token) / max(len(pieces), 1)
+        for piece in pieces:
+            event(
+                "response.output_text.delta",
+                item_id="msg_fake",
+                output_index=0,
+                content_index=0,
+                delta=piece,
+            )
+            await writer.drain()
+            await asyncio.sleep(interval)
+        event("response.completed", response=_response_object(model, text))
+        writer.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, payload: dict[str, object]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 404: "Not Found", 500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body
+        )
+
+
+async def serve(host: str, port: int, server: FakeResponsesServer) -> None:
+    listener = await asyncio.start_server(server.handle, host, port)
+    bound_port = listener.sockets[0].getsockname()[1]
+    print(f"Serving fake Responses API on http://{host}:{bound_port}/v1", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081, help="0 picks a free port.")
+    parser.add_argument("--latency", type=float, default=1.0, help="Mean seconds per response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency std deviation.")
+    parser.add_argument("--first-token", type=float, default=0.2, help="Streaming TTFT.")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = FakeResponsesServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        first_token=args.first_token,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(serve(args.host, args.port, server))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""Load-test the API offline: fake Responses API, stand-in embeddings, throwaway storage.
+
+The harness starts ``benchmarks.fake_responses`` and the app (``uvicorn`` with
+``--workers`` processes, or in this process with ``--in-process``) with
+``EMBEDDING_MODEL=hashing:384``, a temporary Chroma directory and a SQLite database in the
+same directory unless ``--database-url`` is given. ``--concurrency`` client threads then
+send ``--requests`` requests, or keep sending for ``--duration`` seconds, picking
+``POST /plans/ingest`` or ``POST /plans/{id}/topics/{id}/generate`` by the ``--mix``
+weights. Uploads cycle through ``--plans`` generated plans, so uploads after the first
+``--plans`` are ingestion-cache hits.
+
+The report gives throughput and p50/p95/p99 latency per endpoint as JSON (``--output``)
+and a short summary on stdout. The planner does not request streamed responses, so the
+fake's ``--first-token`` only matters once it does::
+
+    python -m benchmarks.loadtest --requests 500 --concurrency 16 --mix ingest=1,generate=4 \\
+        --latency 1.5 --jitter 0.4 --output loadtest.json
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from time import monotonic, perf_counter, sleep
+from typing import Any
+
+from ._plans import PLAN_FORMATS, synthetic_plan, write_plan_file
+
+SCHEMA_VERSION = 1
+ENDPOINTS = ("ingest", "generate")
+QUANTILES = (50, 95, 99)
+
+
+@dataclass(frozen=True)
+class Request:
+    endpoint: str
+    path: str
+    body: bytes
+    content_type: str
+
+
+@dataclass(frozen=True)
+class Sample:
+    endpoint: str
+    latency: float
+    status: int  # 0 when the connection failed
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _multipart(filename: str, content: bytes) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+        f"filename=\"{filename}\"\r\nContent-Type: application/octet-stream\r\n\r\n"
+    ).encode("utf-8") + content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _ingest_requests(work_dir: Path, plans: int, areas: int, formats: list[str]) -> list[Request]:
+    requests = []
+    for index in range(plans):
+        suffix = formats[index % len(formats)]
+        path = write_plan_file(
+            synthetic_plan(areas=areas, grade=str(7 + index % 5), subject=f"Subject {index}"),
+            work_dir / f"plan-{index}{suffix}",
+        )
+        body, content_type = _multipart(path.name, path.read_bytes())
+        requests.append(Request("ingest", "/plans/ingest", body, content_type))
+    return requests
+
+
+def _generate_request(rng: random.Random, sessions: int) -> Request:
+    start = date(2025, 2, 3) + timedelta(days=rng.randrange(200))
+    body = {
+        "schedule": [
+            {
+                "date": (start + timedelta(days=7 * index)).isoformat(),
+                "start_time": "08:00:00",
+                "end_time": "09:00:00",
+            }
+            for index in range(sessions)
+        ],
+        "metadata": {
+            "topic": rng.choice(["objectives", "contents", "methodology", "assessment"]),
+            "grade": str(rng.randint(7, 11)),
+            "trimester": str(rng.randint(1, 3)),
+        },
+    }
+    return Request(
+        "generate", "/plans/1/topics/1/generate", json.dumps(body).encode(), "application/json"
+    )
+
+
+def _parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r} in --mix")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+class _Client:
+    """One keep-alive HTTP connection per client thread."""
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.host, self.port, self.timeout = host, port, timeout
+        self._local = threading.local()
+
+    def send(self, request: Request) -> Sample:
+        reused = getattr(self._local, "connection", None) is not None
+        started = perf_counter()
+        try:
+            status = self._send(request)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            if not reused:
+                status = 0
+            else:  # the server closed an idle keep-alive connection: reconnect once
+                started = perf_counter()
+                try:
+                    status = self._send(request)
+                except (OSError, http.client.HTTPException):
+                    status = 0
+        except (OSError, http.client.HTTPException):
+            status = 0
+        return Sample(request.endpoint, perf_counter() - started, status)
+
+    def _send(self, request: Request) -> int:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        try:
+            connection.request(
+                "POST",
+                request.path,
+                body=request.body,
+                headers={"Content-Type": request.content_type},
+            )
+            response = connection.getresponse()
+            response.read()
+        except BaseException:
+            connection.close()
+            self._local.connection = None
+            raise
+        return response.status
+
+
+def _wait_until_healthy(
+    host: str, port: int, timeout: float, process: subprocess.Popen | None = None
+) -> None:
+    deadline = monotonic() + timeout
+    while monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise SystemExit(f"App exited with status {process.returncode} during startup")
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        sleep(0.1)
+    raise SystemExit(f"App did not become healthy on {host}:{port} within {timeout:.0f} s")
+
+
+def _start_fake(args: argparse.Namespace) -> tuple[subprocess.Popen, str]:
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_responses",
+            "--port",
+            "0",
+            "--latency",
+            str(args.latency),
+            "--jitter",
+            str(args.jitter),
+            "--first-token",
+            str(args.first_token),
+            "--error-rate",
+            str(args.error_rate),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    banner = process.stdout.readline()  # type: ignore[union-attr]
+    return process, banner.rsplit(" ", 1)[-1].strip()
+
+
+def _app_environment(args: argparse.Namespace, work_dir: Path, fake_url: str) -> dict[str, str]:
+    environment = {
+        "DATABASE_URL": args.database_url or f"sqlite:///{work_dir / 'loadtest.db'}",
+        "CHROMA_PERSIST_DIRECTORY": str(work_dir / "chroma"),
+        "EMBEDDING_MODEL": "hashing:384",
+        "OPENAI_API_KEY": "loadtest",
+        "OPENAI_BASE_URL": fake_url,
+        "PLANNER_MODELS": json.dumps(["fake-planner"]),
+        "WARMUP_ON_STARTUP": "false",
+    }
+    for assignment in args.app_env:
+        name, _, value = assignment.partition("=")
+        environment[name] = value
+    return environment
+
+
+@contextmanager
+def _running_app(
+    args: argparse.Namespace, environment: dict[str, str]
+) -> Iterator[tuple[str, int]]:
+    host, port = "127.0.0.1", _free_port()
+    if args.in_process:
+        # Settings are read on first use, so the environment must be in place before import.
+        os.environ.update(environment)
+        import uvicorn
+
+        from backend.app.main import app
+
+        server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, name="loadtest-app", daemon=True)
+        thread.start()
+        try:
+            _wait_until_healthy(host, port, args.startup_timeout)
+            yield host, port
+        finally:
+            server.should_exit = True
+            thread.join()
+        return
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.app.main:app",
+            "--host",
+            host,
+            "--port",
+            str(port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+        ],
+        env=os.environ | environment,
+    )
+    try:
+        _wait_until_healthy(host, port, args.startup_timeout, process)
+        yield host, port
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _request_stream(
+    args: argparse.Namespace, uploads: list[Request], rng: random.Random
+) -> Iterator[Request]:
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    upload_index = 0
+    deadline = monotonic() + args.duration if args.duration else None
+    sent = 0
+    while (deadline is None and sent < args.requests) or (
+        deadline is not None and monotonic() < deadline
+    ):
+        if rng.choices(names, weights)[0] == "ingest":
+            yield uploads[upload_index % len(uploads)]
+            upload_index += 1
+        else:
+            yield _generate_request(rng, args.sessions)
+        sent += 1
+
+
+def _drive(
+    client: _Client, requests: Iterator[Request], concurrency: int
+) -> tuple[list[Sample], float]:
+    lock = threading.Lock()
+    samples: list[Sample] = []
+
+    def worker() -> None:
+        while True:
+            with lock:
+                request = next(requests, None)
+            if request is None:
+                return
+            sample = client.send(request)
+            with lock:
+                samples.append(sample)
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return samples, perf_counter() - started
+
+
+def _percentile(ordered: list[float], quantile: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+
+    rank = max(math.ceil(quantile / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, dict[str, Any]]:
+    """Per-endpoint (and ``all``) counts, throughput and latency of successful requests."""
+
+    summary: dict[str, dict[str, Any]] = {}
+    for name in (*ENDPOINTS, "all"):
+        selected = [sample for sample in samples if name in ("all", sample.endpoint)]
+        if not selected:
+            continue
+        succeeded = sorted(
+            sample.latency for sample in selected if 200 <= sample.status < 300
+        )
+        statuses: dict[str, int] = {}
+        for sample in selected:
+            statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+        summary[name] = {
+            "requests": len(selected),
+            "errors": len(selected) - len(succeeded),
+            "statuses": statuses,
+            "throughput_rps": len(selected) / elapsed,
+            "latency_ms": {
+                **{
+                    f"p{quantile}": _percentile(succeeded, quantile) * 1000
+                    for quantile in QUANTILES
+                },
+                "mean": sum(succeeded) / len(succeeded) * 1000,
+                "max": succeeded[-1] * 1000,
+            }
+            if succeeded
+            else None,
+        }
+    return summary
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="planner-loadtest-") as directory:
+        work_dir = Path(directory)
+        uploads = _ingest_requests(work_dir, args.plans, args.areas, args.formats)
+        fake, fake_url = _start_fake(args)
+        try:
+            environment = _app_environment(args, work_dir, fake_url)
+            with _running_app(args, environment) as (host, port):
+                client = _Client(host, port, args.timeout)
+                # Load the embedding model, create the schema and give retrieval some context.
+                warmup = [uploads[0]] + [
+                    _generate_request(rng, args.sessions) for _ in range(args.warmup)
+                ]
+                for request in warmup:
+                    sample = client.send(request)
+                    if not 200 <= sample.status < 300:
+                        raise SystemExit(
+                            f"Warm-up {request.endpoint} request failed with status "
+                            f"{sample.status}"
+                        )
+                samples, elapsed = _drive(
+                    client, _request_stream(args, uploads[1:] or uploads, rng), args.concurrency
+                )
+        finally:
+            fake.terminate()
+            fake.wait()
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mode": "in-process" if args.in_process else f"uvicorn x{args.workers}",
+            "database": environment["DATABASE_URL"].split(":", 1)[0],
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "requests": args.requests if not args.duration else None,
+            "duration_s": args.duration,
+            "plans": args.plans,
+            "areas": args.areas,
+            "formats": args.formats,
+            "fake_latency_s": args.latency,
+            "fake_jitter_s": args.jitter,
+            "fake_error_rate": args.error_rate,
+            "elapsed_s": elapsed,
+        },
+        "endpoints": summarize(samples, elapsed),
+    }
+
+
+def _print_summary(report: dict[str, Any]) -> None:
+    meta = report["meta"]
+    print(
+        f"{meta['mode']} concurrency={meta['concurrency']} "
+        f"elapsed={meta['elapsed_s']:.1f} s database={meta['database']}"
+    )
+    for name, stats in report["endpoints"].items():
+        latency = stats["latency_ms"] or {}
+        print(
+            f"  {name:<9} requests={stats['requests']:<6} errors={stats['errors']:<4} "
+            f"{stats['throughput_rps']:8.2f} req/s  "
+            + "  ".join(
+                f"p{quantile} {latency.get(f'p{quantile}', float('nan')):8.1f} ms"
+                for quantile in QUANTILES
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--duration", type=float, default=None, help="Seconds; overrides --requests."
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("ingest=1,generate=4"))
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--in-process", action="store_true", help="Run the app in this process.")
+    parser.add_argument("--database-url", default=None, help="Default: SQLite in a temp dir.")
+    parser.add_argument(
+        "--app-env",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Extra app setting, e.g. CHUNK_DEDUP_ENABLED=false (repeatable).",
+    )
+    parser.add_argument("--plans", type=int, default=20, help="Distinct plan uploads.")
+    parser.add_argument("--areas", type=int, default=6)
+    parser.add_argument("--formats", nargs="+", choices=PLAN_FORMATS, default=[".txt", ".docx"])
+    parser.add_argument("--sessions", type=int, default=4, help="Schedule slots per generate.")
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake model latency (s).")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--first-token", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--warmup", type=int, default=2, help="Unrecorded generate requests.")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report here.")
+    args = parser.parse_args()
+
+    report = run(args)
+    _print_summary(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Report written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
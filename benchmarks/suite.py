@@ -0,0 +1,299 @@
+"""Reproducible ingestion/retrieval benchmark suite with baseline comparison.
+
+Times the text and format parsers, chunking, embedding, the vector store and the lesson
+planner's prompt handling against synthetic yearly plans, offline. Embeddings use the
+``hashing:<dimension>`` stand-in model, the vector store a temporary Chroma directory and
+``plan_topic`` a completion provider that answers from ``fake_responses``.
+
+Usage::
+
+    python -m benchmarks.suite run --output results.json
+    python -m benchmarks.suite run --baseline baseline.json --threshold 0.15
+    python -m benchmarks.suite compare baseline.json results.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from collections.abc import Callable
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from backend.app import serialization
+
+from ._plans import render_plan_lines, synthetic_plan, write_plan_files
+from .fake_responses import lesson_text
+
+SCHEMA_VERSION = 1
+
+
+def _measure(function: Callable[[], Any], *, rounds: int, items: int) -> dict[str, Any]:
+    function()  # warm-up: imports, caches, lazily loaded models
+    timings = []
+    for _ in range(rounds):
+        started = perf_counter()
+        function()
+        timings.append(perf_counter() - started)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "rounds": rounds,
+        "items": items,
+    }
+
+
+def _planner_response(sessions: int) -> str:
+    return "\n".join(
+        f"- Session {index}\n"
+        f"  - Pre: Warm-up question {index}\n"
+        f"  - While: Guided practice {index}\n"
+        f"  - Post: Exit ticket {index}\n"
+        f"  - Materials: Worksheet {index}"
+        for index in range(1, sessions + 1)
+    )
+
+
+def run_suite(
+    *,
+    trimesters: int,
+    areas: int,
+    items: int,
+    rounds: int,
+    dimension: int,
+    work_dir: Path,
+) -> dict[str, Any]:
+    # Settings are read once per process, so point them at the offline backends first.
+    os.environ["EMBEDDING_MODEL"] = f"hashing:{dimension}"
+    os.environ["CHROMA_PERSIST_DIRECTORY"] = str(work_dir / "chroma")
+
+    from backend.app.ingestion.chunker import chunk_yearly_plan
+    from backend.app.ingestion.docx_parser import parse_yearly_plan_docx
+    from backend.app.ingestion.embedder import EmbeddingService
+    from backend.app.ingestion.pdf_parser import parse_yearly_plan_pdf
+    from backend.app.ingestion.pptx_parser import parse_yearly_plan_pptx
+    from backend.app.ingestion.text_parser import parse_yearly_plan_from_lines
+    from backend.app.services.planner import LessonPlanner
+
+    plan = synthetic_plan(trimesters=trimesters, areas=areas, items=items)
+    lines = render_plan_lines(plan)
+    files = write_plan_files(plan, work_dir)
+    chunks = list(chunk_yearly_plan(plan))
+    texts = [chunk["text"] for chunk in chunks]
+    embedder = EmbeddingService(model=f"hashing:{dimension}")
+    embeddings = embedder.embed_texts(texts)
+
+    results: dict[str, Any] = {}
+    skipped: dict[str, str] = {}
+    results["parse_lines"] = _measure(
+        lambda: parse_yearly_plan_from_lines(lines), rounds=rounds, items=len(lines)
+    )
+
+    def parse_text(path: Path) -> Any:
+        return parse_yearly_plan_from_lines(path.read_text(encoding="utf-8").splitlines())
+
+    format_parsers = {
+        ".txt": parse_text,
+        ".md": parse_text,
+        ".docx": parse_yearly_plan_docx,
+        ".pptx": parse_yearly_plan_pptx,
+        ".pdf": parse_yearly_plan_pdf,
+    }
+    for suffix, path in files.items():
+        parse = format_parsers[suffix]
+        results[f"parse{suffix.replace('.', '_')}"] = _measure(
+            lambda parse=parse, path=path: parse(path), rounds=rounds, items=len(lines)
+        )
+    results["chunk"] = _measure(
+        lambda: list(chunk_yearly_plan(plan)), rounds=rounds, items=len(chunks)
+    )
+    results["embed"] = _measure(
+        lambda: embedder.embed_texts(texts), rounds=rounds, items=len(chunks)
+    )
+
+    class _StaticContext:
+        def similarity_search(self, query: str, *, n_results: int = 5) -> list[dict[str, Any]]:
+            return chunks[:n_results]
+
+    vector_store: Any = None
+    try:
+        from backend.app.vectorstore import VectorStore
+
+        counter = iter(range(sys.maxsize))
+
+        def add_texts() -> None:
+            # Fresh ids each round so Chroma inserts instead of rejecting duplicates.
+            generation = next(counter)
+            vector_store.add_texts(
+                ids=[f"{generation}-{chunk['id']}" for chunk in chunks],
+                texts=texts,
+                embeddings=embeddings,
+                metadatas=[chunk["metadata"] for chunk in chunks],
+            )
+
+        vector_store = VectorStore("benchmark-suite", embedder=embedder)
+        results["vectorstore_add"] = _measure(add_texts, rounds=rounds, items=len(chunks))
+        queries = [f"{area.title} objectives" for area in plan.trimesters[0].areas[:20]]
+        results["vectorstore_search"] = _measure(
+            lambda: [vector_store.similarity_search(query) for query in queries],
+            rounds=rounds,
+            items=len(queries),
+        )
+    except ImportError as exc:
+        vector_store = _StaticContext()
+        skipped["vectorstore_add"] = skipped["vectorstore_search"] = f"{exc}"
+
+    class _OfflineCompletion:
+        name = "benchmark"
+
+        async def complete(self, prompt: str) -> str:
+            return lesson_text(prompt)
+
+    planner = LessonPlanner(
+        vector_store=vector_store,
+        providers=[_OfflineCompletion()],
+    )
+    start = date(plan.year, 2, 3)
+    schedule = [
+        (start + timedelta(days=7 * week + day), time(8, 0), time(9, 30))
+        for week in range(12)
+        for day in (0, 2, 4)
+    ]
+    context_blocks = chunks[:5]
+    metadata = {"grade": plan.grade, "subject": plan.subject, "topic": "objectives"}
+    response = _planner_response(len(schedule))
+    results["build_prompt"] = _measure(
+        lambda: planner._build_prompt(
+            schedule=schedule, metadata=metadata, context_blocks=context_blocks
+        ),
+        rounds=rounds,
+        items=len(schedule),
+    )
+    results["parse_response"] = _measure(
+        lambda: planner._parse_response(response), rounds=rounds, items=len(schedule)
+    )
+    results["plan_topic"] = _measure(
+        lambda: asyncio.run(
+            planner.plan_topic(query="objectives", schedule=schedule, metadata=metadata)
+        ),
+        rounds=rounds,
+        items=len(schedule),
+    )
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "trimesters": trimesters,
+            "areas": areas,
+            "items": items,
+            "rounds": rounds,
+            "embedding_model": embedder.model_name,
+            "formats": list(files),
+        },
+        "benchmarks": results,
+        "skipped": skipped,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], *, threshold: float
+) -> list[str]:
+    """Print a per-benchmark comparison of medians and return the regressed names."""
+
+    regressions = []
+    for name, result in current["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            print(f"  {name:<22} {result['median'] * 1000:10.2f} ms  (new)")
+            continue
+        ratio = result["median"] / reference["median"] if reference["median"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"  {name:<22} {reference['median'] * 1000:10.2f} ms -> "
+            f"{result['median'] * 1000:10.2f} ms  ({ratio - 1:+.1%}){flag}"
+        )
+    for name in baseline.get("benchmarks", {}).keys() - current["benchmarks"].keys():
+        print(f"  {name:<22} missing from the current run")
+    return regressions
+
+
+def _print_results(results: dict[str, Any]) -> None:
+    meta = results["meta"]
+    print(
+        f"trimesters={meta['trimesters']} areas={meta['areas']} items={meta['items']} "
+        f"rounds={meta['rounds']} model={meta['embedding_model']}"
+    )
+    for name, result in results["benchmarks"].items():
+        print(
+            f"  {name:<22} median {result['median'] * 1000:10.2f} ms  "
+            f"min {result['min'] * 1000:10.2f} ms  ({result['items']} items)"
+        )
+    for name, reason in results["skipped"].items():
+        print(f"  {name:<22} skipped: {reason}")
+
+
+def _load(path: Path) -> dict[str, Any]:
+    return serialization.loads(path.read_bytes())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--trimesters", type=int, default=3)
+    run_parser.add_argument("--areas", type=int, default=40)
+    run_parser.add_argument("--items", type=int, default=6)
+    run_parser.add_argument("--rounds", type=int, default=5)
+    run_parser.add_argument("--dimension", type=int, default=384)
+    run_parser.add_argument("--output", type=Path, help="write the JSON results here")
+    run_parser.add_argument("--baseline", type=Path, help="compare against this result file")
+    run_parser.add_argument("--threshold", type=float, default=0.15)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        with tempfile.TemporaryDirectory(prefix="planner-bench-") as work_dir:
+            results = run_suite(
+                trimesters=args.trimesters,
+                areas=args.areas,
+                items=args.items,
+                rounds=args.rounds,
+                dimension=args.dimension,
+                work_dir=Path(work_dir),
+            )
+        _print_results(results)
+        if args.output:
+            args.output.write_bytes(serialization.dumps(results, indent=True))
+        if args.baseline is None:
+            return
+        baseline, current = _load(args.baseline), results
+    else:
+        baseline, current = _load(args.baseline), _load(args.current)
+
+    print(f"comparison (regression threshold {args.threshold:.0%}):")
+    regressions = compare(baseline, current, threshold=args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Gunicorn settings for running several API workers that share one embedding model.
+
+    gunicorn -c gunicorn.conf.py backend.app.main:app
+
+The app and the embedding model are loaded once in the master process before the
+workers are forked, so every worker reads the same copy-on-write weight pages instead
+of loading its own copy. CPU inference only: CUDA cannot be initialised before fork.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def when_ready(server):
+    from backend.app.ingestion.embedder import preload_model
+
+    preload_model()
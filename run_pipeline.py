@@ -2,15 +2,17 @@
 from __future__ import annotations
 
 import argparse
-import json
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Any
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
 
-from backend.app.config import get_settings
-from backend.app.db import init_database
-from backend.app.ingestion.embedder import EmbeddingService
-from backend.app.ingestion.parser import ingest_yearly_plan
-from backend.app.vectorstore import VectorStore
+if TYPE_CHECKING:
+    from backend.app.services.chunk_store import ChunkStoreReport
+    from backend.app.vectorstore import VectorStore
+
+# Backend modules are imported inside the functions below so that ``--help`` and argument
+# errors return immediately instead of waiting for SQLAlchemy, pydantic and friends.
 
 
 def _persist_vector_chunks(
@@ -18,27 +20,41 @@ def _persist_vector_chunks(
     store: VectorStore,
     chunks: list[dict[str, Any]],
     embedding_model: str | None = None,
-) -> int:
-    if not chunks:
-        return 0
-
-    texts = [chunk["text"] for chunk in chunks]
-    ids = [chunk["id"] for chunk in chunks]
-    metadatas = [chunk["metadata"] for chunk in chunks]
-
-    embedder = EmbeddingService(model=embedding_model)
-    embeddings = embedder.embed_texts(texts)
-    store.add_texts(ids=ids, texts=texts, embeddings=embeddings, metadatas=metadatas)
-    return len(chunks)
+) -> ChunkStoreReport:
+    from backend.app.db import get_sessionmaker
+    from backend.app.ingestion.embedder import EmbeddingService
+    from backend.app.services.chunk_store import store_chunks
+
+    with get_sessionmaker()() as db:
+        return store_chunks(
+            db,
+            chunks=chunks,
+            vector_store=store,
+            embedder=EmbeddingService(model=embedding_model),
+        )
 
 
 def _bootstrap_environment() -> None:
+    from backend.app.config import get_settings
+    from backend.app.db import init_database
+
     get_settings()  # ensure settings are loaded for downstream components
     print("⚙️ Ensuring database schema exists...", flush=True)
     init_database()
     print("✅ Database ready.")
 
 
+def _print_profile(stages: dict[str, list[float]], total: float) -> None:
+    print("⏱️ Stage breakdown:")
+    for name, durations in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        elapsed = sum(durations)
+        print(
+            f"  {name:<22} {elapsed * 1000:10.1f} ms  {elapsed / total:6.1%}"
+            f"  ({len(durations)} call{'s' if len(durations) != 1 else ''})"
+        )
+    print(f"  {'total':<22} {total * 1000:10.1f} ms")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description=(
@@ -63,6 +79,11 @@ def main() -> None:
             "JSON is printed to stdout."
         ),
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Emit the structured plan as compact single-line JSON instead of indented JSON.",
+    )
     parser.add_argument(
         "--collection",
         default="yearly-plan",
@@ -73,33 +94,74 @@ def main() -> None:
         default=None,
         help="Override the embedding model name configured in the environment.",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-stage timing breakdown (parse, chunk, embed, Chroma write).",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help="Also write a cProfile dump to this path (inspect with pstats or snakeviz).",
+    )
     args = parser.parse_args()
 
     plan_path: Path = args.plan_path.expanduser().resolve()
     if not plan_path.exists():
         raise FileNotFoundError(f"Plan file not found: {plan_path}")
 
+    from backend.app import metrics
+    from backend.app.ingestion.parser import ingest_yearly_plan
+    from backend.app.serialization import dumps
+    from backend.app.vectorstore import VectorStore
+
     _bootstrap_environment()
 
-    print(f"➡️ Ingesting yearly plan from {plan_path}...", flush=True)
-    ingestion_result = ingest_yearly_plan(plan_path)
-    structured = ingestion_result.structured.model_dump()
-
-    if args.output_json:
-        output_path = args.output_json.expanduser().resolve()
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(json.dumps(structured, indent=2, default=str), encoding="utf-8")
-        print(f"✅ Structured plan written to {output_path}")
-    else:
-        print(json.dumps(structured, indent=2, default=str))
-
-    store = VectorStore(collection_name=args.collection)
-    chunk_count = _persist_vector_chunks(
-        store=store,
-        chunks=ingestion_result.chunks,
-        embedding_model=args.embedding_model,
-    )
-    print(f"✅ Stored {chunk_count} chunks in Chroma collection '{args.collection}'.")
+    with ExitStack() as stack:
+        stages = stack.enter_context(metrics.record_stages())
+        profiler = None
+        if args.profile_output:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            stack.callback(profiler.disable)
+            profiler.enable()
+        started = perf_counter()
+
+        print(f"➡️ Ingesting yearly plan from {plan_path}...", flush=True)
+        ingestion_result = ingest_yearly_plan(plan_path)
+        structured = dumps(ingestion_result.structured, indent=not args.compact)
+
+        if args.output_json:
+            output_path = args.output_json.expanduser().resolve()
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_bytes(structured)
+            print(f"✅ Structured plan written to {output_path}")
+        else:
+            print(structured.decode("utf-8"))
+
+        store = VectorStore(collection_name=args.collection)
+        report = _persist_vector_chunks(
+            store=store,
+            chunks=ingestion_result.chunks,
+            embedding_model=args.embedding_model,
+        )
+        print(f"✅ Stored {report.stored} chunks in Chroma collection '{args.collection}'.")
+        if report.duplicates:
+            print(
+                f"♻️ Linked {report.duplicates} of {report.chunks} chunks to near-duplicate "
+                f"vectors ({report.reduction:.1%} fewer vectors, "
+                f"~{report.seconds_saved * 1000:.0f} ms of embedding saved)."
+            )
+        elapsed = perf_counter() - started
+
+    if args.profile or args.profile_output:
+        _print_profile(stages, elapsed)
+    if profiler is not None:
+        profile_path = args.profile_output.expanduser().resolve()
+        profiler.dump_stats(profile_path)
+        print(f"✅ cProfile dump written to {profile_path}")
 
 
 if __name__ == "__main__":
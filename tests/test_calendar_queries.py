@@ -0,0 +1,77 @@
+"""The group calendar route must cost two statements per page, whatever the page size."""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app import crud, schemas
+from backend.app.api import routes
+from benchmarks._db import count_statements, make_engine, make_session, seed_topic_and_group
+
+CLASSES = 25
+ACTIVITIES_PER_CLASS = 2
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Seed a SQLite file with one group's classes and return its URL and the group id."""
+
+    path = tmp_path / "calendar.sqlite"
+    engine = make_engine(f"sqlite:///{path}")
+    with make_session(engine) as db:
+        topic, group = seed_topic_and_group(db)
+        crud.bulk_create_class_sessions(
+            db,
+            sessions=[
+                schemas.ClassSessionCreate(
+                    date=date(2025, 2, 3) + timedelta(days=index // 3),
+                    start_time=time(8 + index % 3),
+                    end_time=time(9 + index % 3),
+                    topic_id=topic.id,
+                    group_id=group.id,
+                    activities=[
+                        schemas.ActivityCreate(pre=f"activity {number}")
+                        for number in range(ACTIVITIES_PER_CLASS)
+                    ],
+                )
+                for index in range(CLASSES)
+            ],
+        )
+        group_id = group.id
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{path}", group_id
+
+
+async def _read_calendar(database_url: str, group_id: int, limit: int) -> list[tuple[int, int]]:
+    """Page through the calendar; return ``(statements, activities)`` for every page."""
+
+    engine = create_async_engine(database_url)
+    sessionmaker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    pages = []
+    cursor = None
+    try:
+        while True:
+            async with sessionmaker() as db:
+                with count_statements(engine.sync_engine) as statements:
+                    page = await routes.read_group_calendar(
+                        group_id, cursor=cursor, limit=limit, db=db
+                    )
+                    activities = sum(len(session.activities) for session in page["items"])
+            pages.append((statements.count, activities))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("limit", [1, 7, CLASSES, 100])
+def test_each_calendar_page_costs_two_statements(database, limit):
+    pages = asyncio.run(_read_calendar(*database, limit))
+
+    assert len(pages) == -(-CLASSES // limit)
+    assert [statements for statements, _ in pages] == [2] * len(pages)
+    assert sum(activities for _, activities in pages) == CLASSES * ACTIVITIES_PER_CLASS
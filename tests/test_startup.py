@@ -0,0 +1,20 @@
+"""Keep startup inside the ``benchmarks.bench_startup`` import budgets."""
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.bench_startup import (
+    APP_BUDGET_MS,
+    CLI_BUDGET_MS,
+    TARGETS,
+    heavy_imports,
+    import_profile,
+)
+
+
+@pytest.mark.parametrize(("target", "budget_ms"), [("cli", CLI_BUDGET_MS), ("app", APP_BUDGET_MS)])
+def test_imports_stay_within_budget(target, budget_ms):
+    elapsed_ms, modules = import_profile(TARGETS[target])
+
+    assert heavy_imports(modules) == []
+    assert elapsed_ms <= budget_ms